@@ -0,0 +1,51 @@
+"""add hot path indexes
+
+Revision ID: a3f7b9d2c614
+Revises: d8a1c5e3f290
+Create Date: 2025-06-09 10:41:07.288530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f7b9d2c614"
+down_revision: Union[str, None] = "d8a1c5e3f290"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Every dashboard read is a time range on one of these. Without them, each was a seq scan.
+# The names are the ones index=True gives in models.py, so autogenerate sees no diff
+single_column = {
+    "daily_program_summaries": ["gathering_date"],
+    "daily_chrome_summaries": ["gathering_date"],
+    "daily_video_summaries": ["gathering_date"],
+    "program_logs": ["gathering_date", "start_time", "created_at"],
+    "domain_logs": ["gathering_date", "start_time", "created_at"],
+    "video_logs": ["gathering_date", "start_time", "created_at"],
+    "typing_sessions": ["start_time"],
+    "mouse_moves": ["start_time"],
+    "system_status": ["created_at"],
+}
+
+# The timeline reads filter on one group and a range of starts
+group_then_start = ["client_timeline_entries", "precomputed_timelines"]
+
+
+def upgrade() -> None:
+    for table, columns in single_column.items():
+        for column in columns:
+            op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+    for table in group_then_start:
+        op.create_index(f"ix_{table}_group_start", table, ["group", "start"], unique=False)
+
+
+def downgrade() -> None:
+    for table in group_then_start:
+        op.drop_index(f"ix_{table}_group_start", table_name=table)
+    for table, columns in single_column.items():
+        for column in columns:
+            op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
@@ -0,0 +1,74 @@
+"""unique summary per day
+
+Revision ID: b3c9e1d47a20
+Revises: 977678698f70
+Create Date: 2025-05-30 10:14:52.118406
+
+"""
+
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3c9e1d47a20"
+down_revision: Union[str, None] = "977678698f70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, identity column, constraint name)
+summary_tables = [
+    ("daily_program_summaries", "exe_path_as_id", "uq_program_summary_day"),
+    ("daily_chrome_summaries", "domain_name", "uq_domain_summary_day"),
+    ("daily_video_summaries", "video_id", "uq_video_summary_day"),
+]
+
+
+def merge_duplicate_days(table: str, identity: str) -> None:
+    """
+    The read-then-insert race left some duplicate days. Fold them into the oldest row.
+    GROUP BY puts NULL identities together, so the DELETE has to match them the same way
+    """
+    op.execute(
+        f"""
+        UPDATE {table} AS keep
+        SET hours_spent = dupes.total
+        FROM (
+            SELECT MIN(id) AS keep_id, SUM(hours_spent) AS total
+            FROM {table}
+            GROUP BY {identity}, gathering_date
+            HAVING COUNT(*) > 1
+        ) AS dupes
+        WHERE keep.id = dupes.keep_id
+        """
+    )
+    op.execute(
+        f"""
+        DELETE FROM {table} AS extra
+        USING {table} AS keep
+        WHERE extra.{identity} IS NOT DISTINCT FROM keep.{identity}
+          AND extra.gathering_date = keep.gathering_date
+          AND extra.id > keep.id
+        """
+    )
+
+
+def upgrade() -> None:
+    for table, identity, constraint in summary_tables:
+        merge_duplicate_days(table, identity)
+        # Otherwise every row with a NULL identity is unique, and the upsert never
+        # conflicts on them. NULLS NOT DISTINCT needs Postgres 15
+        op.create_unique_constraint(
+            constraint,
+            table,
+            [identity, "gathering_date"],
+            postgresql_nulls_not_distinct=True,
+        )
+
+
+def downgrade() -> None:
+    for table, _, constraint in summary_tables:
+        op.drop_constraint(constraint, table, type_="unique")
@@ -0,0 +1,137 @@
+"""partition raw event tables by month
+
+Revision ID: b7e4d1f09a52
+Revises: a3f7b9d2c614
+Create Date: 2025-06-12 16:03:52.114907
+
+"""
+
+import sqlalchemy as sa
+
+from datetime import date, datetime, timezone
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4d1f09a52"
+down_revision: Union[str, None] = "a3f7b9d2c614"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The table, its time column, and its indexes besides the key
+partitioned = {
+    "client_timeline_entries": (
+        "start",
+        {
+            "ix_client_timeline_entries_id": ["id"],
+            "ix_client_timeline_entries_group_start": ["group", "start"],
+        },
+    ),
+    "mouse_moves": (
+        "start_time",
+        {"ix_mouse_moves_id": ["id"], "ix_mouse_moves_start_time": ["start_time"]},
+    ),
+    "typing_sessions": (
+        "start_time",
+        {
+            "ix_typing_sessions_id": ["id"],
+            "ix_typing_sessions_start_time": ["start_time"],
+        },
+    ),
+}
+
+# partition_months_ahead as of this revision. The service keeps it up from here
+months_ahead = 2
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_between(first: datetime | None, last: datetime) -> list:
+    month = (first or last).astimezone(timezone.utc).date().replace(day=1)
+    last_month = last.astimezone(timezone.utc).date().replace(day=1)
+    for _ in range(months_ahead):
+        last_month = next_month(last_month)
+    months = []
+    while month <= last_month:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def as_bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def insertable_columns(table: str) -> str:
+    """Everything but the generated columns, which recompute themselves"""
+    names = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = :table AND is_generated = 'NEVER' "
+                "ORDER BY ordinal_position"
+            ),
+            {"table": table},
+        )
+        .scalars()
+        .all()
+    )
+    return ", ".join(f'"{name}"' for name in names)
+
+
+def copy_into(table: str, source: str, where: str = "TRUE"):
+    """Moves the rows and the id sequence over, then drops the source"""
+    columns = insertable_columns(source)
+    op.execute(
+        f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{source}" WHERE {where}'
+    )
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    op.execute(f'DROP TABLE "{source}"')
+
+
+def upgrade() -> None:
+    for table, (column, indexes) in partitioned.items():
+        old = f"{table}_unpartitioned"
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+        op.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING GENERATED) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+
+        first, last = (
+            op.get_bind()
+            .execute(sa.text(f'SELECT min("{column}"), max("{column}") FROM "{old}"'))
+            .one()
+        )
+        now = datetime.now(timezone.utc)
+        for month in months_between(first, max(last or now, now)):
+            op.execute(
+                f'CREATE TABLE "{table}_{month:%Y_%m}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{as_bound(month)}') TO ('{as_bound(next_month(month))}')"
+            )
+        op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        # The time column is part of the key now. A row without one couldn't be shown anyway
+        copy_into(table, old, where=f'"{column}" IS NOT NULL')
+        op.create_primary_key(f"{table}_pkey", table, ["id", column])
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for table, (column, indexes) in partitioned.items():
+        old = f"{table}_partitioned"
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+        op.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING GENERATED)'
+        )
+        copy_into(table, old)  # Its partitions go with it
+        op.create_primary_key(f"{table}_pkey", table, ["id"])
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns, unique=False)
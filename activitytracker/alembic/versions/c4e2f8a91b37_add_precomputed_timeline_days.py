@@ -0,0 +1,57 @@
+"""add precomputed timeline days
+
+Revision ID: c4e2f8a91b37
+Revises: b3c9e1d47a20
+Create Date: 2025-06-02 09:41:07.512839
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e2f8a91b37"
+down_revision: Union[str, None] = "b3c9e1d47a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "precomputed_timeline_days",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "group",
+            # Already exists, made for precomputed_timelines
+            postgresql.ENUM("MOUSE", "KEYBOARD", name="charteventtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("source_event_count", sa.Integer(), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "computed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "group", name="uq_precomputed_timeline_day"),
+    )
+    op.create_index(
+        op.f("ix_precomputed_timeline_days_id"),
+        "precomputed_timeline_days",
+        ["id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_precomputed_timeline_days_id"), table_name="precomputed_timeline_days"
+    )
+    op.drop_table("precomputed_timeline_days")
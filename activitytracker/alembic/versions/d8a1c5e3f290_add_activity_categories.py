@@ -0,0 +1,89 @@
+"""add activity categories
+
+Revision ID: d8a1c5e3f290
+Revises: c4e2f8a91b37
+Create Date: 2025-06-04 14:22:31.904117
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8a1c5e3f290"
+down_revision: Union[str, None] = "c4e2f8a91b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+activity_kind = postgresql.ENUM("PROGRAM", "DOMAIN", name="activitykind")
+productivity_category = postgresql.ENUM(
+    "PRODUCTIVE", "LEISURE", "IGNORED", name="productivitycategory"
+)
+
+# The lists in config/definitions.py as of this revision. Copied, not imported,
+# so that later edits to the config don't change what this migration did
+seed = {
+    "PROGRAM": {
+        "PRODUCTIVE": [
+            "Chrome",
+            "File Explorer",
+            "Postman",
+            "Terminal",
+            "Visual Studio Code",
+        ],
+        "LEISURE": ["Discord"],
+        # Chrome is counted by domain. Alt-tab window is bugged output
+        "IGNORED": ["Google Chrome", "Alt-tab window"],
+    },
+    "DOMAIN": {
+        "PRODUCTIVE": [
+            "github.com",
+            "stackoverflow.com",
+            "docs.",
+            "jira.",
+            "confluence.",
+            "claude.ai",
+            "chatgpt.com",
+            "www.google.com",
+            "localhost",
+            "extensions",
+        ],
+        "LEISURE": ["www.facebook.com", "www.tiktok.com", "x.com"],
+    },
+}
+
+
+def upgrade() -> None:
+    categories = op.create_table(
+        "activity_categories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", activity_kind, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("category", productivity_category, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("kind", "name", name="uq_activity_category"),
+    )
+    op.create_index(
+        op.f("ix_activity_categories_id"), "activity_categories", ["id"], unique=False
+    )
+    op.bulk_insert(
+        categories,
+        [
+            {"kind": kind, "name": name, "category": category}
+            for kind, by_category in seed.items()
+            for category, names in by_category.items()
+            for name in names
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_activity_categories_id"), table_name="activity_categories")
+    op.drop_table("activity_categories")
+    productivity_category.drop(op.get_bind(), checkfirst=True)
+    activity_kind.drop(op.get_bind(), checkfirst=True)
@@ -5,4 +5,5 @@ setup(
     version="0.1",
     package_dir={"": "src"},
     packages=find_packages(where="src"),
+    install_requires=["numpy"],  # The timeline aggregator
 )
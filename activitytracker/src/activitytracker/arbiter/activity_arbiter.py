@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
+
 from datetime import datetime, timedelta, timezone
 
 from activitytracker.object.classes import (
@@ -83,6 +85,16 @@ class ActivityArbiter:
 
         When a program is opened, start a session for the program. And vice versa when it closes.
         """
+        # Finalize, new log & summary rows, partial window: all one transaction
+        with self.recorder_unit_of_work():
+            self.run_transition(new_session)
+
+    def recorder_unit_of_work(self):
+        if self.activity_recorder:
+            return self.activity_recorder.unit_of_work()
+        return nullcontext()
+
+    def run_transition(self, new_session: ChromeSession | ProgramSession):
         if isinstance(new_session, ProgramSession):
             self.logger.log_white("[Exe]", new_session.window_title)
         else:
@@ -200,3 +212,5 @@ class ActivityArbiter:
             concluded_session = self.state_machine.conclude_without_replacement()
             if concluded_session:
                 self.notify_summary_dao(concluded_session)
+        if self.activity_recorder:
+            self.activity_recorder.shutdown()
@@ -1,6 +1,12 @@
+import threading
+from contextlib import contextmanager, nullcontext
+
 from datetime import datetime
 
 from activitytracker.arbiter.netflix_title_resolver import NetflixMysteryTitleResolver
+from activitytracker.arbiter.persistence_worker import PersistenceWorker
+from activitytracker.arbiter.pulse_accumulator import PulseAccumulator
+from activitytracker.config.definitions import window_push_length
 from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
 from activitytracker.db.dao.direct.mystery_media_dao import MysteryMediaDao
 from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
@@ -8,6 +14,7 @@ from activitytracker.db.dao.direct.video_summary_dao import VideoSummaryDao
 from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
 from activitytracker.db.dao.queuing.program_logs_dao import ProgramLoggingDao
 from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
+from activitytracker.db.unit_of_work import UnitOfWorkSessionMaker
 from activitytracker.object.arbiter_classes import InternalState
 from activitytracker.object.classes import (
     ChromeSession,
@@ -36,6 +43,9 @@ class ActivityRecorder:
         video_summary_dao: VideoSummaryDao,
         mystery_media_dao: MysteryMediaDao,
         DEBUG=False,
+        regular_session=None,
+        pulse_flush_interval: int | float | None = None,
+        persistence_worker: PersistenceWorker | None = None,
     ):
         self.program_logging_dao = program_logging_dao
         self.chrome_logging_dao = chrome_logging_dao
@@ -52,6 +62,18 @@ class ActivityRecorder:
         )
         # On init, the cache is filled with the most recent 50 mysteries:
 
+        self.regular_session = regular_session
+        # Without a flush interval, every pulse goes straight to the db like before
+        self.pulse_accumulator = None
+        if pulse_flush_interval is not None:
+            if regular_session is None:
+                raise ValueError("Pulse accumulator needs a session maker")
+            self.pulse_accumulator = PulseAccumulator(regular_session, pulse_flush_interval)
+
+        # With a worker, the DAO calls run on its thread instead of the caller's
+        self.persistence_worker = persistence_worker
+        self.local = threading.local()  # Holds the batch of an open unit of work
+
         self.DEBUG = DEBUG
         self.logger = ConsoleLogger()
         if not DEBUG:
@@ -63,8 +85,70 @@ class ActivityRecorder:
         # List of (session, amount, timestamp) tuples for each deduction
         self.remainder_history = []
 
+    def unit_of_work(self):
+        """Everything recorded inside the with block commits as one transaction"""
+        if self.persistence_worker is not None:
+            return self._batched_unit_of_work()
+        return self._db_unit_of_work()
+
+    def _db_unit_of_work(self):
+        if isinstance(self.regular_session, UnitOfWorkSessionMaker):
+            return self.regular_session.unit_of_work()
+        return nullcontext()  # Plain sessionmaker: each DAO call commits on its own
+
+    @contextmanager
+    def _batched_unit_of_work(self):
+        # The transaction has to happen on the worker's thread, so collect the
+        # commands here and hand them over as one
+        if getattr(self.local, "batch", None) is not None:
+            yield  # Nested. The outer one submits
+            return
+        self.local.batch = []
+        self.local.batch_droppable = True
+        try:
+            yield
+        finally:
+            batch = self.local.batch
+            self.local.batch = None
+        if batch and self.persistence_worker:
+            # Only a batch of nothing but pulses can be dropped
+            self.persistence_worker.submit(
+                self._run_batch, batch, droppable=self.local.batch_droppable
+            )
+
+    def _run_batch(self, batch: list):
+        with self._db_unit_of_work():
+            for fn, args in batch:
+                fn(*args)
+
+    def dispatch(self, fn, *args, droppable=False):
+        """
+        Runs fn now, or posts it to the persistence worker if there is one.
+        droppable is for pulses: the worker may drop them when it's behind
+        """
+        worker = self.persistence_worker
+        if worker is None or worker.on_worker_thread():
+            fn(*args)
+            return
+        batch = getattr(self.local, "batch", None)
+        if batch is not None:
+            batch.append((fn, args))
+            self.local.batch_droppable = self.local.batch_droppable and droppable
+            return
+        worker.submit(fn, *args, droppable=droppable)
+
+    def shutdown(self):
+        """Writes the pending pulses, then waits for the worker to empty its queue"""
+        self.flush_pulses()
+        if self.persistence_worker:
+            self.persistence_worker.stop()
+
     def on_new_session(self, session: ProgramSession | ChromeSession):
+        self.dispatch(self._record_new_session, session)
+
+    def _record_new_session(self, session: ProgramSession | ChromeSession):
         # TODO: do an audit of logging time and summary time.
+        self._flush_pulse_accumulator()
         if session.video_info:
             print(session.video_info, "68ru")
 
@@ -76,35 +160,25 @@ class ActivityRecorder:
                         video_session
                     )
                 )
-            self.video_logging_dao.start_session(video_session)
+            # The handles live on the parent session; it's the one the engine pulses
+            session.handles.video_log_id = self.video_logging_dao.start_session(
+                video_session
+            )
 
-            session_exists_already = self.video_summary_dao.find_todays_entry_for_media(
+            # Upserts, so it's the same row if the video was already watched today
+            session.handles.video_summary_id = self.video_summary_dao.start_session(
                 video_session
             )
-            if not session_exists_already:
-                self.video_summary_dao.start_session(video_session)
         if isinstance(session, ProgramSession):
             # Regardless of the session being brand new today or a repeat,
             # must start a new logging session, to note the time being added to the summary.
-            self.program_logging_dao.start_session(session)
-            session_exists_already = self.program_summary_dao.find_todays_entry_for_program(
-                session
-            )
-            if session_exists_already:
-                # After thinking about it longer, it makes much more sense for ALL additions of time
-                # to flow through the KeepAliveEngine. That way, there's only one place to look for time being added.
-                # self.program_summary_dao.start_window_push_for_session(session, now)
-                return
-            self.program_summary_dao.start_session(session)
+            session.handles.log_id = self.program_logging_dao.start_session(session)
+            # Upserts with zero hours. ALL additions of time flow through the KeepAliveEngine,
+            # so there's only one place to look for time being added.
+            session.handles.summary_id = self.program_summary_dao.start_session(session)
         elif isinstance(session, ChromeSession):
-            self.chrome_logging_dao.start_session(session)
-            session_exists_already = self.chrome_summary_dao.find_todays_entry_for_domain(
-                session
-            )
-            if session_exists_already:
-                # self.chrome_summary_dao.start_window_push_for_session(session, now)
-                return
-            self.chrome_summary_dao.start_session(session)
+            session.handles.log_id = self.chrome_logging_dao.start_session(session)
+            session.handles.summary_id = self.chrome_summary_dao.start_session(session)
         else:
             raise TypeError("Session was not the right type")
 
@@ -119,7 +193,9 @@ class ActivityRecorder:
         if self.DEBUG:
             self.pulse_history.append((session, session.start_time))
             session.ledger.add_ten_sec()
+        self.dispatch(self._record_pulse, session, droppable=True)
 
+    def _record_pulse(self, session: ProgramSession | ChromeSession):
         # Window push now finds session based on start_time
         print(session.video_info, "-- in add ten sec")
 
@@ -134,19 +210,34 @@ class ActivityRecorder:
                     )
                 )
 
-            self.video_logging_dao.push_window_ahead_ten_sec(video_session)
-            self.video_summary_dao.push_window_ahead_ten_sec(video_session)
+            self._push_window(self.video_logging_dao, self.video_summary_dao, video_session)
         if isinstance(session, ProgramSession):
-            self.program_logging_dao.push_window_ahead_ten_sec(session)
-            self.program_summary_dao.push_window_ahead_ten_sec(session)
+            self._push_window(self.program_logging_dao, self.program_summary_dao, session)
         elif isinstance(session, ChromeSession):
-            self.chrome_logging_dao.push_window_ahead_ten_sec(session)
-            self.chrome_summary_dao.push_window_ahead_ten_sec(session)
+            self._push_window(self.chrome_logging_dao, self.chrome_summary_dao, session)
         else:
             raise TypeError("Session was not the right type")
+        if self.pulse_accumulator:
+            self.pulse_accumulator.flush_if_due()
+
+    def _push_window(self, logging_dao, summary_dao, session):
+        if self.pulse_accumulator:
+            self.pulse_accumulator.add(logging_dao, session, window_push_length)
+            self.pulse_accumulator.add(summary_dao, session, window_push_length)
+            return
+        logging_dao.push_window_ahead_ten_sec(session)
+        summary_dao.push_window_ahead_ten_sec(session)
+
+    def flush_pulses(self):
+        """Writes the accumulated pulses. Must run before anything overwrites end_time."""
+        self.dispatch(self._flush_pulse_accumulator)
+
+    def _flush_pulse_accumulator(self):
+        if self.pulse_accumulator:
+            self.pulse_accumulator.flush()
 
     def add_partial_window(
-        self, duration_in_sec: int, session: ProgramSession | ChromeSession
+        self, duration_in_sec: int | float, session: ProgramSession | ChromeSession
     ):
         """
         Deducts t seconds from the duration of a session.
@@ -159,6 +250,12 @@ class ActivityRecorder:
         if self.DEBUG:
             self.remainder_history.append((session, duration_in_sec, session.start_time))
             session.ledger.extend_by_n(duration_in_sec)
+        self.dispatch(self._record_partial_window, duration_in_sec, session)
+
+    def _record_partial_window(
+        self, duration_in_sec: int | float, session: ProgramSession | ChromeSession
+    ):
+        self._flush_pulse_accumulator()
         if duration_in_sec == 0:
             return  # Nothing to add
 
@@ -186,6 +283,13 @@ class ActivityRecorder:
     def on_state_changed(
         self, session: CompletedProgramSession | CompletedChromeSession | None
     ):
+        self.dispatch(self._record_state_changed, session)
+
+    def _record_state_changed(
+        self, session: CompletedProgramSession | CompletedChromeSession | None
+    ):
+        # finalize_log overwrites end_time, so the pending pulses must land first
+        self._flush_pulse_accumulator()
         if session is not None and session.video_info:
             print(session.video_info, "187ru")
             self.logger.log_video_info("add_partial_window", session.video_info)
@@ -0,0 +1,150 @@
+import queue
+import threading
+import traceback
+
+from typing import Callable
+
+from activitytracker.util.console_logger import ConsoleLogger
+
+_STOP = object()
+
+
+class PersistenceMetrics:
+    """Counters for the worker's queue. Read them to see if the db is keeping up"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.high_water_mark = 0
+        # Backpressure: commands queued past the bound, and pulses dropped at it
+        self.over_bound = 0
+        self.dropped = 0
+
+    def as_dict(self, depth: int) -> dict:
+        return {
+            "depth": depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "high_water_mark": self.high_water_mark,
+            "over_bound": self.over_bound,
+            "dropped": self.dropped,
+        }
+
+
+class PersistenceWorker:
+    """
+    One thread that owns all of the recorder's DB I/O.
+
+    The arbiter runs on whatever thread emitted the session: sometimes that's the
+    uvicorn event loop, via the Chrome tab route. So the recorder posts commands here
+    and returns right away, and the worker runs them in order.
+
+    submit() never waits, since its caller may be the event loop. Past max_queue_size,
+    a droppable command, which is a pulse, is dropped and counted. Losing ten sec
+    of a pulse beats hanging the server. Anything else is queued anyway and counted:
+    dropping a new session would leave the later pulses without the rows they update.
+    """
+
+    def __init__(self, max_queue_size: int = 1000):
+        # Unbounded, so the commands that can't be dropped always fit.
+        # submit() enforces max_queue_size on the ones that can
+        self.commands = queue.Queue()
+        self.max_queue_size = max_queue_size
+        self.metrics = PersistenceMetrics()
+        self.metrics_lock = threading.Lock()
+        self.thread = None
+        self.logger = ConsoleLogger()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(
+            target=self._run, name="persistence-worker", daemon=True
+        )
+        self.thread.start()
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def on_worker_thread(self) -> bool:
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, fn: Callable, *args, droppable: bool = False) -> bool:
+        """Queues fn(*args). Returns False if the queue was full and it was dropped."""
+        is_full = self.commands.qsize() >= self.max_queue_size
+        if is_full and droppable:
+            with self.metrics_lock:
+                self.metrics.dropped += 1
+            self.logger.log_red(f"[warn] Persistence queue full, dropped {fn.__name__}")
+            return False
+        self.commands.put_nowait((fn, args))
+        with self.metrics_lock:
+            self.metrics.submitted += 1
+            if is_full:
+                self.metrics.over_bound += 1
+            self.metrics.high_water_mark = max(
+                self.metrics.high_water_mark, self.commands.qsize()
+            )
+        return True
+
+    def _run(self):
+        while True:
+            command = self.commands.get()
+            try:
+                if command is _STOP:
+                    return
+                self.run_command(*command)
+            finally:
+                self.commands.task_done()
+
+    def run_command(self, fn: Callable, args: tuple):
+        try:
+            fn(*args)
+            with self.metrics_lock:
+                self.metrics.completed += 1
+        except Exception as e:
+            with self.metrics_lock:
+                self.metrics.failed += 1
+            self.logger.log_red(f"[error] Persistence command {fn.__name__} failed: {e}")
+            traceback.print_exc()
+
+    def drain(self):
+        """Blocks until everything submitted so far has been written"""
+        if not self.is_running():
+            self._run_inline()
+            return
+        if self.on_worker_thread():
+            return  # Would wait on itself
+        self.commands.join()
+
+    def _run_inline(self):
+        # Never started, or already stopped: write what's left on this thread
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command is not _STOP:
+                self.run_command(*command)
+            self.commands.task_done()
+
+    def stop(self, timeout: int | float = 5):
+        """Flush-on-shutdown: everything queued before stop() is written first"""
+        if not self.is_running():
+            self._run_inline()
+            return
+        self.commands.put(_STOP)
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            self.logger.log_red(
+                f"[warn] Persistence worker still busy after {timeout}s, "
+                f"{self.commands.qsize()} commands left"
+            )
+            return
+        self.thread = None
+
+    def get_metrics(self) -> dict:
+        with self.metrics_lock:
+            return self.metrics.as_dict(self.commands.qsize())
@@ -0,0 +1,83 @@
+import threading
+
+import time
+
+from typing import Callable
+
+from activitytracker.util.console_logger import ConsoleLogger
+
+
+class PendingPush:
+    """Seconds owed to one row, waiting for the next flush"""
+
+    def __init__(self, dao, session, seconds: int | float):
+        self.dao = dao
+        self.session = session
+        self.seconds = seconds
+
+
+class PulseAccumulator:
+    """
+    Write-behind buffer for the keep-alive pulses.
+
+    Every pulse used to be a SELECT then a read-modify-write commit, per table.
+    Instead the seconds pile up here, keyed per (dao, session), and go to the db as
+    atomic "col = col + :delta" UPDATEs, all in one transaction.
+
+    Each dao in here must have a build_window_push(session, seconds) that returns
+    the UPDATE statement.
+    """
+
+    def __init__(
+        self,
+        session_maker,
+        flush_interval: int | float,
+        monotonic_fn: Callable[[], float] = time.monotonic,
+    ):
+        self.regular_session = session_maker
+        self.flush_interval = flush_interval
+        self.monotonic_fn = monotonic_fn
+        self.pending: dict[tuple, PendingPush] = {}
+        self.lock = threading.Lock()
+        self.last_flush = monotonic_fn()
+        self.logger = ConsoleLogger()
+
+    def add(self, dao, session, seconds: int | float):
+        key = (id(dao), session.start_time.dt)
+        with self.lock:
+            if key in self.pending:
+                self.pending[key].seconds += seconds
+            else:
+                self.pending[key] = PendingPush(dao, session, seconds)
+
+    def is_due(self) -> bool:
+        return self.monotonic_fn() - self.last_flush >= self.flush_interval
+
+    def flush_if_due(self) -> int:
+        if self.is_due():
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """Writes everything pending in one transaction. Returns the statement count."""
+        with self.lock:
+            batch = list(self.pending.values())
+            self.pending = {}
+            self.last_flush = self.monotonic_fn()
+        if not batch:
+            return 0
+        with self.regular_session() as db_session:
+            for push in batch:
+                statement = push.dao.build_window_push(push.session, push.seconds)
+                result = db_session.execute(statement)
+                if result.rowcount == 0:
+                    self.logger.log_red(
+                        f"[warn] Pulse found no row for {push.session.get_name()}"
+                    )
+            db_session.commit()
+        return len(batch)
+
+    def pending_seconds(self) -> dict[tuple, int | float]:
+        """For tests & debugging"""
+        with self.lock:
+            return {key: push.seconds for key, push in self.pending.items()}
@@ -2,11 +2,14 @@ import threading
 
 import time
 
+from typing import Callable
+
 from activitytracker.config.definitions import (
     keep_alive_cycle_length,
     window_push_length,
 )
 from activitytracker.object.classes import ChromeSession, ProgramSession
+from activitytracker.util.console_logger import ConsoleLogger
 from activitytracker.util.errors import FullWindowError, MissingEngineError
 
 """
@@ -31,7 +34,13 @@ Here, worst case scenario in a shutdown situation, is that 0-10 sec is not recor
 
 
 class KeepAliveEngine:
-    def __init__(self, session: ProgramSession | ChromeSession, dao_connection):
+    def __init__(
+        self,
+        session: ProgramSession | ChromeSession,
+        dao_connection,
+        monotonic_fn: Callable[[], float] | None = None,
+        tick_length: int | float = 1,
+    ):
         """
         This class is a loop. Each iteration of ten loops nudges
         the end time of the current session forward ten sec.
@@ -40,8 +49,13 @@ class KeepAliveEngine:
         the end time of the final program will be pretty much accurate,
         while every other program will be bang on.
 
-        The meaning of the interval between iterate_loop() calls is
-        agnostic, dependent on the delay between calls in the container.
+        With a monotonic_fn, the window is measured in real elapsed time, so
+        iterate_loop() just has to be called often; tick_length is how often the
+        container calls it. Late ticks, slow db writes and jitter don't drift the
+        windows, and the partial window at the end is an exact fraction.
+
+        Without one, each iterate_loop() call counts as one tick_length, which
+        is how the tests drive it.
         """
         self.session = session
         if session is None:
@@ -50,23 +64,35 @@ class KeepAliveEngine:
         self.max_interval = keep_alive_cycle_length  # seconds
         self.amount_used = 0
         self.zero_remainder = 0
+        self.monotonic_fn = monotonic_fn
+        self.tick_length = tick_length
+        self.ticks = 0
+        # Windows are anchored here, and move forward by exactly max_interval
+        self.started_at = self._now()
+        self.window_start = self.started_at
+        self.last_tick_at = self.started_at
+        self.max_tick_gap = 0
+        self.logger = ConsoleLogger()
+
+    def _now(self) -> float:
+        if self.monotonic_fn is None:
+            return self.ticks * self.tick_length
+        return self.monotonic_fn()
 
     def iterate_loop(self):
-        # TODO: Change so that it relies on datetime.now() having 10 sec elapsed.
-        self.amount_used += 1  # not
-        type_of_thing = isinstance(self.session, ProgramSession)
-        # if type_of_thing:
-        #     print("IS PROGRAM SESION")
-        # else:
-        #     print("IS DOMAIN SESSION")
-        # print(f"in loop {self.amount_used} of 10 for {self.session.get_name()}, ")
-        # if self.session.video_info:
-        #     print(
-        #         "[polling for video] Iterating loop for", self.session.video_info.get_name()
-        #     )
-        if self._hit_max_window():
+        self.ticks += 1
+        now = self._now()
+        self.max_tick_gap = max(self.max_tick_gap, now - self.last_tick_at)
+        self.last_tick_at = now
+        self._push_full_windows(now)
+
+    def _push_full_windows(self, now: float):
+        self.amount_used = now - self.window_start
+        # A while, not an if: a tick that came very late can owe more than one window
+        while self._hit_max_window():
             self._pulse_add_ten()
-            self.amount_used = 0
+            self.window_start += self.max_interval
+            self.amount_used = now - self.window_start
 
     def conclude(self):
         """
@@ -76,13 +102,40 @@ class KeepAliveEngine:
         Said another way, the addition of the full 10 sec
         happens in _pulse_add_ten.
         """
+        self._push_full_windows(self._now())
         if self.amount_used == window_push_length:
             raise FullWindowError("Used the wrong method to add ten sec")
+        if self.monotonic_fn is not None:
+            self.amount_used = round(self.amount_used, 3)  # ms is plenty
+            self._warn_about_drift()
         self._add_partial_window(self.amount_used)
 
     def _hit_max_window(self):
         return self.max_interval <= self.amount_used
 
+    def get_drift_stats(self) -> dict:
+        """
+        How far the tick count strayed from real time. drift_sec is what the
+        old count-the-ticks engine would have lost over this session.
+        """
+        elapsed = self.last_tick_at - self.started_at
+        counted = self.ticks * self.tick_length
+        return {
+            "ticks": self.ticks,
+            "elapsed_sec": elapsed,
+            "counted_sec": counted,
+            "drift_sec": elapsed - counted,
+            "max_tick_gap_sec": self.max_tick_gap,
+        }
+
+    def _warn_about_drift(self):
+        stats = self.get_drift_stats()
+        if stats["drift_sec"] >= self.max_interval:
+            self.logger.log_yellow(
+                f"[warn] Keep-alive ticks drifted {stats['drift_sec']:.1f}s over "
+                f"{stats['elapsed_sec']:.0f}s for {self.session.get_name()}"
+            )
+
     def _pulse_add_ten(self):
         """
         Go into the session's Summary DAO entry and add ten sec.
@@ -115,73 +168,104 @@ class ThreadedEngineContainer:
 
     Does this to keep the ActivityArbiter and the currently active session's window push
 
+    The thread is made once and lives as long as the container. Between sessions
+    it waits on a condition variable; start() and stop() just flip is_running
+    and swap the engine under the lock, so a transition never waits on a join.
     """
 
-    # TODO: Also keep the EngineContainer between engines. just change it out. Keep the thread alive.
-
     def __init__(self, interval: int | float = 1, sleep_fn=time.sleep, profiler=None):
         # TODO: Use a sleep interval of like 0.25. Finer granularity.
         self.interval = interval  # seconds - delay between loops
         self.sleep_fn = sleep_fn  # More testable to inject a func
         self.engine = None
-        self.stop_event = threading.Event()
         self.hook_thread = None
         self.is_running = False
         self.profiler = profiler
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        # True while the thread is inside engine.iterate_loop(), outside the lock
+        self.iterating = False
+        # How often a wait on an in-flight iteration reports that it's still waiting
+        self.iteration_timeout = 1
+        self.logger = ConsoleLogger()
 
     def add_first_engine(self, engine):
-        self.engine = engine
+        with self.lock:
+            self.engine = engine
 
     def start(self):
         """
         Starts updates on the current session
         """
-        if not self.is_running:
-            self.stop_event.clear()  # Clear the stop event instead of creating a new one
-
-            self.hook_thread = threading.Thread(target=self._iterate_loop)
-            self.hook_thread.daemon = True
-            self.hook_thread.start()
+        with self.wake:
+            if self.is_running:
+                return
             self.is_running = True
-
-    # FIXME: This class FOR SURE has problems. I see duplicated prints all the time
+            self.wake.notify()
+        if self.hook_thread is None or not self.hook_thread.is_alive():
+            self.hook_thread = threading.Thread(
+                target=self._iterate_loop, name="keep-alive", daemon=True
+            )
+            self.hook_thread.start()
 
     def _iterate_loop(self):
-        if self.engine is None:
-            raise MissingEngineError()
-        # print("while not stop event is set?", self.stop_event.is_set())
-        thread_id = threading.get_ident()
-        while not self.stop_event.is_set():
-            # print(f"Thread {thread_id}")
-            self.engine.iterate_loop()  # a second has been used
+        while True:
+            with self.wake:
+                self.wake.wait_for(lambda: self.is_running)
+                engine = self.engine
+                if engine is None:
+                    self.is_running = False
+                    raise MissingEngineError()
+                self.iterating = True
+            try:
+                # Not under the lock: the pulse might do a db write
+                engine.iterate_loop()  # a second has been used
+            finally:
+                with self.wake:
+                    self.iterating = False
+                    self.wake.notify_all()
             self.sleep_fn(self.interval)  # Sleep for 1 second
 
+    def _wait_for_iteration(self):
+        """
+        Call with the lock held. Lets an in-flight iterate_loop() finish first,
+        however long its db write takes: concluding alongside it would race it
+        """
+        waited = 0
+        while self.iterating:
+            if not self.wake.wait(timeout=self.iteration_timeout):
+                waited += self.iteration_timeout
+                self.logger.log_red(
+                    f"[error] Keep-alive pulse still running after {waited:.1f}s"
+                )
+
     def replace_engine(self, new_engine):
         """Used to maintain container objects between sessions"""
-        if self.engine is None:
-            # Expect that add_first_engine is used to initialize.
-            raise MissingEngineError()
-
-        # NOTE: If you have some sort of off by 1 error, it could be because
-        # the current .sleep() hasn't flushed yet, i.e. the prev iteration is still going
-        if self.is_running:
-            # Stop the current engine's work gracefully
-            self.engine.conclude()
-            # Swap the engine
-            self.engine = new_engine
-        else:
-            # If the thread isn't running, just set the new engine
+        with self.wake:
+            if self.engine is None:
+                # Expect that add_first_engine is used to initialize.
+                raise MissingEngineError()
+            old_engine = self.engine if self.is_running else None
+            if old_engine is not None:
+                # Stop the current engine's work gracefully
+                self._wait_for_iteration()
+            # Swap the engine. The thread picks it up on its next loop
             self.engine = new_engine
+        if old_engine is not None:
+            # Outside the lock, so its db work doesn't hold up the keep-alive thread
+            old_engine.conclude()
 
     def stop(self):
         """
         Stop the current session from receiving anymore updates
         """
-        if self.engine is None:
-            raise MissingEngineError()
-        if self.is_running:
-            self.engine.conclude()
-            self.stop_event.set()
-            if self.hook_thread is not None and self.hook_thread.is_alive():
-                self.hook_thread.join(timeout=1)
+        with self.wake:
+            if self.engine is None:
+                raise MissingEngineError()
+            if not self.is_running:
+                return
+            # Set first, so that the thread doesn't begin another iteration
             self.is_running = False
+            self._wait_for_iteration()
+            engine = self.engine
+        engine.conclude()
@@ -30,6 +30,36 @@ daylight_savings_tz_offset = int(local_tz_dst_offset)
 
 keep_alive_cycle_length = 10  # Has to be the same value
 window_push_length = keep_alive_cycle_length  # has to be the same value
+# How often the keep-alive thread checks the monotonic clock, in sec.
+# Only the resolution of the partial window depends on it, not the accuracy
+keep_alive_tick_length = 0.25
+
+# How often the recorder writes its accumulated pulses to the db, in sec.
+# Transitions and shutdown flush regardless of this
+pulse_flush_interval = 60
+
+# Commands the persistence worker holds before it starts dropping pulses
+persistence_queue_size = 1000
+
+# Bytes of serialized past-week dashboard responses kept in memory
+week_cache_max_bytes = 32 * 1024 * 1024
+
+# Dashboard reads get their own pool, so a big week read can't hold up the pulse writes
+read_pool_size = 3
+read_pool_max_overflow = 2
+read_pool_timeout = 10  # Sec a dashboard request waits for a free connection
+read_statement_timeout_ms = 15000
+
+# Raw mouse, keyboard and timeline rows are dropped a month at a time once they're
+# this old, and precomputed_timelines has their days
+raw_event_retention_days = 90
+# Months of partitions made ahead of time, so no row lands in the default one
+partition_months_ahead = 2
+
+# Batches of peripheral messages the receiver holds before its overflow policy kicks in
+message_queue_max_batches = 1000
+message_overflow_policy = "drop_oldest"  # Or "drop_newest", or "block" to stop reading
+message_max_drain = 1000  # Most messages read off the socket per wakeup
 
 no_space_dash_space = "No space-dash-space combo found"
 
@@ -0,0 +1,149 @@
+from sqlalchemy import and_, delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker
+
+from datetime import date
+
+from typing import Dict, List, Tuple
+
+from activitytracker.config.definitions import (
+    productive_apps,
+    productive_sites,
+    social_media,
+    unproductive_apps,
+)
+from activitytracker.db.dao.utility_dao_mixin import UtilityDaoMixin
+from activitytracker.db.models import (
+    ActivityCategory,
+    DailyDomainSummary,
+    DailyProgramSummary,
+)
+from activitytracker.object.enums import ActivityKind, ProductivityCategory
+from activitytracker.tz_handling.time_formatting import (
+    add_local_days,
+    get_start_of_day_from_datetime,
+)
+from activitytracker.util.console_logger import ConsoleLogger
+from activitytracker.util.time_wrappers import UserLocalTime
+
+# Chrome's time is counted per domain, so counting the program too would count it twice.
+# Alt-tab window is the task switcher, bugged outputs
+ignored_programs = ["Google Chrome", "Alt-tab window"]
+
+
+def default_categories() -> Dict[Tuple[ActivityKind, str], ProductivityCategory]:
+    """The rules that used to be hardcoded in config/definitions.py"""
+    rules = {}
+    for name in productive_apps:
+        rules[(ActivityKind.PROGRAM, name)] = ProductivityCategory.PRODUCTIVE
+    for name in unproductive_apps:
+        rules[(ActivityKind.PROGRAM, name)] = ProductivityCategory.LEISURE
+    for name in ignored_programs:
+        rules[(ActivityKind.PROGRAM, name)] = ProductivityCategory.IGNORED
+    for name in social_media:
+        rules[(ActivityKind.DOMAIN, name)] = ProductivityCategory.LEISURE
+    for name in productive_sites:
+        rules[(ActivityKind.DOMAIN, name)] = ProductivityCategory.PRODUCTIVE
+    return rules
+
+
+class ActivityCategoryDao(UtilityDaoMixin):
+    """
+    The productive / leisure / ignored rules, and the weekly breakdown that joins on them.
+    """
+
+    def __init__(self, regular_session_maker: sessionmaker):
+        self.regular_session = regular_session_maker
+        self.logger = ConsoleLogger()
+
+    def seed_defaults(self) -> int:
+        """Adds the default rules, never overwriting an edited one. Returns rows added"""
+        rows = [
+            {"kind": kind, "name": name, "category": category}
+            for (kind, name), category in default_categories().items()
+        ]
+        statement = pg_insert(ActivityCategory).values(rows).on_conflict_do_nothing()
+        return self.execute_update(statement)
+
+    def set_category(
+        self, kind: ActivityKind, name: str, category: ProductivityCategory
+    ) -> int:
+        statement = (
+            pg_insert(ActivityCategory)
+            .values(kind=kind, name=name, category=category)
+            .on_conflict_do_update(
+                constraint="uq_activity_category", set_={"category": category}
+            )
+            .returning(ActivityCategory.id)
+        )
+        with self.regular_session() as db_session:
+            row_id = db_session.execute(statement).scalar_one()
+            db_session.commit()
+            return row_id
+
+    def read_all(self) -> List[ActivityCategory]:
+        query = select(ActivityCategory).order_by(
+            ActivityCategory.kind, ActivityCategory.name
+        )
+        return self.execute_and_return_all(query)
+
+    def delete_category(self, kind: ActivityKind, name: str) -> int:
+        """Back to the default, leisure"""
+        return self.execute_update(
+            delete(ActivityCategory).where(
+                ActivityCategory.kind == kind, ActivityCategory.name == name
+            )
+        )
+
+    def build_week_breakdown_query(self, starting_sunday: UserLocalTime):
+        week_start = get_start_of_day_from_datetime(starting_sunday.dt)
+        week_end = add_local_days(week_start, 7)
+
+        def usage_of(model, kind: ActivityKind, name_column):
+            # gathering_date_local is the user's midnight, so its date is the user's day
+            return (
+                select(
+                    func.date(model.gathering_date_local).label("day"),
+                    ActivityCategory.category.label("category"),
+                    model.hours_spent.label("hours_spent"),
+                )
+                .select_from(model)
+                .outerjoin(
+                    ActivityCategory,
+                    and_(
+                        ActivityCategory.kind == kind,
+                        ActivityCategory.name == name_column,
+                    ),
+                )
+                .where(model.gathering_date >= week_start, model.gathering_date < week_end)
+            )
+
+        programs = usage_of(
+            DailyProgramSummary, ActivityKind.PROGRAM, DailyProgramSummary.program_name
+        )
+        domains = usage_of(
+            DailyDomainSummary, ActivityKind.DOMAIN, DailyDomainSummary.domain_name
+        )
+        usage = union_all(programs, domains).subquery()
+
+        return select(usage.c.day, usage.c.category, func.sum(usage.c.hours_spent)).group_by(
+            usage.c.day, usage.c.category
+        )
+
+    def read_week_breakdown(
+        self, starting_sunday: UserLocalTime
+    ) -> Dict[date, Dict[ProductivityCategory, float]]:
+        """
+        Hours per category for each day of the week, in one grouped query.
+        Days with nothing recorded are left out.
+        """
+        with self.regular_session() as db_session:
+            rows = db_session.execute(self.build_week_breakdown_query(starting_sunday)).all()
+
+        breakdown: Dict[date, Dict[ProductivityCategory, float]] = {}
+        for day, category, hours in rows:
+            if category is None:
+                category = ProductivityCategory.LEISURE  # No rule for it
+            totals = breakdown.setdefault(day, {})
+            totals[category] = totals.get(category, 0) + float(hours)
+        return breakdown
@@ -5,9 +5,9 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 
-from typing import List
+from typing import Dict, List
 
 from activitytracker.config.definitions import (
     keep_alive_cycle_length,
@@ -37,24 +37,29 @@ class ChromeSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         self.regular_session = regular_session
         self.logger = ConsoleLogger()
         self.model = DailyDomainSummary
+        self.unique_columns = ["domain_name", "gathering_date"]
 
-    def start_session(self, chrome_session: ChromeSession):
+    def start_session(self, chrome_session: ChromeSession) -> int:
+        """Creates today's summary, or finds the one already there. Returns its id."""
         target_domain_name = chrome_session.domain
 
-        self._create(target_domain_name, chrome_session.start_time.dt)
+        return self._create(target_domain_name, chrome_session.start_time.dt)
 
-    def _create(self, target_domain_name, start_time_dt: datetime):
+    def _create(self, target_domain_name, start_time_dt: datetime, seconds=0) -> int:
         # self.logger.log_white(
         #     f"[info] creating for {target_domain_name} with duration {duration_in_hours * SECONDS_PER_HOUR}")
         today = get_start_of_day_from_datetime(start_time_dt)  # Still has tz attached
 
         new_entry = DailyDomainSummary(
             domain_name=target_domain_name,
-            hours_spent=0,
+            hours_spent=seconds / SECONDS_PER_HOUR,
             gathering_date=today,
             gathering_date_local=start_time_dt.replace(tzinfo=None),
         )
-        self.add_new_item(new_entry)
+        return self.upsert_summary(new_entry)
+
+    def upsert_time(self, session: ChromeSession, seconds: int | float) -> int:
+        return self._create(session.domain, session.start_time.dt, seconds)
 
     def find_todays_entry_for_domain(
         self, chrome_session: ChromeSession
@@ -85,6 +90,12 @@ class ChromeSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         """Read all entries for the given day."""
         return self.do_read_day(day)  # type: ignore
 
+    def read_week(
+        self, starting_sunday: UserLocalTime
+    ) -> Dict[date, List[DailyDomainSummary]]:
+        """The seven days from starting_sunday, keyed by the user's local date"""
+        return self.do_read_week(starting_sunday)
+
     def read_all(self) -> List[DailyDomainSummary]:
         """Read all entries."""
         query = select(DailyDomainSummary)
@@ -96,14 +107,16 @@ class ChromeSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
 
         NOTE: This only ever happens after start_session
         """
-        today_start = get_start_of_day_from_datetime(chrome_session.start_time.dt)
-        query = self.select_where_time_equals_for_session(today_start, chrome_session.domain)
-        self.execute_window_push(query, chrome_session.domain, chrome_session.start_time.dt)
+        if chrome_session.handles.summary_id is not None:
+            self.add_hours_by_handle(chrome_session, window_push_length)
+            return
 
-    def select_where_time_equals_for_session(self, some_time, target_domain):
-        return select(DailyDomainSummary).where(
-            DailyDomainSummary.gathering_date.op("=")(some_time),
-            DailyDomainSummary.domain_name == target_domain,
+        self.upsert_time(chrome_session, window_push_length)
+
+    def build_window_push(self, session: ChromeSession, seconds: int | float):
+        """Same row as push_window_ahead_ten_sec, but as one atomic UPDATE"""
+        return self.build_hours_increment(
+            session, DailyDomainSummary.domain_name == session.domain, seconds
         )
 
     def add_used_time(self, session: ChromeSession, duration_in_sec: int):
@@ -112,9 +125,7 @@ class ChromeSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
 
         9 times out of 10. So we add  the used  duration from its hours_spent.
         """
-        self.add_partial_window(
-            session, duration_in_sec, DailyDomainSummary.domain_name == session.domain
-        )
+        self.add_partial_window(session, duration_in_sec)
 
     def shutdown(self):
         """Closes the open session without opening a new one"""
@@ -0,0 +1,121 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from datetime import date
+
+from typing import List, Set, Tuple
+
+from activitytracker.db.models import Base, PrecomputedTimelineDay
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.console_logger import ConsoleLogger
+from activitytracker.util.partitions import (
+    default_partition_name,
+    month_bounds,
+    month_of_partition,
+    partition_name,
+    partitioned_tables,
+)
+
+
+class PartitionDao:
+    """
+    Makes and drops the monthly partitions of the raw event tables. DDL can't take
+    identifiers as params, but the names only ever come from partitioned_tables
+    """
+
+    def __init__(self, async_session_maker: async_sessionmaker):
+        self.async_session_maker = async_session_maker
+        self.logger = ConsoleLogger()
+
+    async def read_months(self, table: str) -> List[date]:
+        query = text(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = :table
+            """
+        )
+        async with self.async_session_maker() as session:
+            names = (await session.execute(query, {"table": table})).scalars().all()
+        months = [month_of_partition(table, name) for name in names]
+        return sorted(month for month in months if month is not None)
+
+    async def create_month(self, table: str, month: date) -> bool:
+        """
+        False if it already existed. Rows the default partition took for the month
+        are moved into it, since Postgres won't make it while they're there
+        """
+        column, _ = partitioned_tables[table]
+        name = partition_name(table, month)
+        default = default_partition_name(table)
+        start, end = month_bounds(month)
+        in_month = {"start": start, "end": end}
+        async with self.async_session_maker() as session:
+            async with session.begin():
+                exists = await session.execute(
+                    text("SELECT to_regclass(:name)"), {"name": name}
+                )
+                if exists.scalar() is not None:
+                    return False
+                stranded = await session.execute(
+                    text(
+                        f'SELECT EXISTS (SELECT 1 FROM "{default}" '
+                        f'WHERE "{column}" >= :start AND "{column}" < :end)'
+                    ),
+                    in_month,
+                )
+                has_stranded_rows = stranded.scalar()
+                if has_stranded_rows:
+                    await session.execute(
+                        text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+                    )
+                await session.execute(
+                    text(
+                        f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                    )
+                )
+                if has_stranded_rows:
+                    await self._move_stranded_rows(session, table, column, default, in_month)
+        self.logger.log_purple(f"[partitions] created {name}")
+        return True
+
+    async def _move_stranded_rows(self, session, table, column, default, in_month):
+        # Generated columns can't be inserted into, so they're left to recompute
+        columns = ", ".join(
+            f'"{c.name}"' for c in Base.metadata.tables[table].columns if c.computed is None
+        )
+        in_range = f'"{column}" >= :start AND "{column}" < :end'
+        await session.execute(
+            text(
+                f'INSERT INTO "{table}" ({columns}) '
+                f'SELECT {columns} FROM "{default}" WHERE {in_range}'
+            ),
+            in_month,
+        )
+        await session.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'), in_month)
+        await session.execute(
+            text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+        )
+
+    async def drop_month(self, table: str, month: date):
+        name = partition_name(table, month)
+        async with self.async_session_maker() as session:
+            async with session.begin():
+                await session.execute(
+                    text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                )
+                await session.execute(text(f'DROP TABLE "{name}"'))
+        self.logger.log_purple(f"[partitions] dropped {name}")
+
+    async def read_precomputed_markers(
+        self, first_day: date, last_day: date
+    ) -> Set[Tuple[date, ChartEventType]]:
+        """Which (day, group)s precomputed_timelines has. Both ends inclusive"""
+        query = select(PrecomputedTimelineDay.day, PrecomputedTimelineDay.group).where(
+            PrecomputedTimelineDay.day >= first_day,
+            PrecomputedTimelineDay.day <= last_day,
+        )
+        async with self.async_session_maker() as session:
+            return {(day, group) for day, group in (await session.execute(query)).all()}
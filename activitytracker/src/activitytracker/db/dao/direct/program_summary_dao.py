@@ -3,9 +3,9 @@ from sqlalchemy import func, select, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql.selectable import Select
 
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 
-from typing import List
+from typing import Dict, List
 
 from activitytracker.config.definitions import (
     keep_alive_cycle_length,
@@ -37,12 +37,13 @@ class ProgramSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         self.regular_session = reg_session
         self.logger = ConsoleLogger()
         self.model = DailyProgramSummary
+        self.unique_columns = ["exe_path_as_id", "gathering_date"]
 
-    def start_session(self, program_session: ProgramSession):
-        """Creating the initial session for the summary"""
-        self._create(program_session, program_session.start_time.dt)
+    def start_session(self, program_session: ProgramSession) -> int:
+        """Creates today's summary, or finds the one already there. Returns its id."""
+        return self._create(program_session, program_session.start_time.dt)
 
-    def _create(self, session: ProgramSession, start_time: datetime):
+    def _create(self, session: ProgramSession, start_time: datetime, seconds=0) -> int:
         # self.logger.log_white("[debug] creating session: " + session.exe_path
         today_start = get_start_of_day_from_datetime(start_time)
 
@@ -50,11 +51,14 @@ class ProgramSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
             exe_path_as_id=session.exe_path,
             program_name=session.window_title,
             process_name=session.process_name,
-            hours_spent=0,
+            hours_spent=seconds / SECONDS_PER_HOUR,
             gathering_date=today_start,
             gathering_date_local=today_start.replace(tzinfo=None),
         )
-        self.add_new_item(new_entry)
+        return self.upsert_summary(new_entry)
+
+    def upsert_time(self, session: ProgramSession, seconds: int | float) -> int:
+        return self._create(session, session.start_time.dt, seconds)
 
     def find_todays_entry_for_program(
         self, program_session: ProgramSession
@@ -86,6 +90,12 @@ class ProgramSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         """Read all entries for the given day."""
         return self.do_read_day(day)
 
+    def read_week(
+        self, starting_sunday: UserLocalTime
+    ) -> Dict[date, List[DailyProgramSummary]]:
+        """The seven days from starting_sunday, keyed by the user's local date"""
+        return self.do_read_week(starting_sunday)
+
     def read_all(self) -> List[DailyProgramSummary]:
         """Read all entries."""
         query = select(DailyProgramSummary)
@@ -102,19 +112,16 @@ class ProgramSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         if program_session is None:
             raise ValueError("Session should not be None")
 
-        today_start = get_start_of_day_from_datetime(program_session.start_time.dt)
-        query = self.select_where_time_equals_for_session(
-            today_start, program_session.exe_path
-        )
+        if program_session.handles.summary_id is not None:
+            self.add_hours_by_handle(program_session, window_push_length)
+            return
 
-        self.execute_window_push(
-            query, program_session.exe_path, program_session.start_time.dt
-        )
+        self.upsert_time(program_session, window_push_length)
 
-    def select_where_time_equals_for_session(self, some_time, target_exe_path):
-        return select(DailyProgramSummary).where(
-            DailyProgramSummary.exe_path_as_id == target_exe_path,
-            DailyProgramSummary.gathering_date.op("=")(some_time),
+    def build_window_push(self, session: ProgramSession, seconds: int | float):
+        """Same row as push_window_ahead_ten_sec, but as one atomic UPDATE"""
+        return self.build_hours_increment(
+            session, DailyProgramSummary.exe_path_as_id == session.exe_path, seconds
         )
 
     def add_used_time(self, session: ProgramSession, duration_in_sec: int):
@@ -123,9 +130,7 @@ class ProgramSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
 
         9 times out of 10. So we add  the used  duration from its hours_spent.
         """
-        self.add_partial_window(
-            session, duration_in_sec, DailyProgramSummary.exe_path_as_id == session.exe_path
-        )
+        self.add_partial_window(session, duration_in_sec)
 
     async def shutdown(self):
         """Closes the open session without opening a new one"""
@@ -29,6 +29,7 @@ from activitytracker.util.console_logger import ConsoleLogger
 from activitytracker.util.const import SECONDS_PER_HOUR
 from activitytracker.util.errors import ImpossibleToGetHereError, NegativeTimeError
 from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.week_response_cache import get_week_response_cache
 
 # TODO: I think I do want all Pokemon grouped under Pokemon.
 # Even better would be [Show] - [Series].
@@ -42,15 +43,16 @@ class VideoSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         self.regular_session = reg_session
         self.logger = ConsoleLogger()
         self.model = DailyVideoSummary
+        self.unique_columns = ["video_id", "gathering_date"]
 
-    def start_session(self, video_session: VideoSession):
-        """Creating the initial session for the summary
+    def start_session(self, video_session: VideoSession) -> int:
+        """Creates today's summary, or finds the one already there. Returns its id.
 
         Remember that Video is double counted on purpose!
         """
-        self._create(video_session, video_session.start_time.dt)
+        return self._create(video_session, video_session.start_time.dt)
 
-    def _create(self, session: VideoSession, start_time: datetime):
+    def _create(self, session: VideoSession, start_time: datetime, seconds=0) -> int:
         # self.logger.log_white("[debug] creating session: " + session.media_name
         today_start = get_start_of_day_from_datetime(start_time)
 
@@ -61,18 +63,21 @@ class VideoSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         )
 
         new_entry = DailyVideoSummary(
-            media_id=session.video_info.video_id,
+            video_id=session.video_info.video_id,
             media_name=session.media_title,
             channel_name=channel_name,
             platform=session.video_info.get_platform_title(),
             # TODO: If YouTube, insert the channel name.
             # If Netflix, insert the movie name or series title.
             # If VLC, insert the movie name or series title.
-            hours_spent=0,
+            hours_spent=seconds / SECONDS_PER_HOUR,
             gathering_date=today_start,
             gathering_date_local=today_start.replace(tzinfo=None),
         )
-        self.add_new_item(new_entry)
+        return self.upsert_summary(new_entry)
+
+    def upsert_time(self, session: VideoSession, seconds: int | float) -> int:
+        return self._create(session, session.start_time.dt, seconds)
 
     def find_netflix_media_by_id(self, media_id: str):
         # TODO: Find entries more recent than three months. Because Netflix IDs change
@@ -133,9 +138,14 @@ class VideoSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
             )
 
             if mystery_media:
+                touched_days = set()
                 for media in mystery_media:
                     media.media_name = discovered_media_title
+                    if media.gathering_date_local is not None:
+                        touched_days.add(media.gathering_date_local.date())
                 db_session.commit()
+                # A late write: the title may land in a week that's already cached
+                get_week_response_cache().invalidate_days(touched_days)
             else:
                 # Log or handle the case where no record is found
                 self.logger.log_white(
@@ -151,19 +161,16 @@ class VideoSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
         if video_session is None:
             raise ValueError("Session should not be None")
 
-        today_start = get_start_of_day_from_datetime(video_session.start_time.dt)
-        query = self.select_where_time_equals_for_session(
-            today_start, video_session.media_title
-        )
+        if video_session.handles.summary_id is not None:
+            self.add_hours_by_handle(video_session, window_push_length)
+            return
 
-        self.execute_window_push(
-            query, video_session.media_title, video_session.start_time.dt
-        )
+        self.upsert_time(video_session, window_push_length)
 
-    def select_where_time_equals_for_session(self, some_time, media_title):
-        return select(DailyVideoSummary).where(
-            DailyVideoSummary.media_name == media_title,
-            DailyVideoSummary.gathering_date.op("=")(some_time),
+    def build_window_push(self, session: VideoSession, seconds: int | float):
+        """Same row as push_window_ahead_ten_sec, but as one atomic UPDATE"""
+        return self.build_hours_increment(
+            session, DailyVideoSummary.video_id == session.video_info.video_id, seconds
         )
 
     def add_used_time(self, session: VideoSession, duration_in_sec: int):
@@ -172,9 +179,7 @@ class VideoSummaryDao(SummaryDaoMixin, UtilityDaoMixin):
 
         9 times out of 10. So we add  the used  duration from its hours_spent.
         """
-        self.add_partial_window(
-            session, duration_in_sec, DailyVideoSummary.media_name == session.media_title
-        )
+        self.add_partial_window(session, duration_in_sec)
 
     async def shutdown(self):
         """Closes the open session without opening a new one"""
@@ -1,9 +1,9 @@
-from sqlalchemy import or_, select
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import DeclarativeMeta
 
-from datetime import timedelta
+from datetime import date, timedelta
 
-from typing import Callable, Type, TypeVar
+from typing import Callable, Dict, Type, TypeVar
 
 from activitytracker.db.models import (
     DomainSummaryLog,
@@ -11,7 +11,9 @@ from activitytracker.db.models import (
     VideoSummaryLog,
 )
 from activitytracker.tz_handling.time_formatting import (
+    add_local_days,
     attach_tz_to_all,
+    bucket_by_local_day,
     convert_to_utc,
     get_start_of_day_from_datetime,
     get_start_of_day_from_ult,
@@ -45,22 +47,82 @@ class LoggingDaoMixin:
 
         return grouped_logs
 
+    def _read_week_as_sorted(
+        self, starting_sunday: UserLocalTime, model: Type[T], sort_column
+    ) -> Dict[date, dict[str, T]]:
+        """Like _read_day_as_sorted, for all seven days at once, in one query"""
+        week_start = get_start_of_day_from_datetime(starting_sunday.get_dt_for_db())
+        week_end = add_local_days(week_start, 7)
+
+        query = (
+            select(model)
+            .where(
+                model.gathering_date >= convert_to_utc(week_start),
+                model.gathering_date < convert_to_utc(week_end),
+            )
+            .order_by(sort_column)
+        )
+
+        logs = attach_tz_to_all(self.execute_and_return_all(query), week_start.tzinfo)
+        days = bucket_by_local_day(
+            logs, week_start.date(), week_start.tzinfo, lambda log: log.gathering_date
+        )
+        return {day: group_logs_by_name(days_logs) for day, days_logs in days.items()}
+
     def attach_final_values_and_update(
         self, session, log: ProgramSummaryLog | DomainSummaryLog | VideoSummaryLog
     ):
+        final_values = self.get_final_values(session, log)
+
+        # Replace whatever used to be there
+        log.duration_in_sec = final_values["duration_in_sec"]
+        log.end_time = final_values["end_time"]
+        log.end_time_local = final_values["end_time_local"]
+        self.update_item(log)
+
+    def get_final_values(self, session, log=None) -> dict:
         finalized_duration = (session.end_time.dt - session.start_time.dt).total_seconds()
         if finalized_duration < 0:
 
             print("session:", session)
             print("log", log)
             raise ImpossibleToGetHereError("A negative duration is impossible")
-        discovered_final_val = convert_to_utc(session.end_time.get_dt_for_db())
-
-        # Replace whatever used to be there
-        log.duration_in_sec = finalized_duration
-        log.end_time = discovered_final_val
-        log.end_time_local = session.end_time.dt
-        self.update_item(log)
+        return {
+            "duration_in_sec": finalized_duration,
+            "end_time": convert_to_utc(session.end_time.get_dt_for_db()),
+            "end_time_local": session.end_time.dt,
+        }
+
+    def finalize_by_handle(self, session):
+        """Same as attach_final_values_and_update, but one UPDATE by primary key"""
+        statement = (
+            update(self.model)
+            .where(self.model.id == session.handles.log_id)
+            .values(**self.get_final_values(session))
+        )
+        if self.execute_update(statement) == 0:
+            raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
+
+    def push_window_by_handle(self, session, seconds: int | float):
+        if self.execute_update(self.build_window_push(session, seconds)) == 0:
+            raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
+
+    def where_this_log(self, session):
+        """By primary key if the session carries its handle, else by start_time like before"""
+        if session.handles.log_id is not None:
+            return self.model.id == session.handles.log_id
+        if session.start_time is None:
+            raise ValueError("Start time was None")
+        start_time_as_utc = convert_to_utc(session.start_time.get_dt_for_db())
+        return self.model.start_time == start_time_as_utc
+
+    def build_window_push(self, session, seconds: int | float):
+        """Atomic UPDATE for the pulse accumulator. No need to read the row first."""
+        return (
+            update(self.model)
+            .where(self.where_this_log(session))
+            .values(end_time=self.model.end_time + timedelta(seconds=seconds))
+        )
 
     def do_read_last_24_hrs(self, right_now: UserLocalTime):
         """Fetch all program log entries from the last 24 hours
@@ -7,6 +7,7 @@ from datetime import date, datetime, timedelta, timezone
 
 from typing import List
 
+from activitytracker.config.definitions import window_push_length
 from activitytracker.db.dao.logging_dao_mixin import LoggingDaoMixin
 from activitytracker.db.dao.utility_dao_mixin import UtilityDaoMixin
 from activitytracker.db.models import DomainSummaryLog, ProgramSummaryLog
@@ -51,7 +52,7 @@ class ChromeLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         self.logger = ConsoleLogger()
         self.model = DomainSummaryLog
 
-    def start_session(self, session: ChromeSession):
+    def start_session(self, session: ChromeSession) -> int:
         """
         A session of using a domain. End_time here is like, "when did the user tab away from the program?"
         """
@@ -72,7 +73,7 @@ class ChromeLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
             gathering_date_local=initializer.start_of_day_as_utc.replace(tzinfo=None),
             created_at=initializer.base_start_time_as_utc,
         )
-        self.add_new_item(log_entry)
+        return self.add_new_item(log_entry)
 
     def find_session(self, session: ChromeSession):
         """Is finding it by time! Looking for the one, specifically, with the arg's time"""
@@ -102,6 +103,9 @@ class ChromeLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         return self.do_read_last_24_hrs(right_now)
 
     def push_window_ahead_ten_sec(self, session: ChromeSession):
+        if session.handles.log_id is not None:
+            self.push_window_by_handle(session, window_push_length)
+            return
         log: DomainSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -113,6 +117,9 @@ class ChromeLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         Overwrite value from the pulse. Expect something to ALWAYS be in the db already at this point.
         Note that if the computer was shutdown, this method is never called, and the rough estimate is kept.
         """
+        if session.handles.log_id is not None:
+            self.finalize_by_handle(session)
+            return
         log: DomainSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -1,10 +1,11 @@
-from sqlalchemy import or_, select
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import sessionmaker
 
 from datetime import date, datetime, timedelta, timezone
 
-from typing import List
+from typing import Dict, List
 
+from activitytracker.config.definitions import window_push_length
 from activitytracker.db.dao.logging_dao_mixin import LoggingDaoMixin
 from activitytracker.db.dao.utility_dao_mixin import UtilityDaoMixin
 from activitytracker.db.models import ProgramSummaryLog
@@ -48,7 +49,7 @@ class ProgramLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         self.logger = ConsoleLogger()
         self.model = ProgramSummaryLog
 
-    def start_session(self, session: ProgramSession):
+    def start_session(self, session: ProgramSession) -> int:
         """
         A session of using a domain. End_time here is like, "when did the user tab away from the program?"
         """
@@ -77,7 +78,7 @@ class ProgramLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
             created_at=initializer.base_start_time_as_utc,
         )
         # self.do_add_entry(log_entry)
-        self.add_new_item(log_entry)
+        return self.add_new_item(log_entry)
 
     def find_session(self, session: ProgramSession) -> ProgramSummaryLog | None:
         """Is finding it by time! Looking for the one, specifically, with the arg's time"""
@@ -99,6 +100,13 @@ class ProgramLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
             day, ProgramSummaryLog, ProgramSummaryLog.program_name
         )
 
+    def read_week_as_sorted(
+        self, starting_sunday: UserLocalTime
+    ) -> Dict[date, dict[str, ProgramSummaryLog]]:
+        return self._read_week_as_sorted(
+            starting_sunday, ProgramSummaryLog, ProgramSummaryLog.program_name
+        )
+
     def read_all(self) -> List[ProgramSummaryLog]:
         """Fetch all program log entries"""
         query = select(ProgramSummaryLog)
@@ -138,6 +146,9 @@ class ProgramLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
     def push_window_ahead_ten_sec(self, session: ProgramSession):
         if session is None:
             raise ValueError("Session was None")
+        if session.handles.log_id is not None:
+            self.push_window_by_handle(session, window_push_length)
+            return
         log: ProgramSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -145,8 +156,22 @@ class ProgramLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         log.end_time = log.end_time + timedelta(seconds=10)
         self.update_item(log)
 
+    def build_window_push(self, session: ProgramSession, seconds: int | float):
+        """Program logs also keep a running duration_in_sec, so push that too"""
+        return (
+            update(ProgramSummaryLog)
+            .where(self.where_this_log(session))
+            .values(
+                duration_in_sec=ProgramSummaryLog.duration_in_sec + seconds,
+                end_time=ProgramSummaryLog.end_time + timedelta(seconds=seconds),
+            )
+        )
+
     def finalize_log(self, session: CompletedProgramSession):
         """Overwrite value from the pulse. Expect something to ALWAYS be in the db already at this point."""
+        if session.handles.log_id is not None:
+            self.finalize_by_handle(session)
+            return
         log: ProgramSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -1,23 +1,54 @@
 # timeline_entry_dao.py
-from sqlalchemy import select, func
+from sqlalchemy import BigInteger, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, time, timedelta, timezone
 
-from typing import List
+from typing import Dict, List
 
 from activitytracker.db.dao.base_dao import BaseQueueingDao
-from activitytracker.db.models import TimelineEntryObj, PrecomputedTimelineEntry
+from activitytracker.db.models import (
+    PrecomputedTimelineDay,
+    PrecomputedTimelineEntry,
+    TimelineEntryObj,
+)
 from activitytracker.object.classes import KeyboardAggregate, MouseMoveWindow
 from activitytracker.object.enums import ChartEventType
+from activitytracker.tz_handling.time_formatting import (
+    add_local_days,
+    bucket_by_local_day,
+)
 from activitytracker.util.console_logger import ConsoleLogger
-from activitytracker.util.timeline_event_aggregator import aggregate_timeline_events
+from activitytracker.util.live_timeline import LiveTimeline
 from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.timeline_event_aggregator import (
+    aggregate_timeline_events,
+    epochs_of_rows,
+)
+
+
+def timeline_columns(model):
+    """
+    Only what the client sees. Selecting these instead of the model skips ORM hydration.
+    The rows still have .start, .group etc., so the aggregator and the routes don't mind
+    """
+    return (model.clientFacingId, model.group, model.content, model.start, model.end)
+
+
+def epoch_us(column):
+    """Microseconds since the epoch, worked out by Postgres instead of per row in Python"""
+    return cast(func.extract("epoch", column) * 1_000_000, BigInteger)
 
 
 class TimelineEntryDao(BaseQueueingDao):
     def __init__(
-        self, async_session_maker: async_sessionmaker, batch_size=100, flush_interval=1
+        self,
+        async_session_maker: async_sessionmaker,
+        batch_size=100,
+        flush_interval=1,
+        read_session_maker: async_sessionmaker | None = None,
+        live_timeline: LiveTimeline | None = None,
     ):
         super().__init__(
             async_session_maker=async_session_maker,
@@ -25,9 +56,71 @@ class TimelineEntryDao(BaseQueueingDao):
             flush_interval=flush_interval,
             dao_name="TimelineEntry",
         )
+        # Reads can go to the read-only pool. Precomputing still writes through the other
+        self.read_session_maker = read_session_maker or async_session_maker
+        # Today, merged in memory. The writer feeds it, the readers serve from it
+        self.live_timeline = live_timeline
 
         self.logger = ConsoleLogger()
 
+    async def _save_batch_to_db(self, batch):
+        await super()._save_batch_to_db(batch)
+        if self.live_timeline is not None:
+            # Only once they're committed, and so have their ids
+            self.live_timeline.add_rows(batch)
+
+    async def load_live_timeline(self, day: UserLocalTime):
+        """The day so far, from the db. From then on the writes keep it up to date"""
+        start_of_day = datetime.combine(day.dt.date(), datetime.min.time())
+        end_of_day = start_of_day + timedelta(days=1)
+        query = select(
+            TimelineEntryObj.id,
+            TimelineEntryObj.group,
+            TimelineEntryObj.start,
+            TimelineEntryObj.end,
+        ).where(TimelineEntryObj.start >= start_of_day, TimelineEntryObj.start < end_of_day)
+        self.live_timeline.start_loading()
+        try:
+            # The writer's pool: a lagging replica could miss a row written just before
+            async with self.async_session_maker() as session:
+                rows = (await session.execute(query)).all()
+        except Exception:
+            self.live_timeline.cancel_loading()
+            raise
+        self.live_timeline.finish_loading(day.date(), rows)
+        return len(rows)
+
+    def is_live(self, day: UserLocalTime, event_type: ChartEventType) -> bool:
+        return self.live_timeline is not None and self.live_timeline.has_day(
+            day.date(), event_type
+        )
+
+    async def read_today(self, day: UserLocalTime, event_type: ChartEventType):
+        """Already merged, from memory, if the live timeline has it. Else the raw rows"""
+        if self.is_live(day, event_type):
+            return self.live_timeline.entries(day.date(), event_type)
+        return await self.read_day(day, event_type)
+
+    async def read_today_since(
+        self,
+        day: UserLocalTime,
+        event_type: ChartEventType,
+        after_id: int | None = None,
+        watermark: datetime | None = None,
+    ):
+        """None means the cursor is too old for a delta, and the client needs it all again"""
+        if self.is_live(day, event_type):
+            return self.live_timeline.changes_since(
+                day.date(), event_type, after_id, watermark
+            )
+        return await self.read_day_since(day, event_type, after_id, watermark)
+
+    async def read_timeline_cursor(self, day: UserLocalTime) -> int:
+        if self.is_live(day, ChartEventType.MOUSE):
+            # What's been merged. The db can be a row ahead of it, mid-batch
+            return self.live_timeline.highest_id
+        return await self.read_highest_id()
+
     async def create_from_keyboard_aggregate(self, content: KeyboardAggregate):
         group = ChartEventType.KEYBOARD
         new_row = TimelineEntryObj(
@@ -49,9 +142,19 @@ class TimelineEntryDao(BaseQueueingDao):
     async def create(self, new_row: TimelineEntryObj):
         await self.queue_item(new_row, TimelineEntryObj)
 
-    async def create_precomputed_day(self, days_events):
+    async def create_precomputed_day(
+        self,
+        days_events,
+        day: UserLocalTime | None = None,
+        event_type: ChartEventType | None = None,
+        epochs_us=None,
+    ):
+        """
+        With a day and event_type, the day is also marked as done.
+        See PrecomputedTimelineDay
+        """
         # ### aggregate them
-        aggregated = aggregate_timeline_events(days_events)
+        aggregated = aggregate_timeline_events(days_events, epochs_us=epochs_us)
 
         # ### store them into the db
         rows = []
@@ -75,11 +178,137 @@ class TimelineEntryDao(BaseQueueingDao):
             )
 
             rows.append(row)
-        await self.bulk_create_precomputed(rows)
+        if day is None or event_type is None:
+            await self.bulk_create_precomputed(rows)
+            return rows
+        stored = await self.store_precomputed_day(rows, day, event_type, len(days_events))
+        if not stored:
+            # Someone else precomputed it in the meantime. Theirs is the one in the db
+            return await self.read_precomputed_entry_for_day(day, event_type)
 
         # return the stored values
         return rows
 
+    async def store_precomputed_day(
+        self,
+        rows: List[PrecomputedTimelineEntry],
+        day: UserLocalTime,
+        event_type: ChartEventType,
+        source_event_count: int,
+        entry_count: int | None = None,
+    ) -> bool:
+        """
+        Entries and their marker in one transaction. The marker insert goes first,
+        so when two runs race, the loser adds nothing and gets False.
+        """
+        claim = (
+            pg_insert(PrecomputedTimelineDay)
+            .values(
+                day=day.date(),
+                group=event_type,
+                source_event_count=source_event_count,
+                entry_count=len(rows) if entry_count is None else entry_count,
+            )
+            .on_conflict_do_nothing(index_elements=["day", "group"])
+            .returning(PrecomputedTimelineDay.id)
+        )
+        async with self.async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(claim)
+                if result.scalar_one_or_none() is None:
+                    return False
+                session.add_all(rows)
+        return True
+
+    async def is_day_precomputed(
+        self, day: UserLocalTime, event_type: ChartEventType
+    ) -> bool:
+        query = select(PrecomputedTimelineDay.id).where(
+            PrecomputedTimelineDay.day == day.date(),
+            PrecomputedTimelineDay.group == event_type,
+        )
+        async with self.read_session_maker() as session:
+            result = await session.execute(query)
+            return result.scalar_one_or_none() is not None
+
+    async def read_precomputed_days(
+        self, first_day: date, last_day: date
+    ) -> List[PrecomputedTimelineDay]:
+        """Markers between the two dates, inclusive"""
+        query = (
+            select(PrecomputedTimelineDay)
+            .where(
+                PrecomputedTimelineDay.day >= first_day,
+                PrecomputedTimelineDay.day <= last_day,
+            )
+            .order_by(PrecomputedTimelineDay.day)
+        )
+        return await self.execute_and_return_all(query)
+
+    async def forget_precomputed_day(self, day: UserLocalTime, event_type: ChartEventType):
+        """Deletes a day's entries and its marker, so that it will be computed again"""
+        start_of_day = datetime.combine(day.date(), time.min)
+        end_of_day = datetime.combine(day.date(), time.max)
+        async with self.async_session_maker() as session:
+            async with session.begin():
+                await session.execute(
+                    delete(PrecomputedTimelineEntry).where(
+                        PrecomputedTimelineEntry.group == event_type,
+                        PrecomputedTimelineEntry.start >= start_of_day,
+                        PrecomputedTimelineEntry.end <= end_of_day,
+                    )
+                )
+                await session.execute(
+                    delete(PrecomputedTimelineDay).where(
+                        PrecomputedTimelineDay.day == day.date(),
+                        PrecomputedTimelineDay.group == event_type,
+                    )
+                )
+
+    async def precompute_day(self, day: UserLocalTime, event_type: ChartEventType):
+        """Aggregates one past day and stores it, marker and all"""
+        if self.is_live(day, event_type):
+            return await self.store_live_day(day, event_type)
+        # Days precomputed before the markers existed already have their entries
+        existing_entries = await self.read_precomputed_entry_for_day(day, event_type)
+        if len(existing_entries) > 0:
+            await self.store_precomputed_day(
+                [], day, event_type, 0, entry_count=len(existing_entries)
+            )
+            return existing_entries
+        read_events = await self.read_day_with_epochs(day, event_type)
+        return await self.create_precomputed_day(
+            read_events, day, event_type, epochs_of_rows(read_events)
+        )
+
+    async def store_live_day(self, day: UserLocalTime, event_type: ChartEventType):
+        """The day was merged as it happened, so there's nothing to read or aggregate"""
+        live_group = self.live_timeline.pop(day.date(), event_type)
+        rows = [
+            PrecomputedTimelineEntry(
+                clientFacingId=entry.clientFacingId,
+                group=entry.group,
+                content=entry.content,
+                start=entry.start,
+                end=entry.end,
+                eventCount=entry.eventCount,
+            )
+            for entry in live_group.merged
+        ]
+        stored = await self.store_precomputed_day(
+            rows, day, event_type, len(live_group.events)
+        )
+        if not stored:
+            return await self.read_precomputed_entry_for_day(day, event_type)
+        return rows
+
+    async def read_past_day(self, day: UserLocalTime, event_type: ChartEventType):
+        if await self.is_day_precomputed(day, event_type):
+            # Even if it's empty. An empty day is done, not missing
+            return await self.read_precomputed_entry_for_day(day, event_type)
+        # Usually the background job got here first. This is the fallback
+        return await self.precompute_day(day, event_type)
+
     async def bulk_create_precomputed(self, rows: List[PrecomputedTimelineEntry]):
         """
         Bulk insert multiple PrecomputedTimelineEntry rows in a single transaction.
@@ -94,9 +323,10 @@ class TimelineEntryDao(BaseQueueingDao):
                 await session.commit()
 
     async def read_highest_id(self):
-        """Read the highest ID currently in the table"""
+        """Read the highest ID currently in the table. It's the timeline's cursor"""
         query = select(func.max(TimelineEntryObj.id))
-        async with self.async_session_maker() as session:
+        # Same pool as the reads it's a cursor for, so it can't get ahead of them
+        async with self.read_session_maker() as session:
             result = await session.execute(query)
             max_id = result.scalar()
             return max_id or 0  # Return 0 if table is empty
@@ -107,12 +337,68 @@ class TimelineEntryDao(BaseQueueingDao):
 
         # Get end of day (just before midnight) # time.max is 23:59:59.999999
         end_of_day = datetime.combine(day.date(), time.max)
-        query = select(PrecomputedTimelineEntry).where(
+        query = select(*timeline_columns(PrecomputedTimelineEntry)).where(
             PrecomputedTimelineEntry.group == type,
             PrecomputedTimelineEntry.start >= start_of_day,
+            # Implied by the end's bound, but it gives the index scan somewhere to stop
+            PrecomputedTimelineEntry.start <= end_of_day,
             PrecomputedTimelineEntry.end <= end_of_day,
         )
-        return await self.execute_and_return_all(query)
+        return await self.execute_and_return_rows(query)
+
+    async def read_precomputed_entries_between(
+        self, first_day: date, last_day: date
+    ) -> List[PrecomputedTimelineEntry]:
+        """Both groups, both ends inclusive. Same naive day bounds as the one day version"""
+        query = (
+            select(*timeline_columns(PrecomputedTimelineEntry))
+            .where(
+                # Spelled out so the (group, start) index can be used
+                PrecomputedTimelineEntry.group.in_(list(ChartEventType)),
+                PrecomputedTimelineEntry.start >= datetime.combine(first_day, time.min),
+                PrecomputedTimelineEntry.start <= datetime.combine(last_day, time.max),
+                PrecomputedTimelineEntry.end <= datetime.combine(last_day, time.max),
+            )
+            .order_by(PrecomputedTimelineEntry.start)
+        )
+        return await self.execute_and_return_rows(query)
+
+    async def read_week(
+        self, starting_sunday: UserLocalTime, user_facing_clock
+    ) -> Dict[date, Dict[ChartEventType, list]]:
+        """
+        The week's past days come from two queries: their markers and their entries.
+        Today is read raw, as in read_day_mice, and so is a past day the background
+        job hasn't done yet. Future days are empty.
+        """
+        first_day = starting_sunday.date()
+        last_day = first_day + timedelta(days=6)
+        today = user_facing_clock.now().date()
+
+        markers = await self.read_precomputed_days(first_day, last_day)
+        done = {(marker.day, marker.group) for marker in markers}
+        entries = await self.read_precomputed_entries_between(first_day, last_day)
+        # The naive bounds are taken as UTC by the driver, so the days are UTC days
+        entries_by_day = bucket_by_local_day(
+            entries, first_day, timezone.utc, lambda entry: entry.start
+        )
+
+        week = {}
+        for days_after_sunday, (day, days_entries) in enumerate(entries_by_day.items()):
+            day_as_ult = UserLocalTime(add_local_days(starting_sunday.dt, days_after_sunday))
+            week[day] = {}
+            for event_type in ChartEventType:
+                if day > today:
+                    week[day][event_type] = []
+                elif day == today:
+                    week[day][event_type] = await self.read_today(day_as_ult, event_type)
+                elif (day, event_type) in done:
+                    week[day][event_type] = [
+                        entry for entry in days_entries if entry.group == event_type
+                    ]
+                else:
+                    week[day][event_type] = await self.precompute_day(day_as_ult, event_type)
+        return week
 
     async def read_day(
         self, day: UserLocalTime, event_type: ChartEventType
@@ -123,11 +409,44 @@ class TimelineEntryDao(BaseQueueingDao):
 
         query = self.get_find_by_day_query(start_of_day, end_of_day, event_type)
 
-        return await self.execute_and_return_all(query)
+        return await self.execute_and_return_rows(query)
+
+    async def read_day_with_epochs(self, day: UserLocalTime, event_type: ChartEventType):
+        """read_day, plus start_us and end_us columns for the aggregator"""
+        start_of_day = datetime.combine(day.dt.date(), datetime.min.time())
+        end_of_day = start_of_day + timedelta(days=1)
+
+        query = self.get_find_by_day_query(start_of_day, end_of_day, event_type).add_columns(
+            epoch_us(TimelineEntryObj.start).label("start_us"),
+            epoch_us(TimelineEntryObj.end).label("end_us"),
+        )
+        return await self.execute_and_return_rows(query)
+
+    async def read_day_since(
+        self,
+        day: UserLocalTime,
+        event_type: ChartEventType,
+        after_id: int | None = None,
+        watermark: datetime | None = None,
+    ) -> List[TimelineEntryObj]:
+        """
+        Like read_day, but only the rows the client hasn't seen. The id is exact.
+        The watermark can miss a row that sat in the queue while the watermark passed it
+        """
+        start_of_day = datetime.combine(day.dt.date(), datetime.min.time())
+        end_of_day = start_of_day + timedelta(days=1)
+
+        query = self.get_find_by_day_query(start_of_day, end_of_day, event_type)
+        if after_id is not None:
+            query = query.where(TimelineEntryObj.id > after_id)
+        if watermark is not None:
+            query = query.where(TimelineEntryObj.end >= watermark)
+
+        return await self.execute_and_return_rows(query)
 
     def get_find_by_day_query(self, start_of_day, end_of_day, event_type):
         return (
-            select(TimelineEntryObj)
+            select(*timeline_columns(TimelineEntryObj))
             .where(
                 TimelineEntryObj.start >= start_of_day,
                 TimelineEntryObj.start < end_of_day,
@@ -144,19 +463,11 @@ class TimelineEntryDao(BaseQueueingDao):
 
         if is_today:
             # Precomputed day can't exist yet
-            return await self.read_day(users_systems_day, ChartEventType.MOUSE)
+            return await self.read_today(users_systems_day, ChartEventType.MOUSE)
+        elif users_systems_day.date() > today:
+            return []  # Nothing happened yet. Don't mark it as done
         else:
-            # print(users_systems_day, " is not today mouse")
-            # return await self.read_day(day, ChartEventType.MOUSE)
-            precomputed_day_entries = await self.read_precomputed_entry_for_day(
-                users_systems_day, ChartEventType.MOUSE
-            )
-            if len(precomputed_day_entries) > 0:
-                return precomputed_day_entries
-            else:
-                read_events = await self.read_day(users_systems_day, ChartEventType.MOUSE)
-                new_precomputed_day = await self.create_precomputed_day(read_events)
-                return new_precomputed_day
+            return await self.read_past_day(users_systems_day, ChartEventType.MOUSE)
 
     async def read_day_keyboard(
         self, users_systems_day: UserLocalTime, user_facing_clock
@@ -165,21 +476,11 @@ class TimelineEntryDao(BaseQueueingDao):
         is_today = today == users_systems_day.date()
         if is_today:
             # Precomputed day can't exist yet
-            return await self.read_day(users_systems_day, ChartEventType.KEYBOARD)
+            return await self.read_today(users_systems_day, ChartEventType.KEYBOARD)
+        elif users_systems_day.date() > today:
+            return []  # Nothing happened yet. Don't mark it as done
         else:
-            # print(users_systems_day, " is not today keyboard")
-            # return await self.read_day(day, ChartEventType.KEYBOARD)
-            precomputed_day_entries = await self.read_precomputed_entry_for_day(
-                users_systems_day, ChartEventType.KEYBOARD
-            )
-
-            if len(precomputed_day_entries) > 0:
-                return precomputed_day_entries
-            else:
-                read_events = await self.read_day(users_systems_day, ChartEventType.KEYBOARD)
-                new_precomputed_day = await self.create_precomputed_day(read_events)
-
-                return new_precomputed_day
+            return await self.read_past_day(users_systems_day, ChartEventType.KEYBOARD)
 
     async def read_all(self):
         """Read all timeline entries"""
@@ -187,10 +488,16 @@ class TimelineEntryDao(BaseQueueingDao):
         return await self.execute_and_return_all(query)
 
     async def execute_and_return_all(self, query):
-        async with self.async_session_maker() as session:
+        async with self.read_session_maker() as session:
             result = await session.execute(query)
             return result.scalars().all()
 
+    async def execute_and_return_rows(self, query):
+        """Core rows, for a query that selects columns rather than a model"""
+        async with self.read_session_maker() as session:
+            result = await session.execute(query)
+            return result.all()
+
     async def delete(self, id: int):
         """Delete an entry by ID"""
         async with self.async_session_maker() as session:
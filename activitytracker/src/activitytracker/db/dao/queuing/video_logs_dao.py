@@ -7,6 +7,7 @@ from datetime import date, datetime, timedelta, timezone
 
 from typing import List
 
+from activitytracker.config.definitions import window_push_length
 from activitytracker.db.dao.logging_dao_mixin import LoggingDaoMixin
 from activitytracker.db.dao.utility_dao_mixin import UtilityDaoMixin
 from activitytracker.db.models import VideoSummaryLog
@@ -31,6 +32,7 @@ from activitytracker.util.log_dao_helper import (
     group_logs_by_name,
 )
 from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.week_response_cache import get_week_response_cache
 
 #
 # #   #   #   #   #   #   #   #   #   #   #   #   #   #   #   #
@@ -55,7 +57,7 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         self.logger = ConsoleLogger()
         self.model = VideoSummaryLog
 
-    def start_session(self, session: VideoSession):
+    def start_session(self, session: VideoSession) -> int:
         """
         A session of using a domain. End_time here is like, "when did the user tab away from the program?"
 
@@ -79,7 +81,7 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
             gathering_date_local=initializer.start_of_day_as_utc.replace(tzinfo=None),
             created_at=initializer.base_start_time_as_utc,
         )
-        self.add_new_item(log_entry)
+        return self.add_new_item(log_entry)
 
     def find_session(self, session: VideoSession):
         """Is finding it by time! Looking for the one, specifically, with the arg's time"""
@@ -95,7 +97,7 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
 
     def read_day_as_sorted(self, day: UserLocalTime) -> dict[str, VideoSummaryLog]:
         # NOTE: the database is storing and returning times in UTC
-        return self._read_day_as_sorted(day, VideoSummaryLog, VideoSummaryLog.domain_name)
+        return self._read_day_as_sorted(day, VideoSummaryLog, VideoSummaryLog.media_name)
 
     def read_all(self) -> List[VideoSummaryLog]:
         """Fetch all domain log entries"""
@@ -123,9 +125,14 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
             )
 
             if mystery_media:
+                touched_days = set()
                 for media in mystery_media:
                     media.media_name = discovered_media_title
+                    if media.gathering_date_local is not None:
+                        touched_days.add(media.gathering_date_local.date())
                 db_session.commit()
+                # A late write: the title may land in a week that's already cached
+                get_week_response_cache().invalidate_days(touched_days)
             else:
                 # Log or handle the case where no record is found
                 self.logger.log_white(
@@ -133,6 +140,9 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
                 )
 
     def push_window_ahead_ten_sec(self, session: VideoSession):
+        if session.handles.log_id is not None:
+            self.push_window_by_handle(session, window_push_length)
+            return
         log: VideoSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -144,6 +154,9 @@ class VideoLoggingDao(LoggingDaoMixin, UtilityDaoMixin):
         Overwrite value from the pulse. Expect something to ALWAYS be in the db already at this point.
         Note that if the computer was shutdown, this method is never called, and the rough estimate is kept.
         """
+        if session.handles.log_id is not None:
+            self.finalize_by_handle(session)
+            return
         log: VideoSummaryLog = self.find_session(session)
         if not log:
             raise ImpossibleToGetHereError("Start of pulse didn't reach the db")
@@ -1,16 +1,18 @@
-from sqlalchemy import func, or_, select, text
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import DeclarativeMeta
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from typing import Callable, Type, TypeVar
+from typing import Callable, Dict, Type, TypeVar
 
-from activitytracker.config.definitions import window_push_length
 from activitytracker.object.classes import ChromeSession, ProgramSession, VideoSession
 from activitytracker.tz_handling.dao_objects import FindTodaysEntryConverter
 from activitytracker.tz_handling.time_formatting import (
+    add_local_days,
     attach_tz_to_all,
     attach_tz_to_obj,
+    bucket_by_local_day,
     get_start_of_day_from_datetime,
     get_start_of_day_from_ult,
 )
@@ -58,8 +60,9 @@ class SummaryDaoMixin:
         days_since_sunday = right_now.weekday() + 1
         last_sunday = right_now.dt - timedelta(days=days_since_sunday)
 
+        # A range on the column itself, not on date() of it, so its index is used
         query = select(self.model).where(
-            func.date(self.model.gathering_date) >= last_sunday.date()
+            self.model.gathering_date >= get_start_of_day_from_datetime(last_sunday)
         )
 
         result = self.execute_and_return_all(query)
@@ -76,58 +79,82 @@ class SummaryDaoMixin:
         result = self.execute_and_return_all(query)
         return attach_tz_to_all(result, day.dt.tzinfo)
 
+    def do_read_week(self, starting_sunday: UserLocalTime) -> Dict[date, list]:
+        """All seven days in one query, sorted into the user's local days"""
+        week_start = get_start_of_day_from_datetime(starting_sunday.dt)
+        week_end = add_local_days(week_start, 7)
+
+        query = (
+            select(self.model)
+            .where(
+                self.model.gathering_date >= week_start,
+                self.model.gathering_date < week_end,
+            )
+            .order_by(self.model.gathering_date)
+        )
+        result = attach_tz_to_all(self.execute_and_return_all(query), week_start.tzinfo)
+        return bucket_by_local_day(
+            result, week_start.date(), week_start.tzinfo, lambda row: row.gathering_date
+        )
+
     def add_partial_window(
         self,
         session: ProgramSession | ChromeSession | VideoSession,
-        duration_in_sec: int,
-        name_filter,
+        duration_in_sec: int | float,
     ):
         if duration_in_sec == 0:
             return  # No work to do here
         self.throw_if_negative(session.get_name(), duration_in_sec)
 
-        today_start: UserLocalTime = get_start_of_day_from_ult(session.start_time)
-        tomorrow_start = today_start.dt + timedelta(days=1)
+        if session.handles.summary_id is not None:
+            self.add_hours_by_handle(session, duration_in_sec)
+            return
+        self.upsert_time(session, duration_in_sec)
 
-        time_to_add = duration_in_sec / SECONDS_PER_HOUR
-
-        query = select(self.model).where(
-            name_filter,
-            self.model.gathering_date >= today_start.dt,
-            self.model.gathering_date < tomorrow_start,
-        )
-        self.do_addition(query, time_to_add)
-
-    def do_addition(self, query, time_to_add):
+    def upsert_summary(self, entry) -> int:
+        """
+        Creates today's row, or adds the entry's hours_spent onto the one already there.
+        One INSERT ... ON CONFLICT DO UPDATE on the (identity, gathering_date) constraint.
+        Returns the id either way.
+        """
+        values = {
+            column.key: getattr(entry, column.key)
+            for column in self.model.__table__.columns
+            if column.key != "id"
+        }
+        statement = pg_insert(self.model).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=self.unique_columns,
+            set_={"hours_spent": self.model.hours_spent + statement.excluded.hours_spent},
+        ).returning(self.model.id)
         with self.regular_session() as db_session:
-            summary = db_session.scalars(query).first()
-
-            if summary is None:
-                raise ImpossibleToGetHereError(
-                    "Session should exist before do_addition occurs"
-                )
-
-            # FIXME: Must test this method
-            new_duration = summary.hours_spent + time_to_add
-
-            summary.hours_spent = new_duration  # Error is here GPT
+            row_id = db_session.execute(statement).scalar_one()
             db_session.commit()
+            return row_id
+
+    def build_hours_increment(self, session, name_filter, seconds: int | float):
+        """Atomic "hours_spent = hours_spent + :delta". The pulse accumulator batches these."""
+        return (
+            update(self.model)
+            .where(*self.where_this_summary(session, name_filter))
+            .values(hours_spent=self.model.hours_spent + seconds / SECONDS_PER_HOUR)
+        )
 
-    def execute_window_push(self, query, purpose, identifier: datetime):
-        # self.logger.log_white(f"[info] looking for {purpose} with {identifier}")
-        with self.regular_session() as db_session:
-            # TODO: change to "Update hours"
-            summary = db_session.scalars(query).first()
-            # FIXME: Sometimes program | domain is None
-            if summary:
-                summary.hours_spent = (
-                    summary.hours_spent + window_push_length / SECONDS_PER_HOUR
-                )
-                db_session.commit()
-            else:
-                raise ImpossibleToGetHereError(
-                    "A summary should already exist here, but was not found: " + purpose
-                )
+    def where_this_summary(self, session, name_filter) -> tuple:
+        """By primary key if the session carries its handle, else by name & day like before"""
+        if session.handles.summary_id is not None:
+            return (self.model.id == session.handles.summary_id,)
+        today_start = get_start_of_day_from_datetime(session.start_time.dt)
+        return (name_filter, self.model.gathering_date == today_start)
+
+    def add_hours_by_handle(self, session, seconds: int | float):
+        statement = (
+            update(self.model)
+            .where(self.model.id == session.handles.summary_id)
+            .values(hours_spent=self.model.hours_spent + seconds / SECONDS_PER_HOUR)
+        )
+        if self.execute_update(statement) == 0:
+            raise ImpossibleToGetHereError("No summary row for: " + session.get_name())
 
     def _execute_read_with_restored_tz(self, query, start_time: UserLocalTime):
         result = self.execute_and_read_one_or_none(query)
@@ -51,6 +51,13 @@ class UtilityDaoMixin:
             result = session.execute(query)
             return result.scalar_one_or_none()
 
+    def execute_update(self, statement) -> int:
+        """Runs an UPDATE and commits. Returns the rowcount so callers can tell if it hit"""
+        with self.regular_session() as db_session:
+            result = db_session.execute(statement)
+            db_session.commit()
+            return result.rowcount
+
 
 class AsyncUtilityDaoMixin:
     """
@@ -9,6 +9,13 @@ from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from typing import AsyncGenerator
 
+from activitytracker.config.definitions import (
+    read_pool_max_overflow,
+    read_pool_size,
+    read_pool_timeout,
+    read_statement_timeout_ms,
+)
+
 load_dotenv()
 
 SYNCHRONOUS_DB_URL = os.getenv("SYNCHRONOUS_DB_URL")
@@ -21,6 +28,11 @@ if SYNCHRONOUS_DB_URL is None:
 if ASYNC_DB_URL is None:
     raise ValueError("Failed to load SqlAlchemy database URL")
 
+# Dashboards and reports. A streaming replica, or the same server under a read-only role.
+# Unset means the same server, but still through a pool of its own
+READ_ONLY_DB_URL = os.getenv("READ_ONLY_DB_URL") or SYNCHRONOUS_DB_URL
+ASYNC_READ_ONLY_DB_URL = os.getenv("ASYNC_READ_ONLY_DATABASE_URL") or ASYNC_DB_URL
+
 
 sync_engine = create_engine(SYNCHRONOUS_DB_URL)
 
@@ -38,6 +50,37 @@ async_session_maker = async_sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Sent at connect time, so every transaction on these pools is read only,
+# and a runaway week read is cancelled instead of holding its connection
+read_only_settings = {
+    "default_transaction_read_only": "on",
+    "statement_timeout": str(read_statement_timeout_ms),
+}
+
+read_engine = create_engine(
+    READ_ONLY_DB_URL,
+    pool_size=read_pool_size,
+    max_overflow=read_pool_max_overflow,
+    pool_timeout=read_pool_timeout,
+    connect_args={
+        "options": " ".join(f"-c {key}={value}" for key, value in read_only_settings.items())
+    },
+)
+
+async_read_engine = create_async_engine(
+    ASYNC_READ_ONLY_DB_URL,
+    pool_size=read_pool_size,
+    max_overflow=read_pool_max_overflow,
+    pool_timeout=read_pool_timeout,
+    connect_args={"server_settings": read_only_settings},
+)
+
+read_session_maker = sessionmaker(read_engine, class_=Session, expire_on_commit=False)
+
+async_read_session_maker = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 # Dependency for FastAPI endpoints
@@ -1,9 +1,20 @@
 # models.py
 from sqlalchemy import Column
 from sqlalchemy import Column as SQLAlchemyColumn
-from sqlalchemy import Computed, DateTime
+from sqlalchemy import DDL, Computed, Date, DateTime
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import Float, ForeignKey, Integer, String, func, text
+from sqlalchemy import (
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from datetime import datetime
@@ -12,7 +23,12 @@ from typing import Any, Optional, Union
 
 from activitytracker.config.definitions import max_content_len
 from activitytracker.db.database import Base
-from activitytracker.object.enums import ChartEventType, SystemStatusType
+from activitytracker.object.enums import (
+    ActivityKind,
+    ChartEventType,
+    ProductivityCategory,
+    SystemStatusType,
+)
 
 
 class DailySummaryBase(Base):
@@ -27,7 +43,8 @@ class DailySummaryBase(Base):
     hours_spent: Mapped[float] = mapped_column(Float)
     # The date on which the program data was gathered, without hh:mm:ss
     # MUST be the date FOR THE USER. Otherwise, the program doesn't make sense
-    gathering_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # Indexed since every dashboard read is a range on it
+    gathering_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     gathering_date_local: Mapped[datetime] = mapped_column(DateTime(timezone=False))
     # TODO: Try gathering_date not as .date() but the full hh:mm:ss thing. Until you figure out why it isn't like that already
 
@@ -38,6 +55,14 @@ class DailyProgramSummary(DailySummaryBase):
     """
 
     __tablename__ = "daily_program_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "exe_path_as_id",
+            "gathering_date",
+            name="uq_program_summary_day",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     exe_path_as_id: Mapped[str] = mapped_column(String)  # unique identifier
     process_name: Mapped[str] = mapped_column(String)
@@ -61,6 +86,14 @@ class DailyDomainSummary(DailySummaryBase):
     """
 
     __tablename__ = "daily_chrome_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "domain_name",
+            "gathering_date",
+            name="uq_domain_summary_day",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     domain_name: Mapped[str] = mapped_column(String)
 
@@ -82,9 +115,16 @@ class DailyVideoSummary(DailySummaryBase):
     """
 
     __tablename__ = "daily_video_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "video_id",
+            "gathering_date",
+            name="uq_video_summary_day",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
-    # Not necessarily unique
-    video_id: Mapped[str] = mapped_column(String)  # Not necessarily unique
+    video_id: Mapped[str] = mapped_column(String)
     media_name: Mapped[str] = mapped_column(String, nullable=True)
     # YouTube only
     channel_name: Mapped[str] = mapped_column(String, nullable=True)
@@ -113,17 +153,17 @@ class SummaryLogBase(Base):
     id = Column(Integer, primary_key=True, index=True)
     hours_spent: Mapped[float] = mapped_column(Float)
     # time stuff
-    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     start_time_local: Mapped[datetime] = mapped_column(DateTime(timezone=False))
     end_time_local: Mapped[datetime] = mapped_column(DateTime(timezone=False))
 
     duration_in_sec: Mapped[float] = mapped_column(Float, nullable=True)
     # The date on which the data was gathered
-    gathering_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    gathering_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     gathering_date_local: Mapped[datetime] = mapped_column(DateTime(timezone=False))
 
-    created_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), index=True)
 
 
 class ProgramSummaryLog(SummaryLogBase):
@@ -167,8 +207,7 @@ class DomainSummaryLog(SummaryLogBase):
 class VideoSummaryLog(SummaryLogBase):
     __tablename__ = "video_logs"
 
-    # Not necessarily unique
-    video_id: Mapped[str] = mapped_column(String)  # Not necessarily unique
+    video_id: Mapped[str] = mapped_column(String)
     media_name: Mapped[str] = mapped_column(String)
     # YouTube only
     channel_name: Mapped[str] = mapped_column(String, nullable=True)
@@ -207,28 +246,64 @@ class MysteryMedia(Base):
     # count: Mapped[int] = mapped_column(Integer)
 
 
+def partitioned_id(table_name: str) -> Sequence:
+    """
+    A partitioned table's key has to include its partition column. Then the id isn't
+    the whole key, so it isn't made a SERIAL. It's given the same sequence instead.
+    (Not as a server_default: SQLite's create_all would choke on it)
+    """
+    return Sequence(f"{table_name}_id_seq", metadata=Base.metadata)
+
+
+def partitioned_by_month(column: str) -> dict:
+    # The months themselves are made by the PartitionDao, ahead of time
+    return {"postgresql_partition_by": f"RANGE ({column})"}
+
+
+typing_sessions_id = partitioned_id("typing_sessions")
+
+
 class TypingSession(Base):
     __tablename__ = "typing_sessions"
+    __table_args__ = partitioned_by_month("start_time")
     # It is unclear if this model needs a start_time_local, end_time_local, so I'm leaving it
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    id: Mapped[int] = mapped_column(
+        Integer, typing_sessions_id, primary_key=True, index=True
+    )
+    start_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, index=True
+    )
     end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
+    # Rows are still found by id alone, e.g. by session.get()
+    __mapper_args__ = {"primary_key": [id]}
+
     def __repr__(self):
         return f"TypingSession(id={self.id}, start_time={self.start_time}, end_time={self.end_time})"
 
 
+mouse_moves_id = partitioned_id("mouse_moves")
+
+
 class MouseMove(Base):
     __tablename__ = "mouse_moves"
+    __table_args__ = partitioned_by_month("start_time")
     # It is unclear if this model needs a start_time_local, end_time_local, so I'm leaving it
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    id: Mapped[int] = mapped_column(Integer, mouse_moves_id, primary_key=True, index=True)
+    start_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, index=True
+    )
     end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
+    __mapper_args__ = {"primary_key": [id]}
+
     def __repr__(self):
         return f"MouseMove(id={self.id}, start_time={self.start_time})"
 
 
+client_timeline_entries_id = partitioned_id("client_timeline_entries")
+
+
 class TimelineEntryObj(Base):
     """
     Note: This table uses camelCase column names (rather than snake_case)
@@ -240,8 +315,13 @@ class TimelineEntryObj(Base):
     """
 
     __tablename__ = "client_timeline_entries"
+    __table_args__ = (
+        # read_day's filter: one group, a range of starts
+        Index("ix_client_timeline_entries_group_start", "group", "start"),
+        partitioned_by_month("start"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, client_timeline_entries_id, primary_key=True, index=True)
 
     clientFacingId = Column(
         String,
@@ -263,9 +343,11 @@ class TimelineEntryObj(Base):
         ),
     )
     # It is unclear if this model needs a start_time_local, end_time_local, so I'm leaving it
-    start = Column(DateTime(timezone=True))
+    start = Column(DateTime(timezone=True), primary_key=True)
     end = Column(DateTime(timezone=True))
 
+    __mapper_args__ = {"primary_key": [id]}
+
     def __str__(self):
         """
         Returns a human-readable string representation of the TimelineEntry.
@@ -294,6 +376,7 @@ class PrecomputedTimelineEntry(Base):
     """
 
     __tablename__ = "precomputed_timelines"
+    __table_args__ = (Index("ix_precomputed_timelines_group_start", "group", "start"),)
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -326,6 +409,48 @@ class PrecomputedTimelineEntry(Base):
     # count = Column(Integer)  # could be nice to know how many events went into an entry.
 
 
+class PrecomputedTimelineDay(Base):
+    """
+    Marks a (day, group) as precomputed. Written in the same transaction as its entries.
+
+    An empty day has no rows in precomputed_timelines, so it used to look like a day
+    that was never computed, and it was recomputed on every request. It gets a marker too.
+    """
+
+    __tablename__ = "precomputed_timeline_days"
+    __table_args__ = (UniqueConstraint("day", "group", name="uq_precomputed_timeline_day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    day = Column(Date, nullable=False)  # The user's local date
+    group = Column(SQLAlchemyEnum(ChartEventType), nullable=False)
+
+    source_event_count = Column(Integer, nullable=False)  # Raw windows read
+    entry_count = Column(Integer, nullable=False)  # Precomputed entries written
+
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ActivityCategory(Base):
+    """
+    Is a program or a domain productive? The breakdown joins on this table,
+    so a rule can be changed without a redeploy. Anything unlisted counts as leisure.
+    """
+
+    __tablename__ = "activity_categories"
+    __table_args__ = (UniqueConstraint("kind", "name", name="uq_activity_category"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    kind = Column(SQLAlchemyEnum(ActivityKind), nullable=False)
+    # program_name for a program, domain_name for a domain
+    name = Column(String, nullable=False)
+    category = Column(SQLAlchemyEnum(ProductivityCategory), nullable=False)
+
+    def __repr__(self):
+        return f"ActivityCategory(kind={self.kind}, name={self.name}, category={self.category})"
+
+
 class SystemStatus(Base):
     """
     Made to help track when the user is using their machine.
@@ -342,5 +467,17 @@ class SystemStatus(Base):
         SQLAlchemyEnum("program_started", "online", "shutdown", name="systemstatustype")
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True)
+        DateTime(timezone=True), index=True
     )  # Is the local timezone
+
+
+# create_all makes the partitioned tables but none of their months. Until the
+# PartitionDao makes those, the default partition takes the rows
+for partitioned in (TimelineEntryObj, MouseMove, TypingSession):
+    event.listen(
+        partitioned.__table__,
+        "after_create",
+        DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT").execute_if(
+            dialect="postgresql"
+        ),
+    )
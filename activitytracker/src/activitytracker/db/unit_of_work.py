@@ -0,0 +1,67 @@
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session, sessionmaker
+
+
+class BorrowedSession:
+    """
+    What a DAO gets while a unit of work is open: the shared session,
+    except commit() only flushes. The unit of work does the real commit.
+    """
+
+    def __init__(self, shared: Session):
+        self.shared = shared
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False  # Don't close it, it isn't ours
+
+    def commit(self):
+        self.shared.flush()
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.shared, name)
+
+
+class UnitOfWorkSessionMaker:
+    """
+    Drop-in for a sessionmaker. Outside of unit_of_work() it's the plain sessionmaker.
+
+    Inside it, every DAO call on the same thread shares one session, so a whole
+    arbiter transition is one transaction on one pooled connection, one commit.
+    """
+
+    def __init__(self, session_maker: sessionmaker):
+        self.session_maker = session_maker
+        self.local = threading.local()
+
+    def __call__(self):
+        shared = getattr(self.local, "session", None)
+        if shared is not None:
+            return BorrowedSession(shared)
+        return self.session_maker()
+
+    def in_unit_of_work(self) -> bool:
+        return getattr(self.local, "session", None) is not None
+
+    @contextmanager
+    def unit_of_work(self):
+        if self.in_unit_of_work():
+            yield  # Nested. The outer one commits
+            return
+        with self.session_maker() as session:
+            self.local.session = session
+            try:
+                yield
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                self.local.session = None
@@ -1,39 +1,39 @@
-from collections import deque
-
 from datetime import datetime
 
-from .monitoring import FacadeMonitoring
+from .queue_signal import QueueSignalMixin
 
 
-class KeyboardFacadeCore:
-    def __init__(self):
-        self.queue = deque()
+class KeyboardFacadeCore(QueueSignalMixin):
+    def __init__(self, capacity=4096):
+        # The tracker empties it on every wakeup, so it only fills if that thread stalls
+        self.init_queue_signal("Keyboard", width=1, capacity=capacity)
 
     def handle_keyboard_message(self, event):
         """Handle keyboard events from the message receiver."""
-        if "timestamp" in event:
-            # TODO: Just send the timestamp on the Recorder side
+        if "timestamps" in event:
+            # A batch of key-downs, oldest first
+            self.queue_events(event["timestamps"])
+        elif "timestamp" in event:
             self.add_event(event["timestamp"])
 
+    def handle_keyboard_messages(self, events):
+        """All the keyboard messages from one read of the socket"""
+        for event in events:
+            self.handle_keyboard_message(event)
+
     def add_event(self, time: float):
         """It really does need to be a timestamp, because later, the EventAggregator compares timestamps.`"""
-        self.queue.append(time)
+        self.queue_events((time,))
 
     def read_event(self):
-        if not hasattr(self, "monitoring"):
-            self.monitoring = FacadeMonitoring("Keyboard")
-
-        queue_length = len(self.queue)
-        self.monitoring.record_queue_length(queue_length)
-
-        if self.queue:
-            return self.queue.popleft()  # O(1) operation
+        record = self.take_oldest_event()
+        if record is not None:
+            return record[0]
         return None
 
     def event_type_is_key_down(self, event):
         return event is not None  # If event exists, it was a key press
 
     def get_all_events(self):
-        all_events = list(self.queue)
-        self.queue.clear()
-        return all_events
+        """The timestamps as a view of the buffer, so they're read in place"""
+        return self.take_all_events()
@@ -8,6 +8,20 @@ class FacadeMonitoring:
         self.queue_lengths = []
         self.last_report_time = time.time()
         self.report_interval = 5  # Report every 5 seconds
+        # Totals since startup, unlike the lengths, which reset every report
+        self.dropped = 0
+        self.peak_occupancy = 0
+        self.capacity = None
+
+    def record_drops(self, count):
+        """Events the full buffer had no room for"""
+        self.dropped += count
+
+    def record_occupancy(self, used, capacity):
+        """How full the buffer was when the tracker took from it"""
+        self.capacity = capacity
+        self.peak_occupancy = max(self.peak_occupancy, used)
+        self.record_queue_length(used)
 
     def record_queue_length(self, length):
         self.queue_lengths.append(length)
@@ -20,6 +34,7 @@ class FacadeMonitoring:
                 max_length = max(self.queue_lengths)
                 print(
                     f"{self.name} Queue Stats - Avg: {avg_length:.2f}, Max: {max_length}, Current: {length}"
+                    f", Peak: {self.peak_occupancy}/{self.capacity}, Dropped: {self.dropped}"
                 )
             self.queue_lengths = []  # Reset
             self.last_report_time = current_time
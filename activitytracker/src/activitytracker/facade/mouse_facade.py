@@ -1,8 +1,6 @@
 # type: ignore
 
 
-from collections import deque
-
 from datetime import datetime
 
 from typing import TypedDict, List
@@ -10,7 +8,7 @@ from typing import TypedDict, List
 from activitytracker.util.detect_os import OperatingSystemInfo
 from activitytracker.object.classes import MouseEvent
 
-from .monitoring import FacadeMonitoring
+from .queue_signal import QueueSignalMixin
 
 os_type = OperatingSystemInfo()
 if os_type.is_windows:
@@ -19,32 +17,36 @@ if os_type.is_ubuntu:
     from Xlib import display
 
 
-class MouseFacadeCore:
-    def __init__(self):
-        self.queue = deque()
+class MouseFacadeCore(QueueSignalMixin):
+    def __init__(self, capacity=1024):
+        # Each move is kept as its start and end, side by side
+        self.init_queue_signal("Mouse", width=2, capacity=capacity)
 
     async def handle_mouse_message(self, event):
         """Handle mouse events from the message receiver."""
         if "start" in event and "end" in event:
             # TODO: Just send a datetime.timestamp() since that's what will happen later
-            event_dict = {"start": event["start"], "end": event["end"]}
-            self.add_event(event_dict)
+            self.queue_events((event["start"], event["end"]))
+
+    async def handle_mouse_messages(self, events):
+        """All the mouse messages from one read of the socket"""
+        # One wakeup for the tracker, not one per message
+        values = []
+        for event in events:
+            if "start" in event and "end" in event:
+                values += (event["start"], event["end"])
+        self.queue_events(values)
 
     def add_event(self, event: MouseEvent):
-        self.queue.append(event)
+        self.queue_events((event["start"], event["end"]))
 
     def read_event(self):
-        if not hasattr(self, "monitoring"):
-            self.monitoring = FacadeMonitoring("Mouse")
-
-        queue_length = len(self.queue)
-        self.monitoring.record_queue_length(queue_length)
-
-        if self.queue:
-            return self.queue.popleft()  # O(1) operation
+        record = self.take_oldest_event()
+        if record is not None:
+            return {"start": record[0], "end": record[1]}
         return None
 
     def get_all_events(self) -> List[MouseEvent]:
-        all_events = list(self.queue)
-        self.queue.clear()
-        return all_events
+        # A few moves per aggregation window, so making the dicts here is cheap
+        pairs = self.take_all_events()
+        return [{"start": pairs[i], "end": pairs[i + 1]} for i in range(0, len(pairs), 2)]
@@ -0,0 +1,57 @@
+import threading
+
+from .monitoring import FacadeMonitoring
+from .swap_buffer import SwapBuffer
+
+
+class QueueSignalMixin:
+    """
+    For a facade whose queue a tracker thread sleeps on. The thread blocks
+    until an event is queued, instead of waking every 50 ms to find nothing.
+
+    The buffer is only touched while holding queue_changed, so a wakeup can't
+    be missed, and the lock is never held for long enough to copy the
+    whole queue. A take is a swap, not a copy.
+    """
+
+    def init_queue_signal(self, name: str, width: int, capacity: int):
+        self.queue = SwapBuffer(width, capacity)
+        self.monitoring = FacadeMonitoring(name)
+        self.queue_changed = threading.Condition()
+        self._woken = False
+
+    def queue_events(self, values):
+        """Flat, so a mouse move is its start then its end"""
+        with self.queue_changed:
+            dropped = self.queue.extend(values)
+            if dropped:
+                self.monitoring.record_drops(dropped)
+            self.queue_changed.notify_all()
+
+    def take_all_events(self) -> memoryview:
+        """Every event's values, flat. Read them before the next take"""
+        with self.queue_changed:
+            used = len(self.queue)
+            taken = self.queue.swap()
+        self.monitoring.record_occupancy(used, self.queue.capacity)
+        return taken
+
+    def take_oldest_event(self):
+        with self.queue_changed:
+            used = len(self.queue)
+            record = self.queue.pop_oldest()
+        self.monitoring.record_occupancy(used, self.queue.capacity)
+        return record
+
+    def wait_for_events(self, timeout=None) -> bool:
+        """True if there are events. False on timeout, or if wake() was called"""
+        with self.queue_changed:
+            self.queue_changed.wait_for(lambda: self.queue or self._woken, timeout)
+            self._woken = False
+            return len(self.queue) > 0
+
+    def wake(self):
+        """Lets a waiting tracker go, like when it's being stopped"""
+        with self.queue_changed:
+            self._woken = True
+            self.queue_changed.notify_all()
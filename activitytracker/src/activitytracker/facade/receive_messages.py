@@ -7,10 +7,34 @@ import asyncio
 
 from datetime import datetime
 
+from activitytracker.config.definitions import (
+    message_max_drain,
+    message_overflow_policy,
+    message_queue_max_batches,
+)
+from activitytracker.util.errors import UnreadableMessageError
+from activitytracker.util.wire_format import decode
+
+overflow_policies = ("drop_oldest", "drop_newest", "block")
+
 
 class MessageReceiver:
-    def __init__(self, zmq_url="tcp://127.0.0.1:5555"):
-        """Initialize the message receiver with a ZMQ URL."""
+    def __init__(
+        self,
+        zmq_url="tcp://127.0.0.1:5555",
+        max_queue_batches=message_queue_max_batches,
+        overflow_policy=message_overflow_policy,
+        max_drain=message_max_drain,
+    ):
+        """
+        Initialize the message receiver with a ZMQ URL.
+
+        Each wakeup reads every message waiting on the socket, up to max_drain,
+        and queues them as one batch. A full queue drops the oldest batch,
+        drops the new one, or blocks the reading, as overflow_policy says.
+        """
+        if overflow_policy not in overflow_policies:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
         self.zmq_url = zmq_url
         self.context = zmq.asyncio.Context()
         self.socket = self.context.socket(zmq.SUB)
@@ -18,34 +42,94 @@ class MessageReceiver:
         # Subscribe to all messages
         self.socket.setsockopt_string(zmq.SUBSCRIBE, "")
 
-        self.event_queue = asyncio.Queue()
+        self.event_queue = asyncio.Queue(maxsize=max_queue_batches)
+        self.overflow_policy = overflow_policy
+        self.max_drain = max_drain
+        self.dropped_events = 0
+        self.queue_high_water_mark = 0
         self.handlers = {}
         self.is_running = False
         self.tasks = []
 
-    def register_handler(self, event_type, handler):
+    def register_handler(self, event_type, handler, batched=False):
         """
         Register a handler function for a specific event type.
 
+        A batched handler gets a list of events per call, otherwise it's one event.
+
         This is done to hamstring the creeping crawl of async/await
         that would spread through a bunch of code that runs just fine synchronously.
         """
-        # If it's already an async function, use it directly
-        if asyncio.iscoroutinefunction(handler):
+        is_async = asyncio.iscoroutinefunction(handler)
+        if batched and is_async:
             self.handlers[event_type] = handler
-        else:
-            # Otherwise, wrap it in an async function
-            async def async_wrapper(event):
-                handler(event)
+        elif batched:
+
+            async def async_wrapper(events):
+                handler(events)
 
             self.handlers[event_type] = async_wrapper
+        elif is_async:
+
+            async def one_at_a_time(events):
+                for event in events:
+                    await handler(event)
+
+            self.handlers[event_type] = one_at_a_time
+        else:
+            # Still one coroutine per batch, not per event
+            async def sync_one_at_a_time(events):
+                for event in events:
+                    handler(event)
+
+            self.handlers[event_type] = sync_one_at_a_time
+
+    async def drain_socket(self):
+        """Waits for one message, then takes whatever else already arrived"""
+        batch = []
+        frames = await self.socket.recv_multipart()
+        while True:
+            try:
+                batch.append(decode(frames))
+            except UnreadableMessageError as e:
+                # One bad message shouldn't cost the rest of the batch
+                print(f"Unreadable message: {e}")
+                self.dropped_events += 1
+            if len(batch) >= self.max_drain:
+                return batch
+            try:
+                frames = await self.socket.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                return batch
+
+    async def enqueue(self, batch):
+        if not batch:
+            return
+        if self.event_queue.full():
+            if self.overflow_policy == "drop_newest":
+                self.dropped_events += self.count_events(batch)
+                return
+            if self.overflow_policy == "drop_oldest":
+                self.dropped_events += self.count_events(self.event_queue.get_nowait())
+                self.event_queue.task_done()
+        # The drops made room, so only "block" waits here
+        await self.event_queue.put(batch)
+        queued = self.event_queue.qsize()
+        self.queue_high_water_mark = max(self.queue_high_water_mark, queued)
+
+    @staticmethod
+    def count_events(batch):
+        """
+        A keyboard message is a batch of key-downs, so it counts as each of them.
+        The old JSON ones are a single timestamp, and a mouse message is one move
+        """
+        return sum(len(message.get("timestamps", ())) or 1 for message in batch)
 
     async def zmq_listener(self):
         """Continuously receive messages from ZMQ and add them to the queue."""
         while self.is_running:
             try:
-                message = await self.socket.recv_json()
-                await self.event_queue.put(message)
+                await self.enqueue(await self.drain_socket())
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -55,16 +139,13 @@ class MessageReceiver:
         """Process events from the queue asynchronously."""
         while self.is_running:
             try:
-                event = await self.event_queue.get()
+                batch = await self.event_queue.get()
                 try:
-                    if "type" in event:
-                        event_type = event["type"]
+                    for event_type, events in self.group_by_type(batch).items():
                         if event_type in self.handlers:
-                            await self.handlers[event_type](event)
+                            await self.handlers[event_type](events)
                         else:
                             print(f"No handler registered for event type: {event_type}")
-                    else:
-                        print(f"Unexpected message format (missing 'type'): {event}")
 
                 except Exception as e:
                     print(f"Error processing message: {e}")
@@ -79,6 +160,16 @@ class MessageReceiver:
                 self.stop()  # temporary to silence complaints during tests
                 raise
 
+    def group_by_type(self, batch):
+        """Keeps each type's events in the order they came in"""
+        by_type = {}
+        for event in batch:
+            if "type" in event:
+                by_type.setdefault(event["type"], []).append(event)
+            else:
+                print(f"Unexpected message format (missing 'type'): {event}")
+        return by_type
+
     def start(self):
         """Start the message receiver in a way that doesn't require async/await."""
         try:
@@ -0,0 +1,56 @@
+from array import array
+
+
+class SwapBuffer:
+    """
+    Two preallocated arrays of doubles. The message receiver writes into the
+    front one, and the tracker takes it by swapping it for the back one,
+    so neither a poll nor an event allocates anything.
+
+    Each record is `width` doubles: a key-down is one timestamp, a mouse
+    move is its start and end. A full buffer drops the record and counts it.
+
+    Not thread safe by itself. The facade holds its lock around every call.
+    """
+
+    def __init__(self, width: int, capacity: int):
+        self.width = width
+        self.capacity = capacity
+        self.front = array("d", bytes(8 * width * capacity))
+        self.back = array("d", bytes(8 * width * capacity))
+        self.count = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def extend(self, values) -> int:
+        """values is flat, `width` doubles per record. Gives back how many were dropped"""
+        records = len(values) // self.width
+        kept = min(records, self.capacity - self.count)
+        at = self.count * self.width
+        for offset in range(kept * self.width):
+            self.front[at + offset] = values[offset]
+        self.count += kept
+        self.dropped += records - kept
+        return records - kept
+
+    def swap(self) -> memoryview:
+        """
+        The records so far, flat. Only good until the next swap, which hands
+        that same array back to the writer
+        """
+        filled, used = self.front, self.count
+        self.front, self.back = self.back, filled
+        self.count = 0
+        return memoryview(filled)[: used * self.width]
+
+    def pop_oldest(self):
+        """For read_event. Shifts the rest down, so it's O(n), unlike swap()"""
+        if self.count == 0:
+            return None
+        record = self.front[: self.width]
+        end = self.count * self.width
+        self.front[0 : end - self.width] = self.front[self.width : end]
+        self.count -= 1
+        return record
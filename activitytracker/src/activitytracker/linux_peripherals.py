@@ -15,6 +15,7 @@ from activitytracker.trackers.peripherals.linux.linux_peripheral_detector import
     linux_monitor_mouse,
 )
 from activitytracker.trackers.message_dispatch import (
+    flush_keyboard_events,
     publish_keyboard_event,
     publish_mouse_events,
 )
@@ -73,7 +74,8 @@ def run_linux_monitors():
     # Create threads with shared running flag
     keyboard_thread = threading.Thread(
         target=linux_monitor_keyboard,
-        args=(keyboard_path, is_running),
+        # The evdev loop doesn't poll a running flag, it hands each key-down over
+        args=(keyboard_path, publish_keyboard_event),
         daemon=True,
         name="KeyboardMonitorThread",
     )
@@ -103,6 +105,7 @@ def run_linux_monitors():
         running = False
         time.sleep(1)  # Give threads time to clean up
 
+    flush_keyboard_events()
     print("All monitoring stopped")
     sys.exit(0)
 
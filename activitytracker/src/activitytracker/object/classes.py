@@ -51,18 +51,36 @@ class SessionLedger:
         return self.total
 
 
+class RowHandles:
+    """
+    Primary keys of the db rows a session writes to.
+
+    The recorder fills these in when the session starts, so later pulses,
+    partial windows and finalize_log can go straight to the row by id.
+    Shared between copies of a session, same as the ledger.
+    """
+
+    def __init__(self):
+        self.log_id: int | None = None
+        self.summary_id: int | None = None
+        self.video_log_id: int | None = None
+        self.video_summary_id: int | None = None
+
+
 class ActivitySession(ABC):
     """Base class for all activity sessions that should never be instantiated directly."""
 
     start_time: UserLocalTime
     productive: bool
     ledger: SessionLedger
+    handles: RowHandles
     video_info: Optional[VideoInfo] = None
 
     def __init__(self, start_time, productive, name):
         self.start_time = start_time
         self.productive = productive
         self.ledger = SessionLedger(name)
+        self.handles = RowHandles()
 
     @abstractmethod
     def to_completed(self, end_time):
@@ -115,6 +133,7 @@ class ProgramSession(ActivitySession):
             productive=self.productive,
         )
         completed.ledger = self.ledger
+        completed.handles = self.handles
         return completed
 
     def get_name(self):
@@ -211,6 +230,7 @@ class ChromeSession(ActivitySession):
             productive=self.productive,
         )
         completed.ledger = self.ledger
+        completed.handles = self.handles
         return completed
 
     def get_name(self):
@@ -298,9 +318,13 @@ class VideoSession(ActivitySession):
         and even media info (title, season) live nicely in one terse package.
         """
         if isinstance(session, ProgramSession):
-            return VideoSession.from_program_session(session)
+            video_session = VideoSession.from_program_session(session)
         else:
-            return VideoSession.from_chrome_session(session)
+            video_session = VideoSession.from_chrome_session(session)
+        # The parent session holds the ids of the video rows
+        video_session.handles.log_id = session.handles.video_log_id
+        video_session.handles.summary_id = session.handles.video_summary_id
+        return video_session
 
     @staticmethod
     def from_program_session(session: ProgramSession):
@@ -341,6 +365,7 @@ class VideoSession(ActivitySession):
             productive=self.productive,
         )
         completed.ledger = self.ledger
+        completed.handles = self.handles
         return completed
 
 
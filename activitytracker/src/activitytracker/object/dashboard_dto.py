@@ -3,6 +3,7 @@ from typing import List
 from datetime import datetime
 
 from activitytracker.db.models import PrecomputedTimelineEntry
+from activitytracker.object.enums import ActivityKind, ProductivityCategory
 
 
 class ProductivityBreakdown(BaseModel):
@@ -15,6 +16,18 @@ class ProductivityBreakdownByWeek(BaseModel):
     days: List[ProductivityBreakdown]
 
 
+class ActivityCategorySchema(BaseModel):
+    kind: ActivityKind
+    name: str
+    category: ProductivityCategory
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ActivityCategories(BaseModel):
+    categories: List[ActivityCategorySchema]
+
+
 # For the uh, dashboard
 
 
@@ -115,6 +128,11 @@ class TimelineRows(BaseModel):
     keyboardRows: List[TimelineEntrySchema]
 
 
+class TimelineRowsWithCursor(TimelineRows):
+    cursor: str  # Goes back as ?since= for the next poll
+    isDelta: bool  # If so, only the rows that are new or grew since the cursor
+
+
 class DayOfTimelineRows(BaseModel):
     date: datetime
     row: TimelineRows
@@ -126,9 +144,11 @@ class WeeklyTimeline(BaseModel):
 
 
 class PartiallyPrecomputedWeeklyTimeline(BaseModel):
-    beforeToday: List[DayOfTimelineRows]  # expect 0 to 6
+    beforeToday: List[DayOfTimelineRows]  # expect 0 to 6. Empty in a delta
     today: DayOfTimelineRows
     startDate: datetime
+    cursor: str
+    isDelta: bool  # If so, today is only what changed, and the client keeps its other days
 
 
 class TimelineEvent(BaseModel):
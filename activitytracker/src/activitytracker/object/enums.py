@@ -25,3 +25,14 @@ class SystemStatusType(Enum):
 class PlayerState(Enum):
     PLAYING = "playing"
     PAUSED = "paused"
+
+
+class ActivityKind(Enum):
+    PROGRAM = "program"
+    DOMAIN = "domain"
+
+
+class ProductivityCategory(Enum):
+    PRODUCTIVE = "productive"
+    LEISURE = "leisure"
+    IGNORED = "ignored"  # Not counted at all, e.g. Chrome, whose domains are counted instead
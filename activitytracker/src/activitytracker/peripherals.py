@@ -61,6 +61,8 @@ if __name__ == "__main__":
         mouse_path = os.getenv("WINDOWS_MOUSE_PATH", "WINDOWS_MOUSE")
 
         chosen_keyboard_monitor = win_monitor_keyboard
+        # Pass a function that returns the running state
+        keyboard_arg = lambda: running
         chosen_mouse_monitor = win_monitor_mouse
     else:
         from activitytracker.trackers.peripherals.linux.linux_peripheral_detector import (
@@ -72,6 +74,7 @@ if __name__ == "__main__":
         mouse_path = os.getenv("UBUNTU_MOUSE_PATH")
 
         chosen_keyboard_monitor = linux_monitor_keyboard
+        keyboard_arg = publish_keyboard_event
         chosen_mouse_monitor = linux_monitor_mouse
 
     if keyboard_path is None or mouse_path is None:
@@ -84,8 +87,7 @@ if __name__ == "__main__":
     # Create threads with shared running flag
     keyboard_thread = threading.Thread(
         target=chosen_keyboard_monitor,
-        # Pass a function that returns the running state
-        args=(keyboard_path, lambda: running),
+        args=(keyboard_path, keyboard_arg),
         daemon=True,
         name="KeyboardMonitorThread",
     )
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
+from activitytracker.object.dashboard_dto import (
+    ActivityCategories,
+    ActivityCategorySchema,
+)
+from activitytracker.object.enums import ActivityKind
+from activitytracker.service_dependencies import get_activity_category_dao
+from activitytracker.util.console_logger import ConsoleLogger
+from activitytracker.util.week_response_cache import get_week_response_cache
+
+logger = ConsoleLogger()
+
+# Edit what counts as productive without a redeploy
+router = APIRouter(prefix="/api/categories", tags=["categories"])
+
+
+@router.get("", response_model=ActivityCategories)
+async def get_categories(
+    activity_category_dao: ActivityCategoryDao = Depends(get_activity_category_dao),
+):
+    rows = activity_category_dao.read_all()
+    return ActivityCategories(
+        categories=[ActivityCategorySchema.model_validate(row) for row in rows]
+    )
+
+
+@router.put("", status_code=status.HTTP_204_NO_CONTENT)
+async def set_category(
+    rule: ActivityCategorySchema,
+    activity_category_dao: ActivityCategoryDao = Depends(get_activity_category_dao),
+):
+    logger.log_purple(f"[LOG] {rule.kind.value} {rule.name} is now {rule.category.value}")
+    activity_category_dao.set_category(rule.kind, rule.name, rule.category)
+    # Every cached week's breakdown used the old rule
+    get_week_response_cache().invalidate_endpoint("breakdown")
+
+
+@router.delete("/{kind}/{name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_category(
+    kind: ActivityKind,
+    name: str,
+    activity_category_dao: ActivityCategoryDao = Depends(get_activity_category_dao),
+):
+    if activity_category_dao.delete_category(kind, name) == 0:
+        raise HTTPException(status_code=404, detail=f"No rule for {kind.value} {name}")
+    get_week_response_cache().invalidate_endpoint("breakdown")
@@ -6,6 +6,7 @@ Wrapper to run peripheral monitors from the project root.
 
 from activitytracker.util.detect_os import OperatingSystemInfo
 from activitytracker.trackers.message_dispatch import (
+    flush_keyboard_events,
     publish_keyboard_event,
     publish_mouse_events,
 )
@@ -97,5 +98,6 @@ if __name__ == "__main__":
         running = False
         time.sleep(1)  # Give threads time to clean up
 
+    flush_keyboard_events()
     print("All monitoring stopped")
     sys.exit(0)
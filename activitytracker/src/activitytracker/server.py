@@ -9,12 +9,13 @@ from fastapi import (
     FastAPI,
     HTTPException,
     Path,
+    Query,
     Request,
     status,
 )
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
 import asyncio
@@ -28,6 +29,8 @@ from time import time
 # import time
 from typing import List, Optional
 
+from activitytracker.db.dao.direct.partition_dao import PartitionDao
+from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
 from activitytracker.db.database import (
     async_session_maker,
     init_db,
@@ -46,21 +49,20 @@ from activitytracker.facade.receive_messages import MessageReceiver
 from activitytracker.object.classes import TabChangeEventWithLtz
 from activitytracker.object.dashboard_dto import (
     ChromeBarChartContent,
-    DayOfTimelineRows,
     PartiallyPrecomputedWeeklyTimeline,
     ProductivityBreakdownByWeek,
     ProgramBarChartContent,
     ProgramTimelineContent,
     ProgramUsageTimeline,
-    TimelineEntrySchema,
     TimelineEvent,
-    TimelineRows,
+    TimelineRowsWithCursor,
     WeeklyChromeContent,
     WeeklyProgramContent,
     WeeklyProgramUsageTimeline,
     WeeklyTimeline,
 )
 from activitytracker.object.pydantic_dto import UtcDtTabChange
+from activitytracker.routes.category_routes import router as category_router
 from activitytracker.routes.report_routes import router as report_router
 from activitytracker.routes.video_routes import router as video_router
 from activitytracker.service_dependencies import (
@@ -70,10 +72,15 @@ from activitytracker.service_dependencies import (
     get_dashboard_service,
     get_keyboard_service,
     get_mouse_service,
+    get_persistence_worker,
     get_timezone_service,
 )
 from activitytracker.services.chrome_service import ChromeService
 from activitytracker.services.dashboard_service import DashboardService
+from activitytracker.services.partition_maintenance_service import (
+    PartitionMaintenanceService,
+)
+from activitytracker.services.timeline_precompute_service import TimelinePrecomputeService
 from activitytracker.services.timezone_service import TimezoneService
 from activitytracker.services.tiny_services import CaptureSessionService
 from activitytracker.surveillance_manager import FacadeInjector, SurveillanceManager
@@ -81,12 +88,24 @@ from activitytracker.util.clock import UserFacingClock
 from activitytracker.util.console_logger import ConsoleLogger
 from activitytracker.util.endpoint_util import field_has_utc_tzinfo_else_throw
 from activitytracker.util.errors import MustHaveUtcTzInfoError
+from activitytracker.util.live_timeline import get_live_timeline
 from activitytracker.util.pydantic_factory import (
     DtoMapper,
     manufacture_chrome_bar_chart,
     manufacture_programs_bar_chart,
 )
 from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.timeline_json import (
+    FastJSONResponse,
+    TimelineCursor,
+    TimelineFormat,
+    day_as_json,
+    dumps,
+    rows_as_json,
+    with_cursor,
+    with_format,
+)
+from activitytracker.util.week_response_cache import get_week_response_cache
 
 # from activitytracker.facade.program_facade import ProgramApiFacadeCore
 
@@ -156,11 +175,28 @@ async def lifespan(app: FastAPI):
     activity_tracker_state.manager.print_sys_status_info()
     activity_tracker_state.manager.start_trackers()
 
+    # Shares the live timeline, so at rollover the finished day is stored from memory
+    live_timeline_dao = TimelineEntryDao(
+        async_session_maker, live_timeline=get_live_timeline()
+    )
+    await live_timeline_dao.load_live_timeline(user_facing_clock.now())
+
+    precompute_service = TimelinePrecomputeService(live_timeline_dao, user_facing_clock)
+    precompute_service.start()
+
+    # Months made ahead of the writes, old ones dropped once they're precomputed
+    partition_service = PartitionMaintenanceService(
+        PartitionDao(async_session_maker), precompute_service, user_facing_clock
+    )
+    partition_service.start()
+
     try:
         yield
     finally:
         # Shutdown
         activity_tracker_state.is_running = False
+        await precompute_service.stop()
+        await partition_service.stop()
 
         print("Shutting down productivity tracking...")
         if activity_tracker_state.manager:
@@ -203,6 +239,7 @@ app.add_middleware(
 
 app.include_router(report_router)
 app.include_router(video_router)
+app.include_router(category_router)
 
 
 class HealthResponse(BaseModel):
@@ -224,6 +261,50 @@ async def health_check():
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
 
+class PersistenceHealth(BaseModel):
+    depth: int
+    submitted: int
+    completed: int
+    failed: int
+    high_water_mark: int
+    over_bound: int
+    dropped: int
+
+
+@app.get("/api/health/persistence", response_model=PersistenceHealth)
+async def persistence_health():
+    """Is the recorder's DB worker keeping up? over_bound > 0 means backpressure"""
+    return get_persistence_worker().get_metrics()
+
+
+class WeekCacheHealth(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+@app.get("/api/health/week_cache", response_model=WeekCacheHealth)
+async def week_cache_health():
+    return get_week_response_cache().get_stats()
+
+
+class LiveTimelineHealth(BaseModel):
+    loaded_from: date | None
+    days: List[date]
+    events: int
+    entries: int
+    highest_id: int
+
+
+@app.get("/api/health/live_timeline", response_model=LiveTimelineHealth)
+async def live_timeline_health():
+    return get_live_timeline().get_stats()
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     # print("VALIDATION ERROR:", exc.errors())
@@ -247,23 +328,61 @@ async def validation_exception_handler(request, exc):
     )
 
 
-@app.get("/api/dashboard/timeline", response_model=TimelineRows)
+def get_timeline_format(
+    request: Request,
+    format: str | None = Query(None, description='"columnar" for parallel arrays'),
+    delta: bool = Query(False, description="Delta-encode the columnar arrays"),
+) -> TimelineFormat:
+    return TimelineFormat.negotiate(format, delta, request.headers.get("accept"))
+
+
+def get_timeline_cursor(
+    since: str | None = Query(
+        None, description="A previous response's cursor, or an ISO timestamp watermark"
+    ),
+) -> TimelineCursor | None:
+    if since is None:
+        return None
+    try:
+        return TimelineCursor.parse(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def timeline_response(payload: dict, timeline_format: TimelineFormat) -> FastJSONResponse:
+    return FastJSONResponse(
+        with_format(payload, timeline_format), headers={"Vary": "Accept"}
+    )
+
+
+@app.get("/api/dashboard/timeline", response_model=TimelineRowsWithCursor)
 async def get_timeline_for_dashboard(
     dashboard_service: DashboardService = Depends(get_dashboard_service),
+    timeline_format: TimelineFormat = Depends(get_timeline_format),
+    since: TimelineCursor | None = Depends(get_timeline_cursor),
 ):
-    # mouse_rows, keyboard_rows = await dashboard_service.get_peripheral_timeline_for_today()
-    mouse_rows, keyboard_rows = await dashboard_service.peripherals.get_timeline_for_today()
+    cursor = await dashboard_service.peripherals.read_timeline_cursor()
+    is_delta = False
+    if since is None:
+        mouse_rows, keyboard_rows = (
+            await dashboard_service.peripherals.get_timeline_for_today()
+        )
+    else:
+        mouse_rows, keyboard_rows, is_delta = (
+            await dashboard_service.peripherals.get_timeline_for_today_since(
+                since.after_id, since.watermark
+            )
+        )
     # // TODO: make this be given by day
     if not isinstance(mouse_rows, list) or not isinstance(keyboard_rows, list):
         raise HTTPException(status_code=500, detail="Failed to retrieve timeline info")
 
-    # Convert SQLAlchemy models to Pydantic models
-    pydantic_mouse_rows = [TimelineEntrySchema.from_orm_model(row) for row in mouse_rows]
-    pydantic_keyboard_rows = [
-        TimelineEntrySchema.from_orm_model(row) for row in keyboard_rows
-    ]
-
-    return TimelineRows(mouseRows=pydantic_mouse_rows, keyboardRows=pydantic_keyboard_rows)
+    return timeline_response(
+        with_cursor(
+            rows_as_json(mouse_rows, keyboard_rows, timeline_format), cursor, is_delta
+        ),
+        timeline_format,
+    )
 
 
 @app.get("/api/dashboard/program/summaries", response_model=ProgramBarChartContent)
@@ -292,6 +411,23 @@ async def get_chrome_time_for_dashboard(
 # By Week # By Week
 #
 
+week_response_cache = get_week_response_cache()
+week_cache_clock = UserFacingClock()
+
+
+def cached_week_response(endpoint: str, week_of: date, user_tz: str) -> Response | None:
+    body = week_response_cache.get(endpoint, week_of, user_tz)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+
+def week_response(endpoint: str, week_of: date, user_tz: str, payload: BaseModel | bytes):
+    """Serializes once. A closed week keeps the bytes for next time"""
+    body = payload if isinstance(payload, bytes) else payload.model_dump_json().encode()
+    week_response_cache.put(endpoint, week_of, user_tz, body, week_cache_clock.now().dt)
+    return Response(content=body, media_type="application/json")
+
 
 @app.get(
     "/api/dashboard/breakdown/week/{week_of}", response_model=ProductivityBreakdownByWeek
@@ -301,6 +437,11 @@ async def get_productivity_breakdown(
     dashboard_service: DashboardService = Depends(get_dashboard_service),
     timezone_service: TimezoneService = Depends(get_timezone_service),
 ):
+    user_tz = timezone_service.get_tz_for_user(1)
+    cached = cached_week_response("breakdown", week_of, user_tz)
+    if cached is not None:
+        return cached
+
     weeks_overview: List[dict] = await dashboard_service.get_weekly_productivity_overview(
         week_of
     )
@@ -312,7 +453,8 @@ async def get_productivity_breakdown(
         if not isinstance(some_dict, dict):
             raise HTTPException(status_code=500, detail="Expected a list of dicts")
 
-    return ProductivityBreakdownByWeek(days=DtoMapper.map_overview(weeks_overview))
+    breakdown = ProductivityBreakdownByWeek(days=DtoMapper.map_overview(weeks_overview))
+    return week_response("breakdown", week_of, user_tz, breakdown)
 
 
 @app.get("/api/dashboard/program/summaries/week", response_model=WeeklyProgramContent)
@@ -356,7 +498,13 @@ async def get_chrome_week_history(
 async def get_previous_week_chrome_history(
     week_of: date = Path(..., description="Week starting date"),
     dashboard_service: DashboardService = Depends(get_dashboard_service),
+    timezone_service: TimezoneService = Depends(get_timezone_service),
 ):
+    user_tz = timezone_service.get_tz_for_user(1)
+    cached = cached_week_response("chrome", week_of, user_tz)
+    if cached is not None:
+        return cached
+
     week_of_unsorted_domain_summaries: List[DailyDomainSummary] = (
         await dashboard_service.get_previous_week_chrome_summary(week_of)
     )
@@ -378,57 +526,48 @@ async def get_previous_week_chrome_history(
     # days = [DtoMapper.map_chrome(day) for day in package]
     days = DtoMapper.map_chrome(week_of_unsorted_domain_summaries)
 
-    return WeeklyChromeContent(days=days)
+    return week_response("chrome", week_of, user_tz, WeeklyChromeContent(days=days))
 
 
 @app.get("/api/dashboard/timeline/week", response_model=PartiallyPrecomputedWeeklyTimeline)
 async def get_timeline_weekly(
     dashboard_service: DashboardService = Depends(get_dashboard_service),
+    timeline_format: TimelineFormat = Depends(get_timeline_format),
+    since: TimelineCursor | None = Depends(get_timeline_cursor),
 ):
-    days_before_today, todays_payload, latest_sunday = (
-        await dashboard_service.peripherals.get_current_week_timeline()
-    )
-    rows: List[DayOfTimelineRows] = []
-
-    assert isinstance(todays_payload, dict)
-    todays_date = todays_payload["date"]
-
-    mouse_rows = todays_payload["mouse_events"]
-    keyboard_rows = todays_payload["keyboard_events"]
-    # Convert SQLAlchemy models to Pydantic models
-    pydantic_mouse_rows = [TimelineEntrySchema.from_orm_model(row) for row in mouse_rows]
-    pydantic_keyboard_rows = [
-        TimelineEntrySchema.from_orm_model(row) for row in keyboard_rows
-    ]
-
-    todays_row = TimelineRows(
-        mouseRows=pydantic_mouse_rows, keyboardRows=pydantic_keyboard_rows
-    )
-
-    todays_payload = DayOfTimelineRows(date=todays_date, row=todays_row)
-
-    for day in days_before_today:
-        assert isinstance(day, dict)
-        mouse_rows = day["mouse_events"]
-        keyboard_rows = day["keyboard_events"]
-        # Convert SQLAlchemy models to Pydantic models
-        pydantic_mouse_rows = [TimelineEntrySchema.from_orm_model(row) for row in mouse_rows]
-        pydantic_keyboard_rows = [
-            TimelineEntrySchema.from_orm_model(row) for row in keyboard_rows
-        ]
-
-        row = TimelineRows(
-            mouseRows=pydantic_mouse_rows, keyboardRows=pydantic_keyboard_rows
+    cursor = await dashboard_service.peripherals.read_timeline_cursor()
+    is_delta = False
+    if since is not None:
+        # The days before today are precomputed and don't change. If "today" has a
+        # different date than the one the client has, it's a new day: fetch it all again
+        days_before_today = []
+        todays_payload, latest_sunday, is_delta = (
+            await dashboard_service.peripherals.get_current_week_timeline_since(
+                since.after_id, since.watermark
+            )
         )
-
-        row = DayOfTimelineRows(date=day["date"], row=row)
-        rows.append(row)
+    if not is_delta:
+        days_before_today, todays_payload, latest_sunday = (
+            await dashboard_service.peripherals.get_current_week_timeline()
+        )
+    assert isinstance(todays_payload, dict)
 
     if not isinstance(latest_sunday, datetime):
         raise ValueError("Expected dt in latest_sunday")
 
-    return PartiallyPrecomputedWeeklyTimeline(
-        beforeToday=rows, today=todays_payload, startDate=latest_sunday
+    return timeline_response(
+        with_cursor(
+            {
+                "beforeToday": [
+                    day_as_json(day, timeline_format) for day in days_before_today
+                ],
+                "today": day_as_json(todays_payload, timeline_format),
+                "startDate": latest_sunday,
+            },
+            cursor,
+            is_delta,
+        ),
+        timeline_format,
     )
 
 
@@ -436,7 +575,16 @@ async def get_timeline_weekly(
 async def get_previous_week_of_timeline(
     week_of: date = Path(..., description="Week starting date"),
     dashboard_service: DashboardService = Depends(get_dashboard_service),
+    timezone_service: TimezoneService = Depends(get_timezone_service),
+    timeline_format: TimelineFormat = Depends(get_timeline_format),
 ):
+    user_tz = timezone_service.get_tz_for_user(1)
+    # Each format is its own cache entry. Invalidating a day drops all of them
+    endpoint = timeline_format.cache_key("timeline")
+    cached = cached_week_response(endpoint, week_of, user_tz)
+    if cached is not None:
+        cached.headers["Vary"] = "Accept"
+        return cached
 
     days, start_of_week = await dashboard_service.peripherals.get_specific_week_timeline(
         week_of
@@ -445,29 +593,22 @@ async def get_previous_week_of_timeline(
     if not isinstance(start_of_week, datetime):
         raise ValueError("start_of_week.dt was expected to be a datetime")
 
-    rows: List[DayOfTimelineRows] = []
-    for day in days:
-        assert isinstance(day, dict)
-        mouse_rows = day["mouse_events"]
-        keyboard_rows = day["keyboard_events"]
-
-        pydantic_mouse_rows = [TimelineEntrySchema.from_orm_model(row) for row in mouse_rows]
-        pydantic_keyboard_rows = [
-            TimelineEntrySchema.from_orm_model(row) for row in keyboard_rows
-        ]
-        row = TimelineRows(
-            mouseRows=pydantic_mouse_rows, keyboardRows=pydantic_keyboard_rows
-        )
-        row = DayOfTimelineRows(date=day["date"], row=row)
-        rows.append(row)
-
     # TODO: Convert from UTC to PST for the client
     appeasement_of_type_checker = datetime.combine(
         start_of_week.date(), start_of_week.time(), start_of_week.tzinfo
     )
 
-    response = WeeklyTimeline(days=rows, start_date=appeasement_of_type_checker)
-
+    body = dumps(
+        with_format(
+            {
+                "days": [day_as_json(day, timeline_format) for day in days],
+                "start_date": appeasement_of_type_checker,
+            },
+            timeline_format,
+        )
+    )
+    response = week_response(endpoint, week_of, user_tz, body)
+    response.headers["Vary"] = "Accept"
     return response
 
 
@@ -515,7 +656,12 @@ async def get_program_usage_timeline_for_present_week(
 async def get_program_usage_timeline_by_week(
     week_of: date = Path(..., description="Week starting date"),
     dashboard_service: DashboardService = Depends(get_dashboard_service),
+    timezone_service: TimezoneService = Depends(get_timezone_service),
 ):
+    user_tz = timezone_service.get_tz_for_user(1)
+    cached = cached_week_response("programs_usage", week_of, user_tz)
+    if cached is not None:
+        return cached
 
     all_days, start_of_week = await dashboard_service.programs.get_usage_timeline_for_week(
         week_of
@@ -543,7 +689,8 @@ async def get_program_usage_timeline_by_week(
         day_timeline = ProgramUsageTimeline(date=date, programs=programs_content)
         days.append(day_timeline)
 
-    return WeeklyProgramUsageTimeline(days=days)
+    usage = WeeklyProgramUsageTimeline(days=days)
+    return week_response("programs_usage", week_of, user_tz, usage)
 
 
 @app.get("/api/report/chrome")
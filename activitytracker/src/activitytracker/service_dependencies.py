@@ -1,13 +1,27 @@
 # activitytracker/src/service_dependencies.py
+from functools import partial
+
 from fastapi import Depends
 
 import asyncio
 
+import time
+
 from typing import Callable
 
 from activitytracker.arbiter.activity_arbiter import ActivityArbiter
 from activitytracker.arbiter.activity_recorder import ActivityRecorder
-from activitytracker.arbiter.session_polling import ThreadedEngineContainer
+from activitytracker.arbiter.persistence_worker import PersistenceWorker
+from activitytracker.arbiter.session_polling import (
+    KeepAliveEngine,
+    ThreadedEngineContainer,
+)
+from activitytracker.config.definitions import (
+    keep_alive_tick_length,
+    persistence_queue_size,
+    pulse_flush_interval,
+)
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
 from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
 from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
 from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
@@ -16,7 +30,13 @@ from activitytracker.db.dao.queuing.mouse_dao import MouseDao
 from activitytracker.db.dao.queuing.program_logs_dao import ProgramLoggingDao
 from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
 from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
-from activitytracker.db.database import async_session_maker, regular_session_maker
+from activitytracker.db.database import (
+    async_read_session_maker,
+    async_session_maker,
+    read_session_maker,
+    regular_session_maker,
+)
+from activitytracker.db.unit_of_work import UnitOfWorkSessionMaker
 from activitytracker.debug.ui_notifier import UINotifier
 from activitytracker.facade.facade_singletons import (
     get_keyboard_facade_instance,
@@ -30,33 +50,49 @@ from activitytracker.services.tiny_services import (
     MouseService,
 )
 from activitytracker.util.clock import SystemClock, UserFacingClock
+from activitytracker.util.live_timeline import get_live_timeline
 
 # Dependency functions
 system_clock = SystemClock()
 user_facing_clock = UserFacingClock()
 
-_program_logging_dao = ProgramLoggingDao(regular_session_maker)
-_chrome_logging_dao = ChromeLoggingDao(regular_session_maker)
+# The dashboard DAOs only read. They use the read-only pool, so that a week read
+# never holds a connection the recorder and the keep-alive pulses are waiting for
+_program_logging_dao = ProgramLoggingDao(read_session_maker)
+_chrome_logging_dao = ChromeLoggingDao(read_session_maker)
 
 
 async def get_keyboard_dao() -> KeyboardDao:
-    return KeyboardDao(async_session_maker)
+    return KeyboardDao(async_read_session_maker)
 
 
 async def get_mouse_dao() -> MouseDao:
-    return MouseDao(async_session_maker)
+    return MouseDao(async_read_session_maker)
 
 
 async def get_timeline_dao() -> TimelineEntryDao:
-    return TimelineEntryDao(async_session_maker)
+    # Precomputing a past day inline still needs the writer
+    return TimelineEntryDao(
+        async_session_maker,
+        read_session_maker=async_read_session_maker,
+        live_timeline=get_live_timeline(),
+    )
 
 
 async def get_program_summary_dao() -> ProgramSummaryDao:
-    return ProgramSummaryDao(_program_logging_dao, regular_session_maker)
+    return ProgramSummaryDao(_program_logging_dao, read_session_maker)
 
 
 async def get_chrome_summary_dao() -> ChromeSummaryDao:
-    return ChromeSummaryDao(_chrome_logging_dao, regular_session_maker)
+    return ChromeSummaryDao(_chrome_logging_dao, read_session_maker)
+
+
+async def get_activity_category_dao() -> ActivityCategoryDao:
+    return ActivityCategoryDao(regular_session_maker)
+
+
+async def get_activity_category_reader() -> ActivityCategoryDao:
+    return ActivityCategoryDao(read_session_maker)
 
 
 async def get_program_logging_dao() -> ProgramLoggingDao:
@@ -112,6 +148,7 @@ async def get_dashboard_service(
     program_logging_dao: ProgramLoggingDao = Depends(get_program_logging_dao),
     chrome_summary_dao: ChromeSummaryDao = Depends(get_chrome_summary_dao),
     chrome_logging_dao: ChromeLoggingDao = Depends(get_chrome_logging_dao),
+    activity_category_dao: ActivityCategoryDao = Depends(get_activity_category_reader),
 ):
     # Lazy import to avoid circular dependency
     from activitytracker.services.dashboard_service import DashboardService
@@ -122,6 +159,7 @@ async def get_dashboard_service(
         program_logging_dao,
         chrome_summary_dao,
         chrome_logging_dao,
+        activity_category_dao,
     )
 
 
@@ -129,6 +167,16 @@ async def get_dashboard_service(
 _arbiter_instance = None
 # Singleton instance of ChromeService
 _chrome_service_instance = None
+# Singleton: the thread that does the recorder's DB writes
+_persistence_worker = None
+
+
+def get_persistence_worker() -> PersistenceWorker:
+    global _persistence_worker
+    if not _persistence_worker:
+        _persistence_worker = PersistenceWorker(persistence_queue_size)
+        _persistence_worker.start()
+    return _persistence_worker
 
 
 async def get_activity_arbiter():
@@ -141,22 +189,28 @@ async def get_activity_arbiter():
     from activitytracker.debug.debug_overlay import Overlay
 
     user_facing_clock = UserFacingClock()
-    program_logging_dao = ProgramLoggingDao(regular_session_maker)
-    chrome_logging_dao = ChromeLoggingDao(regular_session_maker)
-    video_logging_dao = VideoLoggingDao(regular_session_maker)
+    # Shared by the recorder's DAOs so that an arbiter transition commits once
+    recorder_session_maker = UnitOfWorkSessionMaker(regular_session_maker)
+    program_logging_dao = ProgramLoggingDao(recorder_session_maker)
+    chrome_logging_dao = ChromeLoggingDao(recorder_session_maker)
+    video_logging_dao = VideoLoggingDao(recorder_session_maker)
 
-    program_summary_dao = ProgramSummaryDao(program_logging_dao, regular_session_maker)
-    chrome_summary_dao = ChromeSummaryDao(chrome_logging_dao, regular_session_maker)
-    video_summary_dao = VideoSummaryDao(video_logging_dao, regular_session_maker)
+    program_summary_dao = ProgramSummaryDao(program_logging_dao, recorder_session_maker)
+    chrome_summary_dao = ChromeSummaryDao(chrome_logging_dao, recorder_session_maker)
+    video_summary_dao = VideoSummaryDao(video_logging_dao, recorder_session_maker)
 
-    mystery_dao = MysteryMediaDao(regular_session_maker)
+    mystery_dao = MysteryMediaDao(recorder_session_maker)
 
     polling_interval = 10
     system_status_dao = SystemStatusDao(
         user_facing_clock, polling_interval, regular_session_maker
     )
 
-    container = ThreadedEngineContainer(1)
+    container = ThreadedEngineContainer(keep_alive_tick_length)
+    # Real elapsed time, so the windows don't drift with the thread's jitter
+    engine_class = partial(
+        KeepAliveEngine, monotonic_fn=time.monotonic, tick_length=keep_alive_tick_length
+    )
 
     # TODO: Get the SystemStatusDao into here
 
@@ -173,6 +227,9 @@ async def get_activity_arbiter():
             chrome_summary_dao,
             video_summary_dao,
             mystery_dao,
+            regular_session=recorder_session_maker,
+            pulse_flush_interval=pulse_flush_interval,
+            persistence_worker=get_persistence_worker(),
         )
         print("Creating new ActivityArbiter")
         chrome_service = await get_chrome_service()
@@ -181,6 +238,7 @@ async def get_activity_arbiter():
             user_facing_clock=user_facing_clock,
             sleep_detector=system_status_dao,
             threaded_container=container,
+            engine_class=engine_class,
         )
 
         _arbiter_instance.add_ui_listener(ui_layer.on_state_changed)
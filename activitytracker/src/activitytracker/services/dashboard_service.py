@@ -3,7 +3,7 @@ from datetime import date, datetime, timedelta, timezone
 
 from typing import Dict, List, Tuple, TypedDict
 
-from activitytracker.config.definitions import productive_apps, productive_sites
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
 from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
 from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
 from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
@@ -15,6 +15,7 @@ from activitytracker.db.models import (
     ProgramSummaryLog,
     TimelineEntryObj,
 )
+from activitytracker.object.enums import ChartEventType, ProductivityCategory
 from activitytracker.services.timezone_service import TimezoneService
 from activitytracker.tz_handling.time_formatting import (
     format_for_local_time,
@@ -34,12 +35,14 @@ class DashboardService(WeekCalculationMixin):
         program_logging_dao: ProgramLoggingDao,
         chrome_summary_dao: ChromeSummaryDao,
         chrome_logging_dao: ChromeLoggingDao,
+        activity_category_dao: ActivityCategoryDao,
     ):
         self.timeline_dao = timeline_dao
         self.program_summary_dao = program_summary_dao
         self.program_logging_dao = program_logging_dao
         self.chrome_summary_dao = chrome_summary_dao
         self.chrome_logging_dao = chrome_logging_dao
+        self.activity_category_dao = activity_category_dao
         self.user_clock = UserFacingClock()
         self.logger = ConsoleLogger()
 
@@ -57,49 +60,23 @@ class DashboardService(WeekCalculationMixin):
         starting_sunday: datetime = self.prepare_start_of_week(week_of)
 
         # TODO: Standardize (prepare start of week method)
+        sunday_as_ult = self.timezone_service.convert_into_user_timezone_ult(starting_sunday)
 
-        usage_from_days = []
+        # One grouped query for the whole week, categorized by the activity_categories table
+        weeks_breakdown = self.activity_category_dao.read_week_breakdown(sunday_as_ult)
 
-        alt_tab_window_hours = []
+        usage_from_days = []
 
         for i in range(7):
-            # significant_programs = {}  # New dictionary to track programs with >1hr usage
-
             current_day: datetime = starting_sunday + timedelta(days=i)
 
             date_with_tz_info: UserLocalTime = (
                 self.timezone_service.convert_into_user_timezone_ult(current_day)
             )
 
-            daily_chrome_summaries: List[DailyDomainSummary] = (
-                self.chrome_summary_dao.read_day(date_with_tz_info)
-            )
-            daily_program_summaries: List[DailyProgramSummary] = (
-                self.program_summary_dao.read_day(date_with_tz_info)
-            )
-            productivity = 0
-            leisure = 0
-            for domain in daily_chrome_summaries:
-                if domain.domain_name in productive_sites:
-                    productivity = productivity + domain.hours_spent
-                else:
-                    leisure = leisure + domain.hours_spent
-
-            for program in daily_program_summaries:
-                # Make sure Chrome is SKIPPED!
-                if program.program_name == "Google Chrome":
-                    # TODO: Verify that Chrome doesn't put a session into the Arbiter.
-                    continue  # Don't double count
-                hours_spent: float = float(program.hours_spent)  # type: ignore
-
-                if str(program.program_name) == "Alt-tab window":
-                    alt_tab_window_hours.append(program.hours_spent)
-                    continue  # temp - skipping bugged outputs
-                if program.program_name in productive_apps:
-                    # print("< LOG > adding " + program.program_name)
-                    productivity = productivity + hours_spent
-                else:
-                    leisure = leisure + hours_spent
+            totals = weeks_breakdown.get(current_day.date(), {})
+            productivity = totals.get(ProductivityCategory.PRODUCTIVE, 0)
+            leisure = totals.get(ProductivityCategory.LEISURE, 0)
             day = {
                 "day": date_with_tz_info.dt,
                 "productivity": float(f"{productivity:.4f}"),
@@ -107,7 +84,6 @@ class DashboardService(WeekCalculationMixin):
             }
 
             usage_from_days.append(day)
-        print("alt tab windows: ", alt_tab_window_hours)
 
         return usage_from_days
 
@@ -139,14 +115,10 @@ class DashboardService(WeekCalculationMixin):
         if start_sunday.weekday() != 6:  # In Python, Sunday is 6
             raise ValueError("start_date must be a Sunday")
         starting_sunday: datetime = self.prepare_start_of_week(start_sunday)
+        sunday_as_ult = self.timezone_service.convert_into_user_timezone_ult(starting_sunday)
         usage_from_days = []
-        for i in range(7):
-            current_day = starting_sunday + timedelta(days=i)
-
-            date_as_ult = self.timezone_service.convert_into_user_timezone_ult(current_day)
-
-            daily_summaries = self.chrome_summary_dao.read_day(date_as_ult)
-
+        # Already in day order
+        for daily_summaries in self.chrome_summary_dao.read_week(sunday_as_ult).values():
             usage_from_days.extend(daily_summaries)
 
         return usage_from_days
@@ -182,16 +154,20 @@ class ProgramsService(WeekCalculationMixin):
 
         all_days = []
 
+        weeks_logs = self.program_logging_dao.read_week_as_sorted(
+            UserLocalTime(starting_sunday)
+        )
+
         for days_after_sunday in range(7):
             current_day: datetime = starting_sunday + timedelta(days=days_after_sunday)
 
             is_in_future = current_day > start_of_tomorrow
             if is_in_future:
-                continue  # avoid reading future dates from db
+                continue  # The range query has nothing for it anyways
 
-            program_usage_timeline: dict[str, ProgramSummaryLog] = (
-                self.program_logging_dao.read_day_as_sorted(UserLocalTime(current_day))
-            )
+            program_usage_timeline: dict[str, ProgramSummaryLog] = weeks_logs[
+                current_day.date()
+            ]
             day = {
                 "date": current_day,
                 "program_usage_timeline": program_usage_timeline,
@@ -212,17 +188,19 @@ class ProgramsService(WeekCalculationMixin):
 
         all_days = []
 
+        weeks_logs = self.program_logging_dao.read_week_as_sorted(
+            UserLocalTime(starting_sunday)
+        )
+
         for days_after_sunday in range(7):
             current_day: datetime = starting_sunday + timedelta(days=days_after_sunday)
-            print(current_day)
-            print(start_of_tomorrow)
             is_in_future: bool = current_day > start_of_tomorrow
             if is_in_future:
-                continue  # avoid reading future dates from db
+                continue  # The range query has nothing for it anyways
 
-            program_usage_timeline: dict[str, ProgramSummaryLog] = (
-                self.program_logging_dao.read_day_as_sorted(UserLocalTime(current_day))
-            )
+            program_usage_timeline: dict[str, ProgramSummaryLog] = weeks_logs[
+                current_day.date()
+            ]
 
             # Figure out:
             # - is the problem still happening? are new strange datapoints being made?
@@ -262,6 +240,50 @@ class PeripheralsService(WeekCalculationMixin):
         )
         return all_mouse_events, all_keyboard_events
 
+    async def read_timeline_cursor(self) -> int:
+        """
+        Read before the rows, so a row written in between is sent twice rather than never.
+        Entries are keyed by id, so the client can dedupe them, or replace a grown one
+        """
+        return await self.timeline_dao.read_timeline_cursor(self.user_clock.now())
+
+    async def get_timeline_for_today_since(
+        self, after_id: int | None = None, watermark: datetime | None = None
+    ) -> Tuple[List, List, bool]:
+        """
+        Today's rows, or merged groups, that are new or grew since the cursor.
+        Late in the day, a handful of thousands. False if it's all of them instead
+        """
+        today = self.user_clock.now()
+        new_mouse_events = await self.timeline_dao.read_today_since(
+            today, ChartEventType.MOUSE, after_id, watermark
+        )
+        new_keyboard_events = await self.timeline_dao.read_today_since(
+            today, ChartEventType.KEYBOARD, after_id, watermark
+        )
+        if new_mouse_events is None or new_keyboard_events is None:
+            all_mouse_events, all_keyboard_events = await self.get_timeline_for_today()
+            return all_mouse_events, all_keyboard_events, False
+        return new_mouse_events, new_keyboard_events, True
+
+    async def get_current_week_timeline_since(
+        self, after_id: int | None = None, watermark: datetime | None = None
+    ) -> Tuple[Dict, datetime, bool]:
+        """The week's past days don't change, so only today's changes go out"""
+        today = self.user_clock.now()
+        starting_sunday: datetime = self.prepare_start_of_week(today.date())
+        days_after_sunday = (today.date() - starting_sunday.date()).days
+
+        mouse_events, keyboard_events, is_delta = await self.get_timeline_for_today_since(
+            after_id, watermark
+        )
+        day = {
+            "date": starting_sunday + timedelta(days=days_after_sunday),
+            "mouse_events": mouse_events,
+            "keyboard_events": keyboard_events,
+        }
+        return day, starting_sunday, is_delta
+
     async def get_current_week_timeline(self) -> Tuple[List[Dict], Dict, datetime]:
         """Returns whichever days have occurred so far in the present week."""
 
@@ -273,14 +295,15 @@ class PeripheralsService(WeekCalculationMixin):
 
         todays_date = today.date()
 
+        week = await self.timeline_dao.read_week(
+            self.timezone_service.convert_into_user_timezone_ult(starting_sunday),
+            self.user_clock,
+        )
+
         for days_after_sunday in range(7):
             current_day = starting_sunday + timedelta(days=days_after_sunday)
-            mouse_events = await self.timeline_dao.read_day_mice(
-                UserLocalTime(current_day), self.user_clock
-            )
-            keyboard_events = await self.timeline_dao.read_day_keyboard(
-                UserLocalTime(current_day), self.user_clock
-            )
+            mouse_events = week[current_day.date()][ChartEventType.MOUSE]
+            keyboard_events = week[current_day.date()][ChartEventType.KEYBOARD]
 
             self.logger.log_days_retrieval(
                 "[get_current_week_timeline]",
@@ -309,19 +332,16 @@ class PeripheralsService(WeekCalculationMixin):
 
         all_days = []
 
+        week = await self.timeline_dao.read_week(
+            self.timezone_service.convert_into_user_timezone_ult(starting_sunday),
+            self.user_clock,
+        )
+
         for days_after_sunday in range(7):
             current_day: datetime = starting_sunday + timedelta(days=days_after_sunday)
 
-            current_day_ult = self.timezone_service.convert_into_user_timezone_ult(
-                current_day
-            )
-
-            mouse_events = await self.timeline_dao.read_day_mice(
-                current_day_ult, self.user_clock
-            )
-            keyboard_events = await self.timeline_dao.read_day_keyboard(
-                current_day_ult, self.user_clock
-            )
+            mouse_events = week[current_day.date()][ChartEventType.MOUSE]
+            keyboard_events = week[current_day.date()][ChartEventType.KEYBOARD]
 
             self.logger.log_days_retrieval(
                 "[get_specific_week_timeline]",
@@ -0,0 +1,113 @@
+import asyncio
+
+from datetime import date, timedelta
+
+from typing import List
+
+from activitytracker.config.definitions import (
+    partition_months_ahead,
+    raw_event_retention_days,
+)
+from activitytracker.db.dao.direct.partition_dao import PartitionDao
+from activitytracker.services.timeline_precompute_service import TimelinePrecomputeService
+from activitytracker.util.clock import UserFacingClock
+from activitytracker.util.console_logger import ConsoleLogger
+from activitytracker.util.partitions import (
+    days_needed,
+    expired_months,
+    is_covered,
+    months_to_create,
+    partition_name,
+    partitioned_tables,
+)
+
+
+class PartitionMaintenanceService:
+    """
+    Keeps the raw event tables' monthly partitions ahead of the writes,
+    and drops the old ones once their days are in precomputed_timelines.
+
+    Dropping a month is one DROP TABLE, so the tables' size, their vacuums and
+    their backups stop growing with how long the tracker has been installed.
+    """
+
+    def __init__(
+        self,
+        partition_dao: PartitionDao,
+        precompute_service: TimelinePrecomputeService,
+        user_facing_clock: UserFacingClock,
+        retention_days: int = raw_event_retention_days,
+        months_ahead: int = partition_months_ahead,
+        interval: timedelta = timedelta(days=1),
+        sleep_fn=asyncio.sleep,
+    ):
+        self.partition_dao = partition_dao
+        self.precompute_service = precompute_service
+        self.user_facing_clock = user_facing_clock
+        self.retention_days = retention_days
+        self.months_ahead = months_ahead
+        self.interval = interval
+        self.sleep_fn = sleep_fn
+        self.current_task = None
+        self.is_running = False
+        self.logger = ConsoleLogger()
+
+    def today(self) -> date:
+        return self.user_facing_clock.now().date()
+
+    async def create_ahead(self) -> List[str]:
+        created = []
+        for table in partitioned_tables:
+            for month in months_to_create(self.today(), self.months_ahead):
+                if await self.partition_dao.create_month(table, month):
+                    created.append(partition_name(table, month))
+        return created
+
+    async def drop_expired(self) -> List[str]:
+        months = {}
+        for table in partitioned_tables:
+            months[table] = await self.partition_dao.read_months(table)
+        all_months = {month for table_months in months.values() for month in table_months}
+        dropped = []
+        for month in expired_months(all_months, self.today(), self.retention_days):
+            days = days_needed(month)
+            # A day the server was off for was never precomputed. It is now, or never
+            await self.precompute_service.backfill(days[0], days[-1])
+            markers = await self.partition_dao.read_precomputed_markers(days[0], days[-1])
+            for table, (_, groups) in partitioned_tables.items():
+                if month not in months[table]:
+                    continue
+                if not is_covered(month, groups, markers):
+                    self.logger.log_yellow(
+                        f"[partitions] kept {partition_name(table, month)}: not precomputed"
+                    )
+                    continue
+                await self.partition_dao.drop_month(table, month)
+                dropped.append(partition_name(table, month))
+        return dropped
+
+    async def run_once(self):
+        try:
+            created = await self.create_ahead()
+            dropped = await self.drop_expired()
+            self.logger.log_purple(f"[partitions] created: {created}, dropped: {dropped}")
+        except Exception as e:
+            print(f"ERROR maintaining partitions: {e}")
+
+    async def _loop(self):
+        while self.is_running:
+            await self.run_once()
+            await self.sleep_fn(self.interval.total_seconds())
+
+    def start(self):
+        self.is_running = True
+        self.current_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+        if self.current_task:
+            self.current_task.cancel()
+            try:
+                await self.current_task
+            except asyncio.CancelledError:
+                pass  # expected during shutdown
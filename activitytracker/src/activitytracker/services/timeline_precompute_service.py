@@ -0,0 +1,131 @@
+import argparse
+
+import asyncio
+
+from datetime import date, datetime, time, timedelta
+
+from typing import Dict
+
+from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.clock import UserFacingClock
+from activitytracker.util.console_logger import ConsoleLogger
+from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.week_response_cache import get_week_response_cache
+
+
+class TimelinePrecomputeService:
+    """
+    Precomputes the mouse & keyboard timelines of past days in the background,
+    so a dashboard request never has to aggregate a day inline.
+
+    Runs for yesterday on start (in case the server was off at midnight),
+    then again a little after each local midnight.
+    """
+
+    def __init__(
+        self,
+        timeline_dao: TimelineEntryDao,
+        user_facing_clock: UserFacingClock,
+        grace_period: timedelta = timedelta(minutes=5),
+        sleep_fn=asyncio.sleep,
+    ):
+        self.timeline_dao = timeline_dao
+        self.user_facing_clock = user_facing_clock
+        # Stragglers from the last seconds of the day are still in the write queue
+        self.grace_period = grace_period
+        self.sleep_fn = sleep_fn
+        self.current_task = None
+        self.is_running = False
+        self.logger = ConsoleLogger()
+
+    def as_day(self, day: date) -> UserLocalTime:
+        tz = self.user_facing_clock.now().dt.tzinfo
+        return UserLocalTime(datetime.combine(day, time.min, tzinfo=tz))
+
+    async def precompute_day(
+        self, day: date, force=False
+    ) -> Dict[ChartEventType, int | None]:
+        """Entries written per event type. None means it was already done"""
+        if day >= self.user_facing_clock.now().date():
+            raise ValueError(f"Can't precompute {day}, it isn't over yet")
+        local_day = self.as_day(day)
+        written = {}
+        for event_type in ChartEventType:
+            if force:
+                await self.timeline_dao.forget_precomputed_day(local_day, event_type)
+            elif await self.timeline_dao.is_day_precomputed(local_day, event_type):
+                written[event_type] = None
+                continue
+            entries = await self.timeline_dao.precompute_day(local_day, event_type)
+            written[event_type] = len(entries)
+        if force:
+            # Recomputed rows can differ from what the week's cached response holds
+            get_week_response_cache().invalidate_day(day)
+        return written
+
+    async def backfill(self, first_day: date, last_day: date, force=False):
+        """Both ends inclusive. Stops at yesterday"""
+        yesterday = self.user_facing_clock.now().date() - timedelta(days=1)
+        day = first_day
+        results = {}
+        while day <= min(last_day, yesterday):
+            results[day] = await self.precompute_day(day, force)
+            day += timedelta(days=1)
+        return results
+
+    async def precompute_yesterday(self):
+        yesterday = self.user_facing_clock.now().date() - timedelta(days=1)
+        try:
+            written = await self.precompute_day(yesterday)
+            self.logger.log_purple(f"[precompute] {yesterday}: {written}")
+        except Exception as e:
+            print(f"ERROR precomputing {yesterday}: {e}")
+
+    def seconds_until_next_run(self) -> float:
+        now = self.user_facing_clock.now().dt
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), time.min)
+        next_run = tomorrow.replace(tzinfo=now.tzinfo) + self.grace_period
+        return max((next_run - now).total_seconds(), 0)
+
+    async def _loop(self):
+        await self.precompute_yesterday()
+        while self.is_running:
+            await self.sleep_fn(self.seconds_until_next_run())
+            await self.precompute_yesterday()
+
+    def start(self):
+        self.is_running = True
+        self.current_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+        if self.current_task:
+            self.current_task.cancel()
+            try:
+                await self.current_task
+            except asyncio.CancelledError:
+                pass  # expected during shutdown
+
+
+async def run_backfill(first_day: date, last_day: date, force: bool):
+    from activitytracker.db.database import async_session_maker
+
+    service = TimelinePrecomputeService(
+        TimelineEntryDao(async_session_maker), UserFacingClock()
+    )
+    results = await service.backfill(first_day, last_day, force)
+    for day, written in results.items():
+        print(day, {event_type.value: count for event_type, count in written.items()})
+
+
+if __name__ == "__main__":
+    # python -m activitytracker.services.timeline_precompute_service 2025-05-01 2025-05-31
+    parser = argparse.ArgumentParser(description="Precompute past days' timelines")
+    parser.add_argument("first_day", type=date.fromisoformat)
+    parser.add_argument("last_day", type=date.fromisoformat, nargs="?")
+    parser.add_argument(
+        "--force", action="store_true", help="Recompute days that are already done"
+    )
+    args = parser.parse_args()
+    asyncio.run(run_backfill(args.first_day, args.last_day or args.first_day, args.force))
@@ -26,6 +26,7 @@ from activitytracker.util.clock import UserFacingClock
 from activitytracker.util.console_logger import ConsoleLogger
 from activitytracker.util.copy_util import snapshot_obj_for_tests
 from activitytracker.util.detect_os import OperatingSystemInfo
+from activitytracker.util.live_timeline import get_live_timeline
 from activitytracker.util.periodic_task import AsyncPeriodicTask
 from activitytracker.util.threaded_tracker import ThreadedTracker
 
@@ -101,13 +102,18 @@ class SurveillanceManager:
             chrome_summary_logger, self.regular_session
         )
 
-        self.timeline_dao = TimelineEntryDao(self.async_session_maker)
+        # Its writes keep today's merged timeline up to date for the dashboard
+        self.timeline_dao = TimelineEntryDao(
+            self.async_session_maker, live_timeline=get_live_timeline()
+        )
 
-        # Register handlers for different event types
+        # Register handlers for different event types. They take a read's worth at a time
+        self.message_receiver.register_handler(
+            "keyboard", keyboard_facade.handle_keyboard_messages, batched=True
+        )
         self.message_receiver.register_handler(
-            "keyboard", keyboard_facade.handle_keyboard_message
+            "mouse", mouse_facade.handle_mouse_messages, batched=True
         )
-        self.message_receiver.register_handler("mouse", mouse_facade.handle_mouse_message)
 
         self.keyboard_tracker = KeyboardTrackerCore(
             keyboard_facade, self.handle_keyboard_ready_for_db
@@ -119,8 +125,9 @@ class SurveillanceManager:
             clock, program_facade, self.handle_window_change
         )
 
-        self.keyboard_thread = ThreadedTracker(self.keyboard_tracker)
-        self.mouse_thread = ThreadedTracker(self.mouse_tracker)
+        # These two sleep until their facade gets an event
+        self.keyboard_thread = ThreadedTracker(self.keyboard_tracker, keyboard_facade)
+        self.mouse_thread = ThreadedTracker(self.mouse_tracker, mouse_facade)
         self.program_thread = ThreadedTracker(self.program_tracker)
 
         self.cancelled_tasks = 0
@@ -8,6 +8,10 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from activitytracker.trackers.peripherals.util.keyboard_event_dispatch import (
+    KeyboardEventDispatch,
+)
+from activitytracker.util.wire_format import encode_keyboard, encode_mouse
 
 load_dotenv()
 
@@ -26,16 +30,26 @@ socket.bind("tcp://127.0.0.1:5555")
 # No need to establish a new connection for each message
 
 
-def publish_keyboard_event():
-    event = {"type": "keyboard", "timestamp": datetime.now().timestamp()}
-    socket.send_json(event)
+def send_keyboard_batch(timestamps):
+    socket.send_multipart(encode_keyboard(timestamps))
+
+
+keyboard_event_dispatch = KeyboardEventDispatch(send_keyboard_batch)
+
+
+def publish_keyboard_event(timestamp=None):
+    """Pass the OS's time for the key if it has one. It's batched before sending"""
+    if timestamp is None:
+        timestamp = datetime.now().timestamp()
+    keyboard_event_dispatch.add_event(timestamp)
+
+
+def flush_keyboard_events():
+    """Sends whatever keys are waiting. For shutdown"""
+    keyboard_event_dispatch.flush()
 
 
 def publish_mouse_events(aggregate):
     # print("Publishing", aggregate["start"])
-    event = {
-        "type": "mouse",
-        "start": aggregate["start"],  # MUST be timestamp format, a float
-        "end": aggregate["end"],
-    }
-    socket.send_json(event)
+    # start and end MUST be timestamp format, a float
+    socket.send_multipart(encode_mouse(aggregate["start"], aggregate["end"]))
@@ -59,7 +59,8 @@ def linux_monitor_keyboard(device_path, send_keyboard_event):
                 if DEBUG_KEYBOARD:
                     print(f"Key {event.code} pressed")
 
-                send_keyboard_event()
+                # The kernel's time for the key, not whenever the loop got to it
+                send_keyboard_event(event.timestamp())
 
     except Exception as e:
         print(f"Keyboard monitoring error: {e}")
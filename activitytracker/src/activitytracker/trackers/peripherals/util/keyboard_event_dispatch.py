@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class KeyboardEventDispatch:
+    """
+    Typing fast is 10-15 key-downs a sec, and each one used to be its own message.
+    So the dispatch holds the key-down timestamps and sends them as one list.
+
+    Unlike the mouse's debounce, the deadline is set by the first key of a batch
+    and isn't pushed back by the rest, so a key is never held for longer than
+    max_delay_sec, even mid-sentence. A full batch goes out right away.
+
+    A batch is taken and sent under the one lock, so the handler, which writes
+    to a ZMQ socket, is never called from two threads at once, and the batches
+    go out oldest first. One flusher thread sees to the deadlines.
+    """
+
+    def __init__(self, batch_ready_handler, max_delay_sec=0.2, max_batch_size=64):
+        self.batch_ready_handler = batch_ready_handler
+        self.max_delay_sec = max_delay_sec
+        self.max_batch_size = max_batch_size
+        self.timestamps = []
+        self.deadline = None
+        self._lock = threading.Lock()
+        self._batch_started = threading.Condition(self._lock)
+        self.flusher_thread = None
+
+    def add_event(self, timestamp: float):
+        with self._lock:
+            self.timestamps.append(timestamp)
+            if len(self.timestamps) >= self.max_batch_size:
+                self._send_batch()
+                return
+            if self.deadline is None:
+                self.deadline = time.monotonic() + self.max_delay_sec
+                self._start_flusher()
+                self._batch_started.notify()
+
+    def flush(self):
+        with self._lock:
+            self._send_batch()
+
+    def _send_batch(self):
+        """Call with the lock held"""
+        batch = self.timestamps
+        self.timestamps = []
+        self.deadline = None
+        if batch:
+            self.batch_ready_handler(batch)
+
+    def _start_flusher(self):
+        if self.flusher_thread is None:
+            self.flusher_thread = threading.Thread(
+                target=self._flush_at_deadlines, name="keyboard-flusher", daemon=True
+            )
+            self.flusher_thread.start()
+
+    def _flush_at_deadlines(self):
+        with self._lock:
+            while True:
+                if self.deadline is None:
+                    self._batch_started.wait()
+                    continue
+                remaining = self.deadline - time.monotonic()
+                if remaining > 0:
+                    # Woken early if a full batch went out meanwhile; the loop rechecks
+                    self._batch_started.wait(remaining)
+                    continue
+                self._send_batch()
@@ -33,7 +33,7 @@ def win_monitor_keyboard(device_path=None, get_running_state=None):
         if event.event_type == "down":
             # Log to console
             key_name = event.name
-            publish_keyboard_event()
+            publish_keyboard_event(event.time)
             if DEBUG:
                 if len(key_name) == 1:
                     # For regular characters, show the character
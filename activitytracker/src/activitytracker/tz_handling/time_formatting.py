@@ -1,7 +1,11 @@
+from bisect import bisect_right
+
+from sqlalchemy.orm.attributes import set_committed_value
+
 import pytz
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 
-from typing import List, cast
+from typing import Dict, List, cast
 
 from activitytracker.config.definitions import (
     daylight_savings_tz_offset,
@@ -35,118 +39,77 @@ def convert_all_to_tz(obj_list, target_tz):
         raise NotImplementedError("Summaries and Logs are converted so far")
 
 
+def as_aware_utc(dt: datetime) -> datetime:
+    """The db's naive times are UTC. An aware one is left as is, astimezone() handles it"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
 def convert_summary_to_tz(summary_obj: DailySummaryBase, tz):
     """
     Modifies the object in place! Mutates the reference.
     """
-    utc = pytz.UTC
-
-    # Check if gathering_date already has timezone info
-    if summary_obj.gathering_date.tzinfo is None:
-        # If naive, localize to UTC first
-        utc_time = utc.localize(summary_obj.gathering_date)
-    else:
-        # If already has timezone info, just use it
-        utc_time = summary_obj.gathering_date
-
-    converted_time = utc_time.astimezone(tz)
-
-    summary_obj.gathering_date = converted_time
+    summary_obj.gathering_date = as_aware_utc(summary_obj.gathering_date).astimezone(tz)
 
 
 def convert_log_to_tz(log_obj: SummaryLogBase, tz):
     """
     Modifies the object in place! Mutates the reference.
     """
-    # For local times (timezone=False in your model)
-    # First, determine the original timezone (if known)
-    original_tz = pytz.timezone("UTC")  # Assuming they were originally UTC
-
-    # Properly localize and then convert each datetime
-    if log_obj.gathering_date.tzinfo is None:
-        temp_time = original_tz.localize(log_obj.gathering_date)
-        log_obj.gathering_date = temp_time.astimezone(tz)
-    elif (
-        log_obj.gathering_date.tzinfo == timezone.utc
-        or str(log_obj.gathering_date.tzinfo) == "UTC"
-    ):
-        # Already UTC-aware - just convert to target timezone
-        log_obj.gathering_date = log_obj.gathering_date.astimezone(tz)
-
-    if log_obj.start_time.tzinfo is None:
-        temp_time = original_tz.localize(log_obj.start_time)
-        log_obj.start_time = temp_time.astimezone(tz)
-    elif (
-        log_obj.start_time.tzinfo == timezone.utc or str(log_obj.start_time.tzinfo) == "UTC"
-    ):
-        # Already UTC-aware - just convert to target timezone
-        log_obj.start_time = log_obj.start_time.astimezone(tz)
-
-    if log_obj.end_time.tzinfo is None:
-        temp_time = original_tz.localize(log_obj.end_time)
-        log_obj.end_time = temp_time.astimezone(tz)
-    elif log_obj.end_time.tzinfo == timezone.utc or str(log_obj.end_time.tzinfo) == "UTC":
-        # Already UTC-aware - just convert to target timezone
-        log_obj.end_time = log_obj.end_time.astimezone(tz)
+    log_obj.gathering_date = as_aware_utc(log_obj.gathering_date).astimezone(tz)
+    log_obj.start_time = as_aware_utc(log_obj.start_time).astimezone(tz)
+    log_obj.end_time = as_aware_utc(log_obj.end_time).astimezone(tz)
+
+
+# The naive columns that hold the user's local time. A read gives them their tz back
+local_time_fields = {
+    DailySummaryBase: ("gathering_date_local",),
+    SummaryLogBase: ("gathering_date_local", "start_time_local", "end_time_local"),
+    SystemStatus: ("created_at",),
+}
+_fields_by_class = {}
+
+
+def local_fields_of(model) -> tuple:
+    """Looked up once per model class, not once per row"""
+    fields = _fields_by_class.get(model)
+    if fields is None:
+        for base, base_fields in local_time_fields.items():
+            if issubclass(model, base):
+                fields = _fields_by_class[model] = base_fields
+                break
+        else:
+            raise NotImplementedError("Summaries and Logs are converted so far")
+    return fields
 
 
 def attach_tz_to_obj(obj, target_tz):
     """Used to attach tz info after DAOs read data"""
-    # Func assumes the obj will be of a specific type
-    if isinstance(obj, DailySummaryBase):
-        # The gathering date is either the same day, or the previous day.
-        # 00:00:00-04:00 -> 20:00:00 UTC -1 day.
-        # The hours reveal the original tz. 19:00:00 -> UTC -5
-        # FIXME: If _local fields are None, convert the gathering_date
-        attach_tz_to_local_fields_for_summary(obj, target_tz)
-
-        return obj
-    elif isinstance(obj, SummaryLogBase):
-        # Properly assign the new datetime objects back to the attributes
-        # FIXME: If _local fields are None, convert the gathering_date
-        attach_tz_to_local_fields_for_logs(obj, target_tz)
-        return obj
-    else:
-        raise NotImplementedError("Summaries and Logs are converted so far")
+    attach_tz_to_all([obj], target_tz)
+    return obj
 
 
 def attach_tz_to_all(obj_list, target_tz):
-    """Used to attach tz info after DAOs read data"""
+    """
+    Used to attach tz info after DAOs read data. The list is all one model.
+
+    One tz for the whole read, put on with replace(). set_committed_value
+    skips the ORM's change tracking, so the rows don't read as modified either
+    """
     if not obj_list:
         return obj_list  # Return empty list if input is empty
-    # Func assumes the obj list will all be of the same type
-    if isinstance(obj_list[0], DailySummaryBase):
-        # The gathering date is either the same day, or the previous day.
-        # 00:00:00-04:00 -> 20:00:00 UTC -1 day.
-        # The hours reveal the original tz. 19:00:00 -> UTC -5
-        for obj in obj_list:
-            attach_tz_to_local_fields_for_summary(obj, target_tz)
-        return obj_list
-    elif isinstance(obj_list[0], SummaryLogBase):
-        for log_obj in obj_list:
-            # FIXME: If _local fields are None, convert the gathering_date
-            attach_tz_to_local_fields_for_logs(log_obj, target_tz)
-        return obj_list
-    elif isinstance(obj_list[0], SystemStatus):
-        for status in obj_list:
-            attach_tz_to_created_at_field_for_status(status, target_tz)
-    else:
-        raise NotImplementedError("Summaries and Logs are converted so far")
+    fields = local_fields_of(type(obj_list[0]))
+    for obj in obj_list:
+        for field in fields:
+            value = getattr(obj, field)
+            if value is not None:
+                set_committed_value(obj, field, value.replace(tzinfo=target_tz))
+    return obj_list
 
 
 def attach_tz_to_created_at_field_for_status(status: SystemStatus, tz):
-    status.created_at = status.created_at.replace(tzinfo=tz)
-    return status
-
-
-def attach_tz_to_local_fields_for_summary(summary_obj: DailySummaryBase, tz):
-    summary_obj.gathering_date_local = summary_obj.gathering_date_local.replace(tzinfo=tz)
-
-
-def attach_tz_to_local_fields_for_logs(log_obj: SummaryLogBase, tz):
-    log_obj.gathering_date_local = log_obj.gathering_date_local.replace(tzinfo=tz)
-    log_obj.start_time_local = log_obj.start_time_local.replace(tzinfo=tz)
-    log_obj.end_time_local = log_obj.end_time_local.replace(tzinfo=tz)
+    return attach_tz_to_obj(status, tz)
 
 
 def convert_to_utc(dt: datetime):
@@ -214,6 +177,41 @@ def get_start_of_day_from_datetime(dt: datetime):
     return dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
+def add_local_days(dt: datetime, days: int) -> datetime:
+    """Same wall clock time, n days later. Gets the offset right across DST, for pytz too"""
+    naive = dt.replace(tzinfo=None) + timedelta(days=days)
+    if hasattr(dt.tzinfo, "localize"):
+        return dt.tzinfo.localize(naive)  # type: ignore
+    return naive.replace(tzinfo=dt.tzinfo)
+
+
+def local_midnight(day: date, tz) -> datetime:
+    naive = datetime.combine(day, time.min)
+    if hasattr(tz, "localize"):
+        return tz.localize(naive)  # pytz
+    return naive.replace(tzinfo=tz)
+
+
+def bucket_by_local_day(rows, first_day: date, tz, get_moment, days=7) -> Dict[date, list]:
+    """
+    Sorts rows read in one range query into the days they'd have come from
+    with one query per day. Every day gets a key, empty or not.
+
+    The tz math is done once, for the days' boundaries. Each row is only compared
+    """
+    day_list = [first_day + timedelta(days=i) for i in range(days)]
+    boundaries = [local_midnight(first_day + timedelta(days=i), tz) for i in range(days + 1)]
+    buckets = {day: [] for day in day_list}
+    for row in rows:
+        moment = get_moment(row)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)  # The db is in UTC
+        index = bisect_right(boundaries, moment) - 1
+        if 0 <= index < days:
+            buckets[day_list[index]].append(row)
+    return buckets
+
+
 def account_for_timezone_offset(dt, users_local_tz_offset):
 
     return dt + timedelta(hours=users_local_tz_offset)
@@ -12,6 +12,8 @@ def snapshot_obj_for_tests(obj: ProgramSession | ChromeSession):
     it's present state when a spy looks at it later.
     """
     ledger_for_transfer = obj.ledger
+    handles_for_transfer = obj.handles
     duplicate = copy.deepcopy(obj)
     duplicate.ledger = ledger_for_transfer
+    duplicate.handles = handles_for_transfer
     return duplicate
@@ -86,3 +86,10 @@ class MustHaveUtcTzInfoError(Exception):
 
 class VideoRouteEventTypeError(Exception):
     pass
+
+
+class UnreadableMessageError(ValueError):
+    """For a peripheral message whose wire version or type tag this side doesn't know"""
+
+    def __init__(self, message, *args):
+        super().__init__(message, *args)
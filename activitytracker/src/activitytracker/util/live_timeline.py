@@ -0,0 +1,229 @@
+import threading
+from bisect import insort
+
+from datetime import date, datetime, timedelta, timezone
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.timeline_event_aggregator import half_sec
+from activitytracker.util.timeline_json import label_prefixes
+
+# (start, id, end). Sorts by start like read_day does, ties by id
+RawEvent = Tuple[datetime, int, datetime]
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Naive is taken as UTC, as the db driver does"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def day_of(moment: datetime) -> date:
+    """The day read_day would find it in. Its naive bounds are taken as UTC"""
+    return as_utc(moment).date()
+
+
+class LiveEntry:
+    """
+    One merged group. Same attributes as a PrecomputedTimelineEntry,
+    so the routes and timeline_json take it as is
+    """
+
+    __slots__ = (
+        "clientFacingId",
+        "group",
+        "content",
+        "start",
+        "end",
+        "eventCount",
+        "last_id",
+    )
+
+    def __init__(self, group: ChartEventType, first_id: int, start: datetime, end: datetime):
+        # Same labels as the Computed columns of TimelineEntryObj
+        id_prefix, content_prefix = label_prefixes[group]
+        self.clientFacingId = id_prefix + str(first_id)
+        self.group = group
+        self.content = content_prefix + str(first_id)
+        self.start = start
+        self.end = end
+        self.eventCount = 1
+        self.last_id = first_id  # Highest id in the group. A cursor below it hasn't seen it
+
+
+class LiveGroup:
+    """
+    One day of one event type: its raw events, and those merged
+    the way aggregate_timeline_events merges them
+    """
+
+    def __init__(self, group: ChartEventType, threshold=half_sec):
+        self.group = group
+        self.threshold = timedelta(milliseconds=threshold)
+        self.events: List[RawEvent] = []
+        self.merged: List[LiveEntry] = []
+
+    def add(self, start: datetime, event_id: int, end: datetime) -> bool:
+        """
+        O(1) when the event starts after the last one, which is nearly always.
+        Else it's put in its place and the merge is redone. Returns False then
+        """
+        event = (start, event_id, end)
+        if self.events and event < self.events[-1]:
+            insort(self.events, event)
+            self.rebuild()
+            return False
+        self.append(event)
+        self.events.append(event)
+        return True
+
+    def append(self, event: RawEvent):
+        start, event_id, end = event
+        # Like find_groups: the gap is from the previous event's end, not the group's
+        if not self.merged or start - self.events[-1][2] >= self.threshold:
+            self.merged.append(LiveEntry(self.group, event_id, start, end))
+            return
+        entry = self.merged[-1]
+        entry.end = max(entry.end, end)
+        entry.eventCount += 1
+        entry.last_id = max(entry.last_id, event_id)
+
+    def rebuild(self):
+        events = self.events
+        self.events, self.merged = [], []
+        for event in events:
+            self.append(event)
+            self.events.append(event)
+
+
+class LiveTimeline:
+    """
+    Today's merged timeline, kept up to date as the timeline rows are written,
+    so serving today doesn't read and re-aggregate the whole day each refresh.
+
+    load() reads the day so far once. From then on every day is complete in memory,
+    and a day is handed to precomputed_timelines with pop() once it's over.
+    """
+
+    def __init__(self, threshold=half_sec):
+        self.threshold = threshold
+        self.groups: Dict[Tuple[date, ChartEventType], LiveGroup] = {}
+        self.loaded_from: date | None = None
+        self.is_loading = False
+        self.pending = []  # Written while load() was reading
+        self.handed_off: Set[Tuple[date, ChartEventType]] = set()
+        self.highest_id = 0
+        # A cursor below this saw ids that a rebuild since then may have changed
+        self.reset_id = 0
+        self.lock = threading.Lock()
+
+    def start_loading(self):
+        with self.lock:
+            self.is_loading = True
+            self.pending = []
+
+    def finish_loading(self, day: date, rows: Iterable):
+        """Rows have id, group, start and end. The pending ones may repeat some"""
+        with self.lock:
+            self.groups = {}
+            self.handed_off = set()
+            self.loaded_from = day
+            self.is_loading = False
+            loaded_ids = set()
+            for row in sorted(rows, key=lambda row: (as_utc(row.start), row.id)):
+                loaded_ids.add(row.id)
+                self._add(row)
+            for row in self.pending:
+                if row.id not in loaded_ids:
+                    self._add(row)
+            self.pending = []
+
+    def cancel_loading(self):
+        with self.lock:
+            self.is_loading = False
+            self.pending = []
+
+    def add_rows(self, rows: Iterable):
+        """Takes the TimelineEntryObj rows right after they're written, ids and all"""
+        with self.lock:
+            if self.is_loading:
+                self.pending.extend(rows)
+                return
+            if self.loaded_from is None:
+                return  # Not serving anything yet
+            for row in rows:
+                self._add(row)
+
+    def _add(self, row):
+        start = as_utc(row.start)
+        day = day_of(start)
+        key = (day, row.group)
+        if day < self.loaded_from or key in self.handed_off:
+            return  # A straggler. It's in the db, which is where that day is read from now
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = LiveGroup(row.group, self.threshold)
+        self.highest_id = max(self.highest_id, row.id)
+        if not group.add(start, row.id, as_utc(row.end)):
+            # The first id of a group can change, so the client's copy has a stale id
+            self.reset_id = self.highest_id
+
+    def has_day(self, day: date, event_type: ChartEventType) -> bool:
+        if self.is_loading or self.loaded_from is None:
+            return False
+        return day >= self.loaded_from and (day, event_type) not in self.handed_off
+
+    def entries(self, day: date, event_type: ChartEventType) -> List[LiveEntry]:
+        with self.lock:
+            group = self.groups.get((day, event_type))
+            return list(group.merged) if group else []
+
+    def changes_since(
+        self,
+        day: date,
+        event_type: ChartEventType,
+        after_id: int | None = None,
+        watermark: datetime | None = None,
+    ) -> List[LiveEntry] | None:
+        """New or grown groups. None if the cursor is from before a rebuild: send it all"""
+        with self.lock:
+            if after_id is not None and after_id < self.reset_id:
+                return None
+            group = self.groups.get((day, event_type))
+            if group is None:
+                return []
+            return [
+                entry
+                for entry in group.merged
+                if (after_id is None or entry.last_id > after_id)
+                and (watermark is None or entry.end >= watermark)
+            ]
+
+    def pop(self, day: date, event_type: ChartEventType) -> LiveGroup:
+        """Hands a finished day over. Later writes for it are left to the db"""
+        with self.lock:
+            self.handed_off.add((day, event_type))
+            return self.groups.pop((day, event_type), None) or LiveGroup(event_type)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "loaded_from": self.loaded_from,
+                "days": sorted({day for day, _ in self.groups}),
+                "events": sum(len(group.events) for group in self.groups.values()),
+                "entries": sum(len(group.merged) for group in self.groups.values()),
+                "highest_id": self.highest_id,
+            }
+
+
+# Singleton: the recorder's writes feed it, the dashboard reads it
+_live_timeline = None
+
+
+def get_live_timeline() -> LiveTimeline:
+    global _live_timeline
+    if _live_timeline is None:
+        _live_timeline = LiveTimeline()
+    return _live_timeline
@@ -0,0 +1,80 @@
+import re
+
+from datetime import date, datetime, timedelta, timezone
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from activitytracker.object.enums import ChartEventType
+
+# The raw event tables, split by month on their time column.
+# The groups are what precomputed_timelines must hold before a month can be dropped
+partitioned_tables: Dict[str, Tuple[str, Tuple[ChartEventType, ...]]] = {
+    "client_timeline_entries": ("start", (ChartEventType.MOUSE, ChartEventType.KEYBOARD)),
+    "mouse_moves": ("start_time", (ChartEventType.MOUSE,)),
+    "typing_sessions": ("start_time", (ChartEventType.KEYBOARD,)),
+}
+
+
+def month_of(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """
+    UTC, like day_of() and read_day's naive bounds, so a day's rows are
+    in one partition. Except for the user's hours either side of a UTC midnight
+    """
+    start = datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+    end = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+    return start, end
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    """Takes the rows no month has been made for yet"""
+    return f"{table}_default"
+
+
+def month_of_partition(table: str, name: str) -> date | None:
+    """None for the default partition, or anything that isn't one of ours"""
+    match = re.fullmatch(re.escape(table) + r"_(\d{4})_(\d{2})", name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def months_to_create(today: date, months_ahead: int) -> List[date]:
+    """This month and the next few, so the default partition stays empty"""
+    this_month = month_of(today)
+    return [add_months(this_month, n) for n in range(months_ahead + 1)]
+
+
+def days_needed(month: date) -> List[date]:
+    """
+    The user's days whose rows can be in the month's partition. The local day
+    either side of it overlaps a UTC month by a few hours, so those count too
+    """
+    first_day = month - timedelta(days=1)
+    last_day = add_months(month, 1)
+    return [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+
+
+def expired_months(months: Iterable[date], today: date, retention_days: int) -> List[date]:
+    """Months whose every row, and the day after them, are older than the retention"""
+    cutoff = today - timedelta(days=retention_days)
+    return sorted(month for month in months if add_months(month, 1) < cutoff)
+
+
+def is_covered(
+    month: date, groups: Iterable[ChartEventType], markers: Set[Tuple[date, ChartEventType]]
+) -> bool:
+    """True if precomputed_timelines has every day of the month, for each group"""
+    return all((day, group) in markers for day in days_needed(month) for group in groups)
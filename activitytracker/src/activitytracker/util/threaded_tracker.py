@@ -3,10 +3,16 @@ import time
 
 
 class ThreadedTracker:
-    """Wrapper that adds threading behavior"""
+    """
+    Wrapper that adds threading behavior
 
-    def __init__(self, core_tracker):
+    Given an event_source, like the keyboard or mouse facade, the thread sleeps
+    until that has events. Otherwise it polls the core every interval.
+    """
+
+    def __init__(self, core_tracker, event_source=None):
         self.core = core_tracker
+        self.event_source = event_source
         self.interval = 0.05  # seconds
         self.stop_event = threading.Event()
         self.hook_thread = None
@@ -22,11 +28,16 @@ class ThreadedTracker:
     def _monitor_core(self):
         while not self.stop_event.is_set():
             self.core.run_tracking_loop()
-            # might lead to some events not getting read if too sparse
-            time.sleep(self.interval)
+            if self.event_source is not None:
+                self.event_source.wait_for_events()
+            else:
+                # might lead to some events not getting read if too sparse
+                time.sleep(self.interval)
 
     def stop(self):
         self.stop_event.set()
+        if self.event_source is not None:
+            self.event_source.wake()
         if self.hook_thread is not None and self.hook_thread.is_alive():
             self.hook_thread.join(timeout=1)
         self.is_running = False
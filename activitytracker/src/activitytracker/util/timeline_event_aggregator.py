@@ -1,4 +1,8 @@
-from typing import List
+import numpy as np
+
+from datetime import datetime
+
+from typing import List, Tuple
 
 from activitytracker.db.models import TimelineEntryObj, PrecomputedTimelineEntry
 
@@ -22,49 +26,83 @@ half_sec = 500
 
 
 def aggregate_timeline_events(
-    events: List[TimelineEntryObj], threshold=half_sec
+    events: List[TimelineEntryObj], threshold=half_sec, epochs_us: Tuple | None = None
 ) -> List[PrecomputedTimelineEntry]:
-    acc = []
+    """
+    Merges events that are less than threshold ms apart. Events must be sorted by start.
+
+    The gaps used to be compared in sec against a threshold in ms, so
+    everything within ~8 min was one blob. Now both sides are in microseconds.
+
+    epochs_us is the (starts, ends) the db already worked out, see epochs_of_rows.
+    Without them, they're taken from each event's datetimes.
+    """
     not_a_list = not isinstance(events, list)
     if not_a_list:
         raise ValueError("Timeline events aggregator must receive a list")
     if len(events) == 0:
         return []
-    for i in range(0, len(events)):
-        if i == 0:
-            first_obj = events[i]
-            first_compressed_obj = PrecomputedTimelineEntry(
-                clientFacingId=first_obj.clientFacingId,
-                group=first_obj.group,
-                content=first_obj.content,
-                start=first_obj.start,
-                end=first_obj.end,
-                eventCount=1,
-            )
-            acc.append(first_compressed_obj)
-            continue
-        last_event = acc[len(acc) - 1]
-        last_end = last_event.end
-        # const timeBetweenEventsIsSmall = currStart.getTime() - lastEnd.getTime() < threshold;
-        current = events[i]
-        time_between_events_is_small = (
-            current.start.timestamp() - last_end.timestamp() < threshold
+    if epochs_us is None:
+        epochs_us = (
+            to_epoch_us([event.start for event in events]),
+            to_epoch_us([event.end for event in events]),
         )
-        if last_end and time_between_events_is_small:
-            # // Merge events that are close together
-            last_event.end = current.end
-            last_event.eventCount = last_event.eventCount + 1
-        else:
-            compressed_obj = PrecomputedTimelineEntry(
-                clientFacingId=current.clientFacingId,
-                group=current.group,
-                content=current.content,
-                start=current.start,
-                end=current.end,
-                eventCount=1,
-            )
-            acc.append(compressed_obj)
-    return acc
+    starts, ends = epochs_us
+    groups = zip(*find_groups(starts, ends, threshold))
+    # Only now, one ORM object per group
+    return [
+        PrecomputedTimelineEntry(
+            clientFacingId=events[first].clientFacingId,
+            group=events[first].group,
+            content=events[first].content,
+            start=events[earliest].start,
+            end=events[latest].end,
+            eventCount=int(count),
+        )
+        for first, earliest, latest, count in groups
+    ]
+
+
+def epochs_of_rows(rows) -> Tuple:
+    """For rows with the start_us and end_us columns. No datetime is touched"""
+    count = len(rows)
+    starts = np.fromiter((row.start_us for row in rows), dtype=np.int64, count=count)
+    ends = np.fromiter((row.end_us for row in rows), dtype=np.int64, count=count)
+    return starts, ends
+
+
+def to_epoch_us(moments: List[datetime]):
+    """
+    int64 microseconds since the epoch. Works for naive and aware datetimes alike.
+    One .timestamp() per moment, so it's for events that didn't come from the db
+    """
+    seconds = np.fromiter(
+        (moment.timestamp() for moment in moments), dtype=np.float64, count=len(moments)
+    )
+    return np.rint(seconds * 1_000_000).astype(np.int64)
+
+
+def find_groups(starts, ends, threshold_ms: int | float):
+    """
+    The vectorized part. Takes int64 epoch-us arrays, in the order of the events.
+
+    Returns, per group: index of its first event, index of its earliest start,
+    index of its latest end, and how many events it has.
+    """
+    count = len(starts)
+    # An event opens a new group if it starts too long after the previous one ended
+    opens_group = np.empty(count, dtype=bool)
+    opens_group[0] = True
+    opens_group[1:] = (starts[1:] - ends[:-1]) >= threshold_ms * 1000
+    group_ids = np.cumsum(opens_group) - 1
+
+    firsts = np.flatnonzero(opens_group)
+    counts = np.diff(np.append(firsts, count))
+    lasts = firsts + counts - 1
+    # Sorted by group, then by time: each group's min is at its front, max at its back
+    earliest = np.lexsort((starts, group_ids))[firsts]
+    latest = np.lexsort((ends, group_ids))[lasts]
+    return firsts, earliest, latest, counts
 
 
 # From
@@ -0,0 +1,213 @@
+import re
+
+import orjson
+from fastapi import Response
+
+from datetime import datetime, timedelta, timezone
+
+from typing import Dict, List
+
+from activitytracker.object.enums import ChartEventType
+
+# Same output as the Pydantic models in dashboard_dto: a UTC datetime ends in "Z"
+orjson_options = orjson.OPT_UTC_Z
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.desksense.columnar+json"
+
+epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+one_microsecond = timedelta(microseconds=1)
+
+# The computed columns: clientFacingId is "mouse-123", content is "Mouse Event 123"
+label_prefixes = {
+    ChartEventType.MOUSE: ("mouse-", "Mouse Event "),
+    ChartEventType.KEYBOARD: ("keyboard-", "Typing Session "),
+}
+
+
+class TimelineFormat:
+    """
+    How the rows go over the wire. "objects" is the TimelineRows shape.
+
+    "columnar" is opt in, with ?format=columnar or an Accept of COLUMNAR_MEDIA_TYPE.
+    Add ?delta=true to delta-encode its arrays too
+    """
+
+    def __init__(self, columnar=False, delta=False):
+        self.columnar = columnar
+        self.delta = columnar and delta
+
+    @classmethod
+    def negotiate(cls, format_param: str | None, delta_param: bool, accept: str | None):
+        columnar = format_param == "columnar" or (
+            format_param is None and COLUMNAR_MEDIA_TYPE in (accept or "")
+        )
+        return cls(columnar, delta_param)
+
+    @property
+    def name(self) -> str:
+        if not self.columnar:
+            return "objects"
+        return "columnar_delta" if self.delta else "columnar"
+
+    def cache_key(self, endpoint: str) -> str:
+        return endpoint if not self.columnar else endpoint + "_" + self.name
+
+
+OBJECTS = TimelineFormat()
+
+
+class TimelineCursor:
+    """
+    The ?since= of the timeline routes. Either the cursor a previous response gave,
+    which is the last seen TimelineEntryObj.id, or an ISO timestamp watermark
+    """
+
+    def __init__(self, after_id: int | None = None, watermark: datetime | None = None):
+        self.after_id = after_id
+        self.watermark = watermark
+
+    @classmethod
+    def parse(cls, since: str):
+        if since.isdigit():
+            return cls(after_id=int(since))
+        try:
+            watermark = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"since must be a cursor or an ISO timestamp, got: {since}")
+        if watermark.tzinfo is None:
+            raise ValueError("A since timestamp needs an offset, e.g. 'Z'")
+        return cls(watermark=watermark)
+
+
+def entry_as_json(entry) -> dict:
+    """
+    A TimelineEntrySchema without building one. Works for a Core row
+    or an ORM object, since both have the same attribute names
+    """
+    group = entry.group
+    return {
+        "id": entry.clientFacingId,
+        "group": group.value if hasattr(group, "value") else str(group),
+        "content": entry.content,
+        "start": entry.start,
+        "end": entry.end,
+    }
+
+
+def epoch_us(moment: datetime) -> int:
+    """Exact, unlike .timestamp(). Naive is taken as UTC, as the db driver does"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - epoch) // one_microsecond
+
+
+def delta_encode(values: List[int]) -> List[int]:
+    """First value as is, then each one's difference from the one before it"""
+    return [value - previous for previous, value in zip([0] + values, values)]
+
+
+def label_number(entry, group: ChartEventType) -> int | None:
+    """The 123 in "mouse-123", if the content says the same. Else the labels are sent"""
+    id_prefix, content_prefix = label_prefixes[group]
+    match = re.fullmatch(re.escape(id_prefix) + r"(\d+)", str(entry.clientFacingId))
+    if match is None or entry.content != content_prefix + match.group(1):
+        return None
+    return int(match.group(1))
+
+
+def entries_as_columns(entries: List, group: ChartEventType, delta: bool) -> dict:
+    """
+    Parallel int arrays instead of one object per entry. Expands back losslessly:
+
+        id      = "mouse-" + str(idBase + idOffsets[i])
+        content = "Mouse Event " + the same number
+        start   = starts[i] (in unit since the epoch, UTC)
+        end     = start + durations[i]
+
+    The unit is "ms" unless some timestamp has sub-ms precision, then it's "us".
+    With delta, starts and idOffsets hold each value's difference from the previous one.
+    Ids that don't follow the computed column pattern go as "ids" and "contents" instead
+    """
+    starts = [epoch_us(entry.start) for entry in entries]
+    ends = [epoch_us(entry.end) for entry in entries]
+    whole_ms = all(moment % 1000 == 0 for moment in starts + ends)
+    per_unit = 1000 if whole_ms else 1
+
+    columns = {
+        "count": len(entries),
+        "unit": "ms" if whole_ms else "us",
+        "starts": [start // per_unit for start in starts],
+        "durations": [(end - start) // per_unit for start, end in zip(starts, ends)],
+    }
+    numbers = [label_number(entry, group) for entry in entries]
+    if None in numbers:
+        columns["ids"] = [str(entry.clientFacingId) for entry in entries]
+        columns["contents"] = [entry.content for entry in entries]
+    else:
+        id_base = min(numbers, default=0)
+        columns["idBase"] = id_base
+        columns["idOffsets"] = [number - id_base for number in numbers]
+    if delta:
+        columns["starts"] = delta_encode(columns["starts"])
+        if "idOffsets" in columns:
+            columns["idOffsets"] = delta_encode(columns["idOffsets"])
+    return columns
+
+
+def rows_as_json(
+    mouse_rows: List, keyboard_rows: List, timeline_format: TimelineFormat = OBJECTS
+) -> dict:
+    """Shaped like TimelineRows, or its columnar version"""
+    if timeline_format.columnar:
+        return {
+            "mouseRows": entries_as_columns(
+                mouse_rows, ChartEventType.MOUSE, timeline_format.delta
+            ),
+            "keyboardRows": entries_as_columns(
+                keyboard_rows, ChartEventType.KEYBOARD, timeline_format.delta
+            ),
+        }
+    return {
+        "mouseRows": [entry_as_json(entry) for entry in mouse_rows],
+        "keyboardRows": [entry_as_json(entry) for entry in keyboard_rows],
+    }
+
+
+def day_as_json(day: Dict, timeline_format: TimelineFormat = OBJECTS) -> dict:
+    """Shaped like DayOfTimelineRows. Takes one of PeripheralsService's day dicts"""
+    return {
+        "date": day["date"],
+        "row": rows_as_json(day["mouse_events"], day["keyboard_events"], timeline_format),
+    }
+
+
+def with_cursor(payload: dict, cursor: int, is_delta: bool) -> dict:
+    """A delta says so, so the client knows to merge it instead of replacing its rows"""
+    payload["cursor"] = str(cursor)
+    payload["isDelta"] = is_delta
+    return payload
+
+
+def with_format(payload: dict, timeline_format: TimelineFormat) -> dict:
+    """A columnar payload says so, so the client knows to expand it"""
+    if timeline_format.columnar:
+        payload["format"] = timeline_format.name
+    return payload
+
+
+def dumps(payload) -> bytes:
+    return orjson.dumps(payload, option=orjson_options)
+
+
+class FastJSONResponse(Response):
+    """
+    Skips FastAPI's validate-then-serialize pass. The timelines are megabytes of rows
+    whose shape the DAO already guarantees, so they go straight to bytes
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content  # Already serialized, e.g. by the week cache
+        return dumps(content)
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+
+from datetime import date, datetime, timedelta
+
+from typing import Iterable, Tuple
+
+from activitytracker.config.definitions import week_cache_max_bytes
+
+# (endpoint, week_of, user's tz)
+CacheKey = Tuple[str, date, str]
+
+
+def sunday_of(day: date) -> date:
+    """The Sunday that starts the week containing day"""
+    days_since_sunday = (day.weekday() + 1) % 7
+    return day - timedelta(days=days_since_sunday)
+
+
+class WeekResponseCache:
+    """
+    Serialized responses for weeks that are over, so flipping between past weeks
+    doesn't re-query, re-hydrate and re-validate the same rows every time.
+
+    LRU, with a budget in bytes rather than entries: one timeline week can be
+    a hundred times bigger than one breakdown week.
+
+    A closed week only changes on a late write (a mystery title turning up,
+    a forced re-precompute). Those call invalidate_day() for the days they touched.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = week_cache_max_bytes,
+        grace_period: timedelta = timedelta(minutes=5),
+    ):
+        self.max_bytes = max_bytes
+        # The recorder's last writes for Saturday can land a little after midnight
+        self.grace_period = grace_period
+        self.entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def is_closed(self, week_of: date, now: datetime) -> bool:
+        """True once the week, and the grace period after it, are over"""
+        end_of_week = sunday_of(week_of) + timedelta(days=7)
+        return (now - self.grace_period).date() >= end_of_week
+
+    def get(self, endpoint: str, week_of: date, user_tz: str) -> bytes | None:
+        key = (endpoint, week_of, user_tz)
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(
+        self, endpoint: str, week_of: date, user_tz: str, body: bytes, now: datetime
+    ) -> bool:
+        """Keeps the body if its week is closed. Returns whether it was kept"""
+        if not self.is_closed(week_of, now) or len(body) > self.max_bytes:
+            return False
+        key = (endpoint, week_of, user_tz)
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = body
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: CacheKey):
+        body = self.entries.pop(key, None)
+        if body is not None:
+            self.total_bytes -= len(body)
+
+    def invalidate_day(self, day: date) -> int:
+        """Drops every cached week that contains day. Returns how many were dropped"""
+        return self.invalidate_days([day])
+
+    def invalidate_days(self, days: Iterable[date]) -> int:
+        weeks = {sunday_of(day) for day in days}
+        if not weeks:
+            return 0
+        with self.lock:
+            stale = [key for key in self.entries if sunday_of(key[1]) in weeks]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_endpoint(self, endpoint: str) -> int:
+        """For a change that touches every week, like editing a category rule"""
+        with self.lock:
+            stale = [key for key in self.entries if key[0] == endpoint]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Singleton: the routes read it, the late-write paths invalidate it
+_week_response_cache = None
+
+
+def get_week_response_cache() -> WeekResponseCache:
+    global _week_response_cache
+    if _week_response_cache is None:
+        _week_response_cache = WeekResponseCache()
+    return _week_response_cache
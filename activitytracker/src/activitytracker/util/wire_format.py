@@ -0,0 +1,88 @@
+"""
+How the peripheral process talks to the server over ZMQ.
+
+A message is two frames. The first is the header: the format version, then a
+one-byte type tag. The second is the timestamps, packed little-endian float64s.
+A keyboard message is every key-down in the batch, a mouse message is start, end.
+
+PUB/SUB has no way back to the sender, so there's no handshake. The receiver
+reads the version off each message instead, and a message of one frame is the
+JSON that peripheral processes from before this format still send.
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+from typing import List
+
+from activitytracker.util.errors import UnreadableMessageError
+
+WIRE_VERSION = 1
+
+KEYBOARD_TAG = 1
+MOUSE_TAG = 2
+
+header_format = struct.Struct("<BB")
+timestamp_size = 8  # float64
+
+
+def _pack_timestamps(timestamps) -> bytes:
+    packed = array("d", timestamps)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_timestamps(payload: bytes) -> array:
+    timestamps = array("d")
+    timestamps.frombytes(payload)
+    if sys.byteorder == "big":
+        timestamps.byteswap()
+    return timestamps
+
+
+def encode_keyboard(timestamps) -> List[bytes]:
+    return [header_format.pack(WIRE_VERSION, KEYBOARD_TAG), _pack_timestamps(timestamps)]
+
+
+def encode_mouse(start: float, end: float) -> List[bytes]:
+    return [header_format.pack(WIRE_VERSION, MOUSE_TAG), _pack_timestamps((start, end))]
+
+
+def decode(frames: List[bytes]) -> dict:
+    """
+    Gives back the same dicts the handlers always got, but the keyboard's
+    timestamps are an array("d") straight off the wire
+    """
+    if len(frames) == 1:
+        return _decode_json(frames[0])
+    if len(frames) != 2:
+        raise UnreadableMessageError(f"Expected two frames, not {len(frames)}")
+    header, payload = frames
+    if len(header) != header_format.size:
+        raise UnreadableMessageError(f"Header was {len(header)} bytes")
+    version, tag = header_format.unpack(header)
+    if version != WIRE_VERSION:
+        raise UnreadableMessageError(f"Unknown wire version: {version}")
+    if len(payload) % timestamp_size != 0:
+        raise UnreadableMessageError(f"Payload of {len(payload)} bytes isn't whole doubles")
+    timestamps = _unpack_timestamps(payload)
+    if tag == KEYBOARD_TAG:
+        return {"type": "keyboard", "timestamps": timestamps}
+    if tag == MOUSE_TAG:
+        if len(timestamps) != 2:
+            raise UnreadableMessageError(f"A mouse move has {len(timestamps)} timestamps")
+        return {"type": "mouse", "start": timestamps[0], "end": timestamps[1]}
+    raise UnreadableMessageError(f"Unknown type tag: {tag}")
+
+
+def _decode_json(frame: bytes) -> dict:
+    try:
+        message = json.loads(frame)
+    except ValueError as e:
+        raise UnreadableMessageError(f"Single frame that isn't JSON: {e}")
+    if not isinstance(message, dict):
+        raise UnreadableMessageError("JSON message wasn't an object")
+    return message
@@ -15,6 +15,7 @@ from activitytracker.trackers.peripherals.windows.win_keyboard_detector import (
 )
 from activitytracker.trackers.peripherals.windows.win_mouse_detector import win_monitor_mouse
 from activitytracker.trackers.message_dispatch import (
+    flush_keyboard_events,
     publish_keyboard_event,
     publish_mouse_events,
 )
@@ -82,6 +83,7 @@ def run_windows_monitors():
         running = False
         time.sleep(1)  # Give threads time to clean up
 
+    flush_keyboard_events()
     print("All monitoring stopped")
     sys.exit(0)
 
@@ -15,6 +15,7 @@ from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
 from activitytracker.object.classes import (
     CompletedChromeSession,
     CompletedProgramSession,
+    ProgramSession,
 )
 from activitytracker.object.video_classes import NetflixInfo, VlcInfo
 from activitytracker.util.time_wrappers import UserLocalTime
@@ -118,3 +119,26 @@ async def test_add_partial_window_program(activity_recorder, mock_daos, program_
     mock_daos["program_summary"].add_used_time.assert_called_once_with(
         program_session, duration
     )
+
+
+def test_on_new_session_stores_row_handles(activity_recorder, mock_daos):
+    session = ProgramSession(
+        "C:/ProgramFiles/Code.exe",
+        "Code.exe",
+        "Visual Studio Code",
+        "main.py",
+        UserLocalTime(datetime(2023, 1, 1, 12, 0, 0, tzinfo=tokyo_tz)),
+    )
+    mock_daos["program_logging"].start_session.return_value = 11
+    mock_daos["program_summary"].find_todays_entry_for_program.return_value = None
+    mock_daos["program_summary"].start_session.return_value = 22
+
+    activity_recorder.on_new_session(session)
+
+    assert session.handles.log_id == 11
+    assert session.handles.summary_id == 22
+
+    completed = session.to_completed(
+        UserLocalTime(datetime(2023, 1, 1, 12, 0, 30, tzinfo=tokyo_tz))
+    )
+    assert completed.handles is session.handles
@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytz
+from datetime import datetime
+
+from activitytracker.arbiter.activity_recorder import ActivityRecorder
+from activitytracker.arbiter.persistence_worker import PersistenceWorker
+from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
+from activitytracker.db.dao.direct.mystery_media_dao import MysteryMediaDao
+from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
+from activitytracker.db.dao.direct.video_summary_dao import VideoSummaryDao
+from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
+from activitytracker.db.dao.queuing.program_logs_dao import ProgramLoggingDao
+from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
+from activitytracker.db.unit_of_work import UnitOfWorkSessionMaker
+from activitytracker.object.classes import ProgramSession
+from activitytracker.util.time_wrappers import UserLocalTime
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+
+def test_commands_run_in_order_on_the_worker_thread():
+    worker = PersistenceWorker(max_queue_size=10)
+    ran = []
+    worker.start()
+
+    for i in range(5):
+        worker.submit(lambda n: ran.append((n, threading.current_thread().name)), i)
+    worker.stop()
+
+    assert [n for n, _ in ran] == [0, 1, 2, 3, 4]
+    assert all(name == "persistence-worker" for _, name in ran)
+    assert worker.get_metrics()["completed"] == 5
+
+
+def test_a_full_queue_drops_pulses_but_keeps_the_rest():
+    # Never started, so nothing drains the queue
+    worker = PersistenceWorker(max_queue_size=2)
+
+    assert worker.submit(print, "a")
+    assert worker.submit(print, "b", droppable=True)
+    assert worker.submit(print, "pulse", droppable=True) is False
+    # A new session still gets in, so the pulses after it have their rows
+    assert worker.submit(print, "new session")
+
+    metrics = worker.get_metrics()
+    assert metrics["depth"] == 3
+    assert metrics["high_water_mark"] == 3
+    assert metrics["over_bound"] == 1
+    assert metrics["dropped"] == 1
+
+
+def test_recorder_only_lets_pulses_be_dropped():
+    worker = PersistenceWorker(max_queue_size=1)
+    recorder = make_recorder(worker)
+    session = make_program_session()
+
+    recorder.on_new_session(session)
+    recorder.add_ten_sec_to_end_time(session)  # Full, so this one goes
+    with recorder.unit_of_work():
+        recorder.on_state_changed(None)
+        recorder.add_ten_sec_to_end_time(session)
+
+    assert worker.get_metrics()["depth"] == 2
+    assert worker.get_metrics()["dropped"] == 1
+
+
+def test_stop_flushes_even_if_never_started():
+    worker = PersistenceWorker()
+    ran = []
+    worker.submit(ran.append, 1)
+
+    worker.stop()
+
+    assert ran == [1]
+
+
+def test_failing_command_does_not_kill_the_worker():
+    worker = PersistenceWorker()
+    ran = []
+    worker.start()
+
+    worker.submit(lambda: 1 / 0)
+    worker.submit(ran.append, "still alive")
+    worker.stop()
+
+    assert ran == ["still alive"]
+    assert worker.get_metrics()["failed"] == 1
+
+
+def make_recorder(worker, session_maker=None):
+    return ActivityRecorder(
+        program_logging_dao=MagicMock(spec=ProgramLoggingDao),
+        chrome_logging_dao=MagicMock(spec=ChromeLoggingDao),
+        video_logging_dao=MagicMock(spec=VideoLoggingDao),
+        program_summary_dao=MagicMock(spec=ProgramSummaryDao),
+        chrome_summary_dao=MagicMock(spec=ChromeSummaryDao),
+        video_summary_dao=MagicMock(spec=VideoSummaryDao),
+        mystery_media_dao=MagicMock(spec=MysteryMediaDao),
+        regular_session=session_maker,
+        persistence_worker=worker,
+    )
+
+
+def make_program_session():
+    return ProgramSession(
+        "C:/ProgramFiles/Code.exe",
+        "Code.exe",
+        "Visual Studio Code",
+        "main.py",
+        UserLocalTime(datetime(2023, 1, 1, 12, 0, 0, tzinfo=tokyo_tz)),
+    )
+
+
+def test_recorder_posts_instead_of_writing():
+    worker = PersistenceWorker()  # Not started: the caller's thread never touches the db
+    recorder = make_recorder(worker)
+    session = make_program_session()
+
+    recorder.on_new_session(session)
+    recorder.add_ten_sec_to_end_time(session)
+
+    recorder.program_logging_dao.start_session.assert_not_called()
+    recorder.program_logging_dao.push_window_ahead_ten_sec.assert_not_called()
+    assert worker.get_metrics()["depth"] == 2
+
+    recorder.shutdown()
+
+    recorder.program_logging_dao.start_session.assert_called_once_with(session)
+    recorder.program_logging_dao.push_window_ahead_ten_sec.assert_called_once_with(session)
+
+
+def test_unit_of_work_posts_one_command():
+    worker = PersistenceWorker()
+    session_maker = MagicMock(spec=UnitOfWorkSessionMaker)
+    recorder = make_recorder(worker, session_maker)
+    session = make_program_session()
+
+    with recorder.unit_of_work():
+        recorder.on_new_session(session)
+        recorder.add_partial_window(4, session)
+
+    assert worker.get_metrics()["depth"] == 1
+
+    worker.start()
+    worker.stop()
+
+    session_maker.unit_of_work.assert_called_once()
+    recorder.program_summary_dao.add_used_time.assert_called_once_with(session, 4)
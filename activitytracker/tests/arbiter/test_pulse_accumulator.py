@@ -0,0 +1,179 @@
+import pytest
+from unittest.mock import MagicMock
+
+import pytz
+from datetime import datetime, timedelta
+
+from activitytracker.arbiter.activity_recorder import ActivityRecorder
+from activitytracker.arbiter.pulse_accumulator import PulseAccumulator
+from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
+from activitytracker.db.dao.direct.mystery_media_dao import MysteryMediaDao
+from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
+from activitytracker.db.dao.direct.video_summary_dao import VideoSummaryDao
+from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
+from activitytracker.db.dao.queuing.program_logs_dao import ProgramLoggingDao
+from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
+from activitytracker.object.classes import CompletedProgramSession, ProgramSession
+from activitytracker.util.time_wrappers import UserLocalTime
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_program_session(minute=0):
+    return ProgramSession(
+        "C:/ProgramFiles/Code.exe",
+        "Code.exe",
+        "Visual Studio Code",
+        "main.py",
+        UserLocalTime(datetime(2023, 1, 1, 12, minute, 0, tzinfo=tokyo_tz)),
+    )
+
+
+@pytest.fixture
+def session_maker():
+    maker = MagicMock()
+    db_session = maker.return_value.__enter__.return_value
+    db_session.execute.return_value.rowcount = 1
+    return maker
+
+
+@pytest.fixture
+def db_session(session_maker):
+    return session_maker.return_value.__enter__.return_value
+
+
+def test_pulses_coalesce_per_row(session_maker, db_session):
+    clock = FakeMonotonic()
+    accumulator = PulseAccumulator(session_maker, 60, clock)
+    log_dao = MagicMock(spec=ProgramLoggingDao)
+    summary_dao = MagicMock(spec=ProgramSummaryDao)
+    session = make_program_session()
+
+    for _ in range(5):
+        accumulator.add(log_dao, session, 10)
+        accumulator.add(summary_dao, session, 10)
+
+    assert sorted(accumulator.pending_seconds().values()) == [50, 50]
+    db_session.execute.assert_not_called()
+
+    written = accumulator.flush()
+
+    assert written == 2
+    log_dao.build_window_push.assert_called_once_with(session, 50)
+    summary_dao.build_window_push.assert_called_once_with(session, 50)
+    assert db_session.execute.call_count == 2
+    db_session.commit.assert_called_once()
+    assert accumulator.pending_seconds() == {}
+
+
+def test_flush_if_due_waits_for_the_interval(session_maker, db_session):
+    clock = FakeMonotonic()
+    accumulator = PulseAccumulator(session_maker, 60, clock)
+    summary_dao = MagicMock(spec=ProgramSummaryDao)
+
+    accumulator.add(summary_dao, make_program_session(), 10)
+    clock.now = 30
+    assert accumulator.flush_if_due() == 0
+    db_session.commit.assert_not_called()
+
+    clock.now = 60
+    assert accumulator.flush_if_due() == 1
+    db_session.commit.assert_called_once()
+
+
+def test_empty_flush_skips_the_db(session_maker):
+    accumulator = PulseAccumulator(session_maker, 60, FakeMonotonic())
+
+    assert accumulator.flush() == 0
+    session_maker.assert_not_called()
+
+
+@pytest.fixture
+def mock_daos():
+    return {
+        "program_logging": MagicMock(spec=ProgramLoggingDao),
+        "chrome_logging": MagicMock(spec=ChromeLoggingDao),
+        "video_logging": MagicMock(spec=VideoLoggingDao),
+        "program_summary": MagicMock(spec=ProgramSummaryDao),
+        "chrome_summary": MagicMock(spec=ChromeSummaryDao),
+        "video_summary": MagicMock(spec=VideoSummaryDao),
+        "mystery_dao": MagicMock(spec=MysteryMediaDao),
+    }
+
+
+def make_recorder(mock_daos, session_maker):
+    return ActivityRecorder(
+        program_logging_dao=mock_daos["program_logging"],
+        chrome_logging_dao=mock_daos["chrome_logging"],
+        video_logging_dao=mock_daos["video_logging"],
+        program_summary_dao=mock_daos["program_summary"],
+        chrome_summary_dao=mock_daos["chrome_summary"],
+        video_summary_dao=mock_daos["video_summary"],
+        mystery_media_dao=mock_daos["mystery_dao"],
+        regular_session=session_maker,
+        pulse_flush_interval=60,
+    )
+
+
+def test_recorder_accumulates_instead_of_pushing(mock_daos, session_maker):
+    recorder = make_recorder(mock_daos, session_maker)
+    session = make_program_session()
+
+    recorder.add_ten_sec_to_end_time(session)
+    recorder.add_ten_sec_to_end_time(session)
+
+    mock_daos["program_logging"].push_window_ahead_ten_sec.assert_not_called()
+    mock_daos["program_summary"].push_window_ahead_ten_sec.assert_not_called()
+    assert sorted(recorder.pulse_accumulator.pending_seconds().values()) == [20, 20]
+
+
+def test_recorder_flushes_before_finalizing(mock_daos, session_maker, db_session):
+    recorder = make_recorder(mock_daos, session_maker)
+    session = make_program_session()
+    completed = CompletedProgramSession(
+        "C:/ProgramFiles/Code.exe",
+        "Code.exe",
+        "Visual Studio Code",
+        "main.py",
+        None,
+        session.start_time,
+        UserLocalTime(session.start_time.dt + timedelta(seconds=25)),
+        True,
+        timedelta(seconds=25),
+    )
+
+    recorder.add_ten_sec_to_end_time(session)
+    recorder.add_ten_sec_to_end_time(session)
+    recorder.on_state_changed(completed)
+
+    db_session.commit.assert_called_once()
+    mock_daos["program_logging"].build_window_push.assert_called_once_with(session, 20)
+    mock_daos["program_logging"].finalize_log.assert_called_once_with(completed)
+    assert recorder.pulse_accumulator.pending_seconds() == {}
+
+
+def test_recorder_without_interval_writes_through(mock_daos):
+    recorder = ActivityRecorder(
+        program_logging_dao=mock_daos["program_logging"],
+        chrome_logging_dao=mock_daos["chrome_logging"],
+        video_logging_dao=mock_daos["video_logging"],
+        program_summary_dao=mock_daos["program_summary"],
+        chrome_summary_dao=mock_daos["chrome_summary"],
+        video_summary_dao=mock_daos["video_summary"],
+        mystery_media_dao=mock_daos["mystery_dao"],
+    )
+    session = make_program_session()
+
+    recorder.add_ten_sec_to_end_time(session)
+
+    assert recorder.pulse_accumulator is None
+    mock_daos["program_logging"].push_window_ahead_ten_sec.assert_called_once_with(session)
+    mock_daos["program_summary"].push_window_ahead_ten_sec.assert_called_once_with(session)
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import asyncio
 
+import threading
 import time
 
 from activitytracker.arbiter.session_polling import (
@@ -395,6 +396,63 @@ def test_numerous_full_cycles():
     assert time_arg == 3
 
 
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_monotonic_engine_ignores_tick_count():
+    dao_mock = Mock()
+    session = ProgramSession()
+    clock = FakeMonotonic()
+    engine = KeepAliveEngine(session, dao_mock, clock, tick_length=0.25)
+
+    # Three ticks, but one of them was held up for 20 sec
+    clock.now += 0.25
+    engine.iterate_loop()
+    clock.now += 20
+    engine.iterate_loop()
+    clock.now += 0.25
+    engine.iterate_loop()
+
+    # Both windows owed are pushed, the remainder carries on
+    assert dao_mock.add_ten_sec_to_end_time.call_count == 2
+    assert engine.amount_used == pytest.approx(0.5)
+
+
+def test_monotonic_engine_concludes_with_exact_fraction():
+    dao_mock = Mock()
+    session = ProgramSession()
+    clock = FakeMonotonic()
+    engine = KeepAliveEngine(session, dao_mock, clock, tick_length=0.25)
+
+    clock.now += 13.4
+    engine.iterate_loop()
+    clock.now += 0.2  # Concluded between ticks
+    engine.conclude()
+
+    dao_mock.add_ten_sec_to_end_time.assert_called_once()
+    dao_mock.add_partial_window.assert_called_once_with(3.6, session)
+
+
+def test_drift_stats():
+    clock = FakeMonotonic()
+    engine = KeepAliveEngine(ProgramSession(), Mock(), clock, tick_length=1)
+
+    for _ in range(10):
+        clock.now += 1.1  # Every tick runs a little late
+        engine.iterate_loop()
+
+    stats = engine.get_drift_stats()
+    assert stats["ticks"] == 10
+    assert stats["counted_sec"] == 10
+    assert stats["drift_sec"] == pytest.approx(1.0)
+    assert stats["max_tick_gap_sec"] == pytest.approx(1.1)
+
+
 class TestThreadedEngineContainer:
     @pytest.mark.asyncio
     async def test_engine_container(self):
@@ -431,3 +489,67 @@ class TestThreadedEngineContainer:
         assert iterate_loop_mock.call_count >= int(sleep_time / quick_test_interval)
 
         conclude_mock.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_one_thread_across_engines(self):
+        dao_mock = Mock()
+        first = KeepAliveEngine(ProgramSession(), dao_mock)
+        second = KeepAliveEngine(ProgramSession(), dao_mock)
+        first.conclude = Mock()
+        second.conclude = Mock()
+        second.iterate_loop = Mock()
+
+        container = ThreadedEngineContainer(0.02, time.sleep)
+        container.add_first_engine(first)
+        container.start()
+        thread = container.hook_thread
+        await asyncio.sleep(0.1)
+
+        container.stop()
+        container.replace_engine(second)
+        container.start()
+        await asyncio.sleep(0.1)
+        container.stop()
+
+        # The transition swapped the engine, not the thread
+        assert container.hook_thread is thread
+        assert thread.is_alive()
+        first.conclude.assert_called_once()
+        second.conclude.assert_called_once()
+        assert second.iterate_loop.call_count >= 1
+
+    def test_conclude_waits_out_a_slow_pulse_without_the_lock(self):
+        engine = KeepAliveEngine(ProgramSession(), Mock())
+        container = ThreadedEngineContainer(0.02, time.sleep)
+        container.iteration_timeout = 0.01  # Shorter than the pulse
+        pulse_started = threading.Event()
+        db_write_done = threading.Event()
+
+        def slow_pulse():
+            pulse_started.set()
+            db_write_done.wait()
+
+        seen_by_conclude = []
+
+        def conclude():
+            # The lock isn't reentrant, so this only works if stop() let go of it
+            lock_is_free = container.lock.acquire(timeout=1)
+            if lock_is_free:
+                container.lock.release()
+            seen_by_conclude.append((container.iterating, lock_is_free))
+
+        engine.iterate_loop = slow_pulse
+        engine.conclude = conclude
+        container.add_first_engine(engine)
+        container.start()
+        pulse_started.wait()
+
+        stopper = threading.Thread(target=container.stop)
+        stopper.start()
+        time.sleep(0.1)  # Several timeouts' worth
+        assert seen_by_conclude == []
+
+        db_write_done.set()
+        stopper.join()
+        # After the pulse, and with the keep-alive thread free to carry on
+        assert seen_by_conclude == [(False, True)]
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+import pytz
+from datetime import date, datetime
+
+from activitytracker.db.dao.direct.activity_category_dao import (
+    ActivityCategoryDao,
+    default_categories,
+)
+from activitytracker.object.enums import ActivityKind, ProductivityCategory
+from activitytracker.util.time_wrappers import UserLocalTime
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+sunday = UserLocalTime(tokyo_tz.localize(datetime(2025, 5, 18)))
+
+
+@pytest.fixture
+def session_maker():
+    return MagicMock()
+
+
+@pytest.fixture
+def db_session(session_maker):
+    return session_maker.return_value.__enter__.return_value
+
+
+def test_default_categories_match_the_old_lists():
+    rules = default_categories()
+
+    assert rules[(ActivityKind.PROGRAM, "Visual Studio Code")] == (
+        ProductivityCategory.PRODUCTIVE
+    )
+    assert rules[(ActivityKind.PROGRAM, "Discord")] == ProductivityCategory.LEISURE
+    # Listed as a productive app, but its time is counted by domain
+    assert rules[(ActivityKind.PROGRAM, "Google Chrome")] == ProductivityCategory.IGNORED
+    assert rules[(ActivityKind.PROGRAM, "Alt-tab window")] == ProductivityCategory.IGNORED
+    assert rules[(ActivityKind.DOMAIN, "github.com")] == ProductivityCategory.PRODUCTIVE
+    assert rules[(ActivityKind.DOMAIN, "x.com")] == ProductivityCategory.LEISURE
+
+
+def test_breakdown_is_one_grouped_query(session_maker):
+    dao = ActivityCategoryDao(session_maker)
+
+    query = dao.build_week_breakdown_query(sunday)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "UNION ALL" in sql
+    assert sql.count("LEFT OUTER JOIN activity_categories") == 2
+    assert "GROUP BY" in sql
+    assert "sum(" in sql
+
+
+def test_unlisted_rows_count_as_leisure(session_maker, db_session):
+    db_session.execute.return_value.all.return_value = [
+        (date(2025, 5, 19), ProductivityCategory.PRODUCTIVE, 3.5),
+        (date(2025, 5, 19), ProductivityCategory.LEISURE, 1.0),
+        (date(2025, 5, 19), None, 0.5),  # No rule for it
+        (date(2025, 5, 20), ProductivityCategory.IGNORED, 2.0),
+    ]
+    dao = ActivityCategoryDao(session_maker)
+
+    breakdown = dao.read_week_breakdown(sunday)
+
+    db_session.execute.assert_called_once()
+    assert breakdown == {
+        date(2025, 5, 19): {
+            ProductivityCategory.PRODUCTIVE: 3.5,
+            ProductivityCategory.LEISURE: 1.5,
+        },
+        date(2025, 5, 20): {ProductivityCategory.IGNORED: 2.0},
+    }
@@ -65,17 +65,17 @@ class TestChromeSummaryDao:
     def test_create(self, chrome_summary_dao):
         dt = datetime(2025, 1, 25, 15, 5, tzinfo=tokyo_tz)
 
-        add_new_item_spy = Mock()
-        chrome_summary_dao.add_new_item = add_new_item_spy
+        upsert_summary_spy = Mock()
+        chrome_summary_dao.upsert_summary = upsert_summary_spy
 
         session_duration = 1 / 60
         domain_name = "www.youtube.com"
 
         chrome_summary_dao._create(domain_name, dt)
 
-        add_new_item_spy.assert_called_once()
+        upsert_summary_spy.assert_called_once()
 
-        args, kwargs = add_new_item_spy.call_args
+        args, kwargs = upsert_summary_spy.call_args
 
         assert isinstance(args[0], DailyDomainSummary)
 
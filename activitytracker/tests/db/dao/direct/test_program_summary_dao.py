@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, Mock, MagicMock
 from datetime import datetime, date, timedelta, timezone
 import pytz
 from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql.selectable import Select
 
 
@@ -74,8 +75,8 @@ class TestProgramSummaryDao:
     def test_create(self, program_summary_dao):
         dt = datetime(2025, 1, 25, 15, 5, tzinfo=tokyo_tz)
 
-        add_new_item_spy = Mock()
-        program_summary_dao.add_new_item = add_new_item_spy
+        upsert_summary_spy = Mock()
+        program_summary_dao.upsert_summary = upsert_summary_spy
 
         session_duration = 1 / 60
         window_title = "Foo!"
@@ -84,9 +85,9 @@ class TestProgramSummaryDao:
         )
         program_summary_dao._create(dummy_session, dt)
 
-        add_new_item_spy.assert_called_once()
+        upsert_summary_spy.assert_called_once()
 
-        args, kwargs = add_new_item_spy.call_args
+        args, kwargs = upsert_summary_spy.call_args
 
         assert isinstance(args[0], DailyProgramSummary)
 
@@ -162,3 +163,26 @@ class TestProgramSummaryDao:
         # Check that first argument is a Select object
         assert isinstance(args[0], Select)
         assert len(result) == 3
+
+    def test_upsert_summary_is_one_statement(self, program_summary_dao):
+        maker = MagicMock()
+        db_session = maker.return_value.__enter__.return_value
+        db_session.execute.return_value.scalar_one.return_value = 7
+        program_summary_dao.regular_session = maker
+
+        dt = datetime(2025, 1, 25, 15, 5, tzinfo=tokyo_tz)
+        dummy_session = CompletedProgramSession(
+            "C:/foo.exe", "foo.exe", "Foo!", "detail of foo", UserLocalTime(dt)
+        )
+
+        row_id = program_summary_dao._create(dummy_session, dt, 10)
+
+        assert row_id == 7
+        db_session.execute.assert_called_once()
+        db_session.commit.assert_called_once()
+
+        statement = db_session.execute.call_args[0][0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (exe_path_as_id, gathering_date) DO UPDATE" in sql
+        assert "daily_program_summaries.hours_spent + excluded.hours_spent" in sql
+        assert "RETURNING daily_program_summaries.id" in sql
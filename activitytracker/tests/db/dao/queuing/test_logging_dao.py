@@ -184,6 +184,49 @@ def test_push_window_ahead(prepare_daos):
     assert isinstance(args[0], DomainSummaryLog), "Window push failed in logging dao"
 
 
+def test_push_window_ahead_by_handle(prepare_daos):
+    """With a handle on the session, the push is one UPDATE by id. No lookup."""
+    program_dao, chrome_dao = prepare_daos
+
+    program_dao.find_session = Mock()
+    program_dao.update_item = Mock()
+    execute_update_mock = Mock(return_value=1)
+    program_dao.execute_update = execute_update_mock
+
+    session = ProgramSession(
+        "path/to/foo.exe",
+        "foo.exe",
+        "cat",
+        "hat",
+        UserLocalTime(datetime(2025, 4, 20, 2, 2, 2, tzinfo=tokyo_tz)),
+    )
+    session.handles.log_id = 42
+
+    program_dao.push_window_ahead_ten_sec(session)
+
+    program_dao.find_session.assert_not_called()
+    program_dao.update_item.assert_not_called()
+    execute_update_mock.assert_called_once()
+
+    statement = execute_update_mock.call_args[0][0]
+    compiled = statement.compile()
+    assert "program_logs.id = " in str(compiled)
+    assert 42 in compiled.params.values()
+
+
+def test_push_window_ahead_by_handle_missing_row(prepare_daos):
+    program_dao, chrome_dao = prepare_daos
+    chrome_dao.execute_update = Mock(return_value=0)
+
+    session = ChromeSession(
+        "foo", "bar", UserLocalTime(datetime(2025, 4, 20, 1, 1, 1, tzinfo=tokyo_tz))
+    )
+    session.handles.log_id = 7
+
+    with pytest.raises(ImpossibleToGetHereError):
+        chrome_dao.push_window_ahead_ten_sec(session)
+
+
 @pytest.fixture
 def nonexistent_session():
     # almost certainly doesn't exist
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, Mock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, Mock, MagicMock, patch
 
 from datetime import datetime, timedelta
 import pytz
@@ -13,6 +13,7 @@ from activitytracker.db.models import TimelineEntryObj
 from activitytracker.object.classes import KeyboardAggregate, MouseMoveWindow
 from activitytracker.object.enums import ChartEventType
 from activitytracker.util.clock import SystemClock
+from activitytracker.util.live_timeline import LiveTimeline
 from activitytracker.util.time_wrappers import UserLocalTime
 
 import psutil
@@ -92,7 +93,7 @@ class TestTimelineEntryDao:
 
         execute_and_return_mock = AsyncMock()
         execute_and_return_mock.return_value = mock_entries
-        dao.execute_and_return_all = execute_and_return_mock
+        dao.execute_and_return_rows = execute_and_return_mock
 
         # Act
         result = await dao.read_day(test_day, event_type)
@@ -114,6 +115,29 @@ class TestTimelineEntryDao:
         args, _ = execute_and_return_mock.call_args
 
         assert isinstance(args[0], Select)
+        # Columns, not the model, so there's nothing to hydrate
+        selected = [column.name for column in args[0].selected_columns]
+        assert selected == ["clientFacingId", "group", "content", "start", "end"]
+
+    @pytest.mark.asyncio
+    async def test_read_day_since(self, dao):
+        dao.execute_and_return_rows = AsyncMock(return_value=[])
+
+        await dao.read_day_since(
+            UserLocalTime(test_time), ChartEventType.MOUSE, after_id=1200
+        )
+        by_id = str(dao.execute_and_return_rows.call_args[0][0])
+        watermark = test_time - timedelta(minutes=1)
+        await dao.read_day_since(
+            UserLocalTime(test_time), ChartEventType.MOUSE, watermark=watermark
+        )
+        by_time = str(dao.execute_and_return_rows.call_args[0][0])
+
+        # Still only today's rows, on top of which only the new ones
+        assert "client_timeline_entries.id >" in by_id
+        assert by_id.count(">=") == 1
+        assert "client_timeline_entries.id >" not in by_time
+        assert by_time.count(">=") == 2
 
     @pytest.mark.asyncio
     async def test_read_day_mice(self, dao):
@@ -123,15 +147,20 @@ class TestTimelineEntryDao:
         test_day = test_time
         test_day = test_day - timedelta(days=7)
 
-        mock_entries = [Mock(spec=TimelineEntryObj), Mock(spec=TimelineEntryObj)]
+        mock_entries = [
+            Mock(spec=TimelineEntryObj, start_us=1_000_000, end_us=1_500_000),
+            Mock(spec=TimelineEntryObj, start_us=3_000_000, end_us=3_200_000),
+        ]
 
         day_result = ["Precomputed day result"]
 
         # In order of which they are called:
         with patch.object(
+            dao, "is_day_precomputed", return_value=False
+        ), patch.object(
             dao, "read_precomputed_entry_for_day"
         ) as mocked_precomputed_entry_for_day, patch.object(
-            dao, "read_day"
+            dao, "read_day_with_epochs"
         ) as mocked_read_day, patch.object(
             dao, "create_precomputed_day"
         ) as mocked_create_precomputed_day:
@@ -155,15 +184,100 @@ class TestTimelineEntryDao:
             mocked_read_day.assert_called_once()
             mocked_read_day.assert_called_once_with(test_day, ChartEventType.MOUSE)
 
-            mocked_create_precomputed_day.assert_called_once_with(mock_entries)
+            mocked_create_precomputed_day.assert_called_once_with(
+                mock_entries, test_day, ChartEventType.MOUSE, ANY
+            )
+            # The epochs come from the rows' own columns
+            starts, ends = mocked_create_precomputed_day.call_args[0][3]
+            assert list(starts) == [row.start_us for row in mock_entries]
+            assert list(ends) == [row.end_us for row in mock_entries]
 
             assert (
                 isinstance(result, list) and len(result) > 0
             ), "create_precomputed_day must return a non-empty list"
             assert result == day_result
 
+    @pytest.mark.asyncio
+    async def test_precomputed_empty_day_is_not_recomputed(self, dao):
+        clock = SystemClock()
+        test_day = test_time - timedelta(days=7)
+
+        with patch.object(dao, "is_day_precomputed", return_value=True), patch.object(
+            dao, "read_precomputed_entry_for_day", return_value=[]
+        ), patch.object(dao, "read_day_with_epochs") as mocked_read_day, patch.object(
+            dao, "create_precomputed_day"
+        ) as mocked_create_precomputed_day:
+            result = await dao.read_day_mice(test_day, clock)
+
+            assert result == []
+            mocked_read_day.assert_not_called()
+            mocked_create_precomputed_day.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_live_day_is_stored_without_reading_it(self, mock_regular_session_maker):
+        live_timeline = LiveTimeline()
+        live_timeline.start_loading()
+        yesterday = test_time - timedelta(days=1)
+        written = Mock(
+            id=5,
+            group=ChartEventType.MOUSE,
+            start=yesterday,
+            end=yesterday + timedelta(seconds=3),
+        )
+        live_timeline.finish_loading(yesterday.date(), [written])
+        dao = TimelineEntryDao(mock_regular_session_maker, live_timeline=live_timeline)
+
+        with patch.object(dao, "read_day_with_epochs") as mocked_read_day, patch.object(
+            dao, "store_precomputed_day", return_value=True
+        ) as mocked_store:
+            rows = await dao.precompute_day(UserLocalTime(yesterday), ChartEventType.MOUSE)
+
+        mocked_read_day.assert_not_called()
+        assert [row.clientFacingId for row in rows] == ["mouse-5"]
+        assert mocked_store.call_args[0][3] == 1  # Raw events it came from
+        assert not live_timeline.has_day(yesterday.date(), ChartEventType.MOUSE)
+
     # # FIXME: need more tests for the branches of read_day_peripheral
 
+    @pytest.mark.asyncio
+    async def test_read_week_uses_range_queries(self, dao):
+        sunday = UserLocalTime(tokyo_tz.localize(datetime(2025, 4, 20)))
+        clock = Mock()
+        clock.now.return_value = UserLocalTime(tokyo_tz.localize(datetime(2025, 4, 23, 9)))
+
+        monday = datetime(2025, 4, 21).date()
+        markers = [
+            Mock(day=sunday.date(), group=ChartEventType.MOUSE),
+            Mock(day=sunday.date(), group=ChartEventType.KEYBOARD),
+            Mock(day=monday, group=ChartEventType.MOUSE),
+            Mock(day=monday, group=ChartEventType.KEYBOARD),
+        ]
+        mouse_entry = Mock(
+            start=datetime(2025, 4, 21, 3, tzinfo=pytz.utc), group=ChartEventType.MOUSE
+        )
+
+        with patch.object(
+            dao, "read_precomputed_days", return_value=markers
+        ), patch.object(
+            dao, "read_precomputed_entries_between", return_value=[mouse_entry]
+        ), patch.object(
+            dao, "read_day", return_value=["raw"]
+        ) as mocked_read_day, patch.object(
+            dao, "precompute_day", return_value=["fresh"]
+        ) as mocked_precompute_day:
+            week = await dao.read_week(sunday, clock)
+
+        assert len(week) == 7
+        assert week[sunday.date()][ChartEventType.MOUSE] == []  # Marked, just empty
+        assert week[monday][ChartEventType.MOUSE] == [mouse_entry]
+        # Tuesday had no marker yet
+        assert mocked_precompute_day.call_count == 2
+        assert week[datetime(2025, 4, 22).date()][ChartEventType.KEYBOARD] == ["fresh"]
+        # Wednesday is today
+        assert mocked_read_day.call_count == 2
+        assert week[datetime(2025, 4, 23).date()][ChartEventType.MOUSE] == ["raw"]
+        assert week[datetime(2025, 4, 26).date()][ChartEventType.MOUSE] == []
+
     @pytest.mark.asyncio
     async def test_read_day_keyboard(self, dao):
 
@@ -173,15 +287,20 @@ class TestTimelineEntryDao:
         test_day_end = test_time
         test_day_start = test_day_end - timedelta(days=7)
 
-        mock_entries = [Mock(spec=TimelineEntryObj), Mock(spec=TimelineEntryObj)]
+        mock_entries = [
+            Mock(spec=TimelineEntryObj, start_us=1_000_000, end_us=1_100_000),
+            Mock(spec=TimelineEntryObj, start_us=2_000_000, end_us=2_100_000),
+        ]
 
         day_result = ["A valid precomputed day of Keyboard Events"]
 
         # In the order in which they are called
         with patch.object(
+            dao, "is_day_precomputed", return_value=False
+        ), patch.object(
             dao, "read_precomputed_entry_for_day"
         ) as mocked_precomputed_entry_for_day, patch.object(
-            dao, "read_day"
+            dao, "read_day_with_epochs"
         ) as mocked_read_day, patch.object(
             dao, "create_precomputed_day"
         ) as mocked_create_precomputed_day:
@@ -202,7 +321,13 @@ class TestTimelineEntryDao:
             mocked_read_day.assert_called_once()
             mocked_read_day.assert_called_once_with(test_day_start, ChartEventType.KEYBOARD)
 
-            mocked_create_precomputed_day.assert_called_once_with(mock_entries)
+            mocked_create_precomputed_day.assert_called_once_with(
+                mock_entries, test_day_start, ChartEventType.KEYBOARD, ANY
+            )
+            # The epochs come from the rows' own columns
+            starts, ends = mocked_create_precomputed_day.call_args[0][3]
+            assert list(starts) == [row.start_us for row in mock_entries]
+            assert list(ends) == [row.end_us for row in mock_entries]
 
             assert (
                 isinstance(result, list) and len(result) > 0
@@ -0,0 +1,304 @@
+# EXPLAINs the DAOs' hot reads against a seeded Postgres, and fails if one of them
+# goes back to a seq scan of a big table. Needs the SYNC_TEST_DB_URL db, like the other
+# integration tests. The indexes come from models.py, the same ones as the migration's
+
+import inspect
+
+import pytest
+from unittest.mock import MagicMock
+
+import asyncio
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    String,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+import pytz
+from datetime import datetime, timedelta
+
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
+from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
+from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
+from activitytracker.db.dao.direct.system_status_dao import SystemStatusDao
+from activitytracker.db.dao.direct.video_summary_dao import VideoSummaryDao
+from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
+from activitytracker.db.dao.queuing.keyboard_dao import KeyboardDao
+from activitytracker.db.dao.queuing.mouse_dao import MouseDao
+from activitytracker.db.dao.queuing.program_logs_dao import ProgramLoggingDao
+from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
+from activitytracker.db.dao.queuing.video_logs_dao import VideoLoggingDao
+from activitytracker.db.models import Base
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.partitions import (
+    add_months,
+    month_bounds,
+    month_of,
+    month_of_partition,
+    partition_name,
+    partitioned_tables,
+)
+from activitytracker.util.time_wrappers import UserLocalTime
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+# The seed runs backwards from "now", so the recent reads are at the tail, like in use
+right_now = UserLocalTime(tokyo_tz.localize(datetime(2025, 5, 14, 15, 0)))
+sunday = UserLocalTime(tokyo_tz.localize(datetime(2025, 5, 11)))
+yesterday = UserLocalTime(tokyo_tz.localize(datetime(2025, 5, 13)))
+
+rows_per_table = 50_000
+seconds_apart = 600  # About a year of rows
+
+# A seq scan of one of these is the regression. The small lookup tables are fine
+hot_tables = {
+    "daily_program_summaries",
+    "daily_chrome_summaries",
+    "daily_video_summaries",
+    "program_logs",
+    "domain_logs",
+    "video_logs",
+    "typing_sessions",
+    "mouse_moves",
+    "system_status",
+    "client_timeline_entries",
+    "precomputed_timelines",
+}
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def seed_values(table, i):
+    """A value for every column, as SQL over generate_series. Each row is 10 min older"""
+    moment = func.to_timestamp(int(right_now.dt.timestamp()) - i * seconds_apart)
+    values = {}
+    for column in table.columns:
+        if column.computed is not None:
+            continue
+        if column.name == "id":
+            values["id"] = i  # The partitioned tables' ids have no server default
+        elif isinstance(column.type, DateTime):
+            values[column.name] = cast(moment, column.type)
+        elif isinstance(column.type, Enum):
+            labels = column.type.enums
+            label = case(
+                *[(i % len(labels) == n, literal(name)) for n, name in enumerate(labels)]
+            )
+            values[column.name] = cast(label, column.type)
+        elif isinstance(column.type, String):
+            values[column.name] = func.concat(column.name + "-", i % 50)
+        elif isinstance(column.type, (Integer, Float)):
+            values[column.name] = literal(1)
+    return values
+
+
+def create_seeded_months(conn):
+    """What the PartitionDao would have made, so the rows aren't all in the default"""
+    oldest = right_now.dt - timedelta(seconds=rows_per_table * seconds_apart)
+    month = month_of(oldest.date())
+    while month <= right_now.dt.date():
+        for table_name in partitioned_tables:
+            start, end = month_bounds(month)
+            conn.execute(
+                text(
+                    f'CREATE TABLE "{partition_name(table_name, month)}" '
+                    f'PARTITION OF "{table_name}" '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+        month = add_months(month, 1)
+
+
+@pytest.fixture
+def seeded_engine(sync_engine):
+    series = func.generate_series(1, rows_per_table).table_valued("value")
+    series = series.render_derived(name="i")
+    with sync_engine.begin() as conn:
+        create_seeded_months(conn)
+        for table_name in hot_tables:
+            table = Base.metadata.tables[table_name]
+            values = seed_values(table, series.c.value)
+            conn.execute(
+                insert(table).from_select(list(values), select(*values.values()))
+            )
+        conn.execute(text("ANALYZE"))
+    return sync_engine
+
+
+def queries_of(dao, executor: str, read) -> list:
+    """The queries a dao read hands to its executor, which doesn't run them"""
+    queries = []
+    if inspect.iscoroutinefunction(getattr(dao, executor)):
+
+        async def capture(query):
+            queries.append(query)
+            return []
+
+    else:
+
+        def capture(query):
+            queries.append(query)
+            return []
+
+    setattr(dao, executor, capture)
+    result = read(dao)
+    if inspect.iscoroutine(result):
+        asyncio.run(result)
+    return queries
+
+
+def hot_queries() -> dict:
+    session_maker = MagicMock()
+    shutdown = right_now.dt - timedelta(days=2)
+
+    queries = {}
+    for logging_dao in [
+        ProgramLoggingDao(session_maker),
+        ChromeLoggingDao(session_maker),
+        VideoLoggingDao(session_maker),
+    ]:
+        name = type(logging_dao).__name__
+        reads = {
+            "read_day_as_sorted": lambda dao: dao.read_day_as_sorted(yesterday),
+            "read_last_24_hrs": lambda dao: dao.read_last_24_hrs(right_now),
+            "find_phantoms": lambda dao: dao.find_phantoms(
+                shutdown, shutdown + timedelta(hours=1)
+            ),
+        }
+        if hasattr(logging_dao, "read_week_as_sorted"):
+            reads["read_week_as_sorted"] = lambda dao: dao.read_week_as_sorted(sunday)
+        for read_name, read in reads.items():
+            [queries[f"{name}.{read_name}"]] = queries_of(
+                logging_dao, "execute_and_return_all", read
+            )
+
+    for summary_dao in [
+        ProgramSummaryDao(MagicMock(), session_maker),
+        ChromeSummaryDao(MagicMock(), session_maker),
+        VideoSummaryDao(MagicMock(), session_maker),
+    ]:
+        name = type(summary_dao).__name__
+        reads = {
+            "read_day": lambda dao: dao.read_day(yesterday),
+            "read_past_week": lambda dao: dao.read_past_week(right_now),
+            "do_read_week": lambda dao: dao.do_read_week(sunday),
+        }
+        for read_name, read in reads.items():
+            [queries[f"{name}.{read_name}"]] = queries_of(
+                summary_dao, "execute_and_return_all", read
+            )
+
+    status_dao = SystemStatusDao(MagicMock(), 10, session_maker)
+    [queries["SystemStatusDao.read_day"]] = queries_of(
+        status_dao, "execute_and_return_all", lambda dao: dao.read_day(yesterday)
+    )
+
+    twenty_four_hours_ago = right_now.dt - timedelta(hours=24)
+    queries["KeyboardDao.get_prev_24_hours_query"] = KeyboardDao(
+        MagicMock()
+    ).get_prev_24_hours_query(twenty_four_hours_ago)
+    queries["MouseDao.get_prev_24_hours_query"] = MouseDao(
+        MagicMock()
+    ).get_prev_24_hours_query(twenty_four_hours_ago)
+
+    timeline_reads = {
+        "read_day": lambda dao: dao.read_day(yesterday, ChartEventType.MOUSE),
+        "read_day_since": lambda dao: dao.read_day_since(
+            yesterday, ChartEventType.KEYBOARD, after_id=rows_per_table - 100
+        ),
+        "read_precomputed_entry_for_day": lambda dao: dao.read_precomputed_entry_for_day(
+            yesterday, ChartEventType.MOUSE
+        ),
+        "read_precomputed_entries_between": lambda dao: dao.read_precomputed_entries_between(
+            sunday.date(), sunday.date() + timedelta(days=6)
+        ),
+    }
+    for read_name, read in timeline_reads.items():
+        [queries[f"TimelineEntryDao.{read_name}"]] = queries_of(
+            TimelineEntryDao(MagicMock()), "execute_and_return_rows", read
+        )
+
+    queries["ActivityCategoryDao.build_week_breakdown_query"] = ActivityCategoryDao(
+        session_maker
+    ).build_week_breakdown_query(sunday)
+    return queries
+
+
+def parent_of(relation: str) -> str:
+    """
+    A month's partition counts as its table. The default one doesn't: every month
+    seeded has its own partition, so it's empty, and the planner seq scans an
+    empty table whatever the indexes
+    """
+    for table_name in partitioned_tables:
+        if month_of_partition(table_name, relation) is not None:
+            return table_name
+    return relation
+
+
+def scanned_relations(plan: dict, node_type: str | None = None) -> set:
+    found = set()
+    if "Relation Name" in plan and node_type in (None, plan["Node Type"]):
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found |= scanned_relations(child, node_type)
+    return found
+
+
+def seq_scanned_tables(plan: dict) -> set:
+    return {parent_of(relation) for relation in scanned_relations(plan, "Seq Scan")}
+
+
+def plan_of(engine, query) -> dict:
+    with engine.connect() as conn:
+        [explained] = conn.execute(Explain(query)).scalar_one()
+    return explained["Plan"]
+
+
+def test_no_hot_query_seq_scans_a_big_table(seeded_engine):
+    regressions = {}
+    for name, query in hot_queries().items():
+        scanned = seq_scanned_tables(plan_of(seeded_engine, query)) & hot_tables
+        if scanned:
+            regressions[name] = scanned
+
+    assert regressions == {}
+
+
+def test_an_unindexed_filter_is_caught(seeded_engine):
+    # Nothing indexes hours_spent, so this is what a regression looks like
+    program_logs = Base.metadata.tables["program_logs"]
+    query = select(program_logs).where(program_logs.c.hours_spent > 0.5)
+
+    assert seq_scanned_tables(plan_of(seeded_engine, query)) == {"program_logs"}
+
+
+def test_a_day_touches_one_partition(seeded_engine):
+    query = TimelineEntryDao(MagicMock()).get_find_by_day_query(
+        datetime(2025, 5, 13), datetime(2025, 5, 14), ChartEventType.MOUSE
+    )
+
+    assert scanned_relations(plan_of(seeded_engine, query)) == {
+        "client_timeline_entries_2025_05"
+    }
@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock
+
+from activitytracker.config.definitions import read_pool_size
+from activitytracker.db import database
+from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
+
+
+def test_reads_have_their_own_pool():
+    # Creating an engine doesn't connect, so no db is needed here
+    assert database.read_engine.pool is not database.sync_engine.pool
+    assert database.async_read_engine.pool is not database.async_engine.pool
+    assert database.read_engine.pool.size() == read_pool_size
+
+
+def test_read_pool_is_read_only():
+    assert database.read_only_settings["default_transaction_read_only"] == "on"
+    assert int(database.read_only_settings["statement_timeout"]) > 0
+
+
+def test_timeline_reads_use_the_read_maker():
+    writer = MagicMock()
+    reader = MagicMock()
+
+    dao = TimelineEntryDao(writer, read_session_maker=reader)
+
+    assert dao.read_session_maker is reader
+    assert dao.async_session_maker is writer
+    assert TimelineEntryDao(writer).read_session_maker is writer
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import MagicMock
+
+from activitytracker.db.unit_of_work import BorrowedSession, UnitOfWorkSessionMaker
+
+
+@pytest.fixture
+def session_maker():
+    return MagicMock()
+
+
+@pytest.fixture
+def shared_session(session_maker):
+    return session_maker.return_value.__enter__.return_value
+
+
+def test_outside_a_unit_of_work_is_the_plain_maker(session_maker):
+    maker = UnitOfWorkSessionMaker(session_maker)
+
+    assert maker() is session_maker.return_value
+    assert not maker.in_unit_of_work()
+
+
+def test_daos_share_one_session_and_one_commit(session_maker, shared_session):
+    maker = UnitOfWorkSessionMaker(session_maker)
+
+    with maker.unit_of_work():
+        for _ in range(3):
+            with maker() as db_session:
+                assert isinstance(db_session, BorrowedSession)
+                db_session.execute("UPDATE")
+                db_session.commit()
+
+    assert session_maker.call_count == 1
+    assert shared_session.execute.call_count == 3
+    assert shared_session.flush.call_count == 3
+    shared_session.commit.assert_called_once()
+    assert not maker.in_unit_of_work()
+
+
+def test_nested_unit_of_work_commits_once(session_maker, shared_session):
+    maker = UnitOfWorkSessionMaker(session_maker)
+
+    with maker.unit_of_work():
+        with maker.unit_of_work():
+            maker().commit()
+        shared_session.commit.assert_not_called()
+
+    shared_session.commit.assert_called_once()
+
+
+def test_failure_rolls_back_everything(session_maker, shared_session):
+    maker = UnitOfWorkSessionMaker(session_maker)
+
+    with pytest.raises(ValueError):
+        with maker.unit_of_work():
+            maker().execute("UPDATE")
+            raise ValueError("Mid-transition failure")
+
+    shared_session.rollback.assert_called_once()
+    shared_session.commit.assert_not_called()
+    assert not maker.in_unit_of_work()
@@ -15,6 +15,7 @@ from typing import cast
 from activitytracker.arbiter.activity_arbiter import ActivityArbiter
 from activitytracker.arbiter.activity_recorder import ActivityRecorder
 from activitytracker.config.definitions import imported_local_tz_str, window_push_length
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
 from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
 from activitytracker.db.dao.direct.mystery_media_dao import MysteryMediaDao
 from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
@@ -1325,12 +1326,15 @@ async def test_arbiter_to_dao_layer(regular_session_maker, plain_asm):
     # ### ### Checkpoint:
     # # Dashboard Service reports the right amount of time for get_weekly_productivity_overview
     timeline_dao = TimelineEntryDao(plain_asm)
+    activity_category_dao = ActivityCategoryDao(regular_session_maker)
+    activity_category_dao.seed_defaults()
     dashboard_service = DashboardService(
         timeline_dao,
         program_summary_dao,
         program_logging_dao,
         chrome_summary_dao,
         chrome_logging_dao,
+        activity_category_dao,
     )
 
     # #      /\
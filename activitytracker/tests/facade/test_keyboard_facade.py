@@ -24,3 +24,31 @@ def mock_listener():
 
 def test_read_event_returns_none_when_no_event(keyboard_facade):
     assert keyboard_facade.read_event() is None
+
+
+def test_a_batch_of_key_downs_is_queued_in_order(keyboard_facade):
+    keyboard_facade.handle_keyboard_message({"type": "keyboard", "timestamps": [1.0, 1.5]})
+    keyboard_facade.handle_keyboard_message({"type": "keyboard", "timestamp": 2.0})
+
+    assert list(keyboard_facade.get_all_events()) == [1.0, 1.5, 2.0]
+
+
+def test_waiting_ends_on_an_event_or_a_wake(keyboard_facade):
+    assert keyboard_facade.wait_for_events(timeout=0.01) is False
+
+    keyboard_facade.add_event(1.0)
+    assert keyboard_facade.wait_for_events() is True
+
+    keyboard_facade.get_all_events()
+    keyboard_facade.wake()
+    assert keyboard_facade.wait_for_events() is False
+
+
+def test_drops_and_occupancy_are_counted():
+    facade = KeyboardFacadeCore(capacity=2)
+
+    facade.handle_keyboard_message({"type": "keyboard", "timestamps": [1.0, 2.0, 3.0]})
+    assert list(facade.get_all_events()) == [1.0, 2.0]
+
+    assert facade.monitoring.dropped == 1
+    assert facade.monitoring.peak_occupancy == 2
@@ -0,0 +1,110 @@
+import zmq
+
+import pytest
+from unittest.mock import Mock
+
+import asyncio
+
+from activitytracker.facade.receive_messages import MessageReceiver
+from activitytracker.util.wire_format import encode_keyboard, encode_mouse
+
+
+class WaitingSocket:
+    """Stands in for the SUB socket with some messages already arrived"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def recv_multipart(self, flags=0):
+        if not self.messages:
+            raise zmq.Again()
+        return self.messages.pop(0)
+
+
+def make_receiver(messages, **kwargs):
+    receiver = MessageReceiver(**kwargs)
+    receiver.socket.close()
+    receiver.socket = WaitingSocket(messages)
+    return receiver
+
+
+@pytest.mark.asyncio
+async def test_one_wakeup_drains_everything_waiting():
+    messages = [encode_keyboard([1.0]), encode_mouse(1.0, 2.0), encode_keyboard([3.0, 4.0])]
+    receiver = make_receiver(messages)
+    keyboard_handler = Mock()
+    receiver.register_handler("keyboard", keyboard_handler, batched=True)
+
+    batch = await receiver.drain_socket()
+
+    assert len(batch) == 3
+    await receiver.handlers["keyboard"](receiver.group_by_type(batch)["keyboard"])
+    events = keyboard_handler.call_args.args[0]
+    assert [list(event["timestamps"]) for event in events] == [[1.0], [3.0, 4.0]]
+
+
+@pytest.mark.asyncio
+async def test_a_drain_stops_at_the_max():
+    receiver = make_receiver([encode_keyboard([1.0])] * 5, max_drain=2)
+
+    assert len(await receiver.drain_socket()) == 2
+    assert len(receiver.socket.messages) == 3
+
+
+@pytest.mark.asyncio
+async def test_an_unbatched_handler_still_gets_one_event_at_a_time():
+    receiver = make_receiver([])
+    handler = Mock()
+    receiver.register_handler("mouse", handler)
+
+    await receiver.handlers["mouse"]([{"start": 1.0}, {"start": 2.0}])
+
+    assert [call.args[0] for call in handler.call_args_list] == [
+        {"start": 1.0},
+        {"start": 2.0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_a_full_queue_drops_per_its_policy():
+    oldest = make_receiver([], max_queue_batches=2, overflow_policy="drop_oldest")
+    newest = make_receiver([], max_queue_batches=2, overflow_policy="drop_newest")
+
+    for receiver in (oldest, newest):
+        for batch in ([{"n": 1}], [{"n": 2}, {"n": 3}], [{"n": 4}]):
+            await receiver.enqueue(batch)
+
+    assert oldest.dropped_events == 1
+    assert oldest.event_queue.get_nowait() == [{"n": 2}, {"n": 3}]
+    assert newest.dropped_events == 1
+    assert newest.event_queue.get_nowait() == [{"n": 1}]
+    assert oldest.queue_high_water_mark == newest.queue_high_water_mark == 2
+
+
+@pytest.mark.asyncio
+async def test_a_dropped_keyboard_message_counts_each_key_down():
+    receiver = make_receiver([], max_queue_batches=1, overflow_policy="drop_newest")
+    mouse = {"type": "mouse", "start": 1.0, "end": 2.0}
+    keyboard = {"type": "keyboard", "timestamps": [1.0, 2.0, 3.0]}
+
+    await receiver.enqueue([mouse])
+    await receiver.enqueue([keyboard, mouse])
+
+    assert receiver.dropped_events == 4
+
+
+def test_an_unknown_policy_is_refused():
+    with pytest.raises(ValueError):
+        MessageReceiver(overflow_policy="drop_everything")
+
+
+@pytest.mark.asyncio
+async def test_a_dropped_legacy_keyboard_message_counts_as_one():
+    receiver = make_receiver([], max_queue_batches=1, overflow_policy="drop_oldest")
+    legacy = {"type": "keyboard", "timestamp": 1.0}
+
+    await receiver.enqueue([legacy, legacy])
+    await receiver.enqueue([{"type": "keyboard", "timestamps": [2.0, 3.0]}])
+
+    assert receiver.dropped_events == 2
+    assert receiver.event_queue.qsize() == 1
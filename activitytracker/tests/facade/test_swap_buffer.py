@@ -0,0 +1,34 @@
+from activitytracker.facade.swap_buffer import SwapBuffer
+
+
+def test_a_swap_hands_over_the_filled_buffer():
+    buffer = SwapBuffer(width=2, capacity=4)
+    buffer.extend([1.0, 2.0, 3.0, 4.0])
+
+    taken = buffer.swap()
+
+    assert list(taken) == [1.0, 2.0, 3.0, 4.0]
+    assert len(buffer) == 0
+    # The writer carries on in the other array, so what was taken holds still
+    buffer.extend([5.0, 6.0])
+    assert list(taken) == [1.0, 2.0, 3.0, 4.0]
+    assert list(buffer.swap()) == [5.0, 6.0]
+
+
+def test_a_full_buffer_counts_what_it_drops():
+    buffer = SwapBuffer(width=1, capacity=3)
+
+    assert buffer.extend([1.0, 2.0]) == 0
+    assert buffer.extend([3.0, 4.0, 5.0]) == 2
+
+    assert buffer.dropped == 2
+    assert list(buffer.swap()) == [1.0, 2.0, 3.0]
+
+
+def test_the_oldest_comes_off_first():
+    buffer = SwapBuffer(width=2, capacity=4)
+    buffer.extend([1.0, 2.0, 3.0, 4.0])
+
+    assert list(buffer.pop_oldest()) == [1.0, 2.0]
+    assert list(buffer.pop_oldest()) == [3.0, 4.0]
+    assert buffer.pop_oldest() is None
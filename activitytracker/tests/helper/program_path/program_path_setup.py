@@ -134,7 +134,8 @@ def setup_summary_dao_spies(p_summary_dao):
     summary_start_session_spy = Mock(side_effect=p_summary_dao.start_session)
     p_summary_dao.start_session = summary_start_session_spy
 
-    summary_add_new_item_spy = Mock()
+    # No id comes back, so sessions keep no summary handle unless the test gives them one
+    summary_add_new_item_spy = Mock(return_value=None)
     p_summary_dao.add_new_item = summary_add_new_item_spy
 
     push_window_ahead_ten_sec_spy = Mock(side_effect=p_summary_dao.push_window_ahead_ten_sec)
@@ -145,17 +146,18 @@ def setup_summary_dao_spies(p_summary_dao):
     )
     p_summary_dao.create_find_all_from_day_query = make_find_all_from_day_query_spy
 
-    execute_window_push_spy = Mock()
-    p_summary_dao.execute_window_push = execute_window_push_spy
+    # Stands in for INSERT ... ON CONFLICT. Returns no id unless the test says otherwise
+    summary_upsert_spy = Mock(return_value=None)
+    p_summary_dao.upsert_summary = summary_upsert_spy
 
-    do_addition_spy = Mock()
-    p_summary_dao.do_addition = do_addition_spy
+    add_hours_by_handle_spy = Mock()
+    p_summary_dao.add_hours_by_handle = add_hours_by_handle_spy
 
     return p_summary_dao, {
         "summary_start_session_spy": summary_start_session_spy,
         "summary_add_new_item_spy": summary_add_new_item_spy,
         "push_window_ahead_ten_sec_spy": push_window_ahead_ten_sec_spy,
         "make_find_all_from_day_query_spy": make_find_all_from_day_query_spy,
-        "execute_window_push_spy": execute_window_push_spy,
-        "do_addition_spy": do_addition_spy,
+        "summary_upsert_spy": summary_upsert_spy,
+        "add_hours_by_handle_spy": add_hours_by_handle_spy,
     }
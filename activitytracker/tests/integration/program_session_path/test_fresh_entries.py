@@ -253,7 +253,8 @@ async def test_program_path_with_fresh_sessions(
 
     just_made_logs = make_mock_db_rows_for_test_data(test_two_data_clone)
 
-    logger_add_new_item_spy = Mock()
+    # No id comes back, so the logs are found by start_time like before
+    logger_add_new_item_spy = Mock(return_value=None)
     p_logging_dao.add_new_item = logger_add_new_item_spy
 
     find_session_spy = Mock(side_effect=p_logging_dao.find_session)
@@ -436,14 +437,12 @@ async def test_program_path_with_fresh_sessions(
 
         assert_activity_recorder_called_expected_times(second_test_event_count)
 
-        assert find_todays_entry_for_program_mock.call_count == second_test_event_count
+        # The upsert in start_session replaced the lookup
+        assert find_todays_entry_for_program_mock.call_count == 0
 
         def assert_sqlalchemy_layer_went_as_expected():
             """Covers only stuff that obscures sqlalchemy code."""
-            assert (
-                sum_dao_execute_and_read_one_or_none_spy.call_count
-                == second_test_event_count
-            )
+            assert sum_dao_execute_and_read_one_or_none_spy.call_count == 0
 
             concluded_sessions = second_test_event_count - trailing_entry
 
@@ -453,14 +452,18 @@ async def test_program_path_with_fresh_sessions(
             )
 
             assert (
-                summary_dao_spies["summary_add_new_item_spy"].call_count
+                summary_dao_spies["summary_start_session_spy"].call_count
                 == second_test_event_count
             ), "A Summary should've been made for each entry, hence 'brand new' sessions"
             assert logger_add_new_item_spy.call_count == second_test_event_count
 
             assert update_item_spy.call_count == total_pushes + concluded_sessions
 
-            assert summary_dao_spies["execute_window_push_spy"].call_count == total_pushes
+            # No ids come back from the spy, so pushes and partial windows upsert too
+            assert (
+                summary_dao_spies["summary_upsert_spy"].call_count
+                == second_test_event_count + total_pushes + concluded_sessions
+            )
 
         assert_sqlalchemy_layer_went_as_expected()
 
@@ -486,26 +489,24 @@ async def test_program_path_with_fresh_sessions(
         # The final entry being held suspended in Arbiter
         assert summary_dao_spies["push_window_ahead_ten_sec_spy"].call_count == total_pushes
 
-        assert (
-            summary_dao_spies["do_addition_spy"].call_count
-            == second_test_event_count - trailing_entry
-        )
-
         assert finalize_log_spy.call_count == second_test_event_count - trailing_entry
 
         # TODO assert that process_name made it into where it belongs, and looked right
         # TODO: assert that detail looked right
 
-        assert (
-            summary_dao_spies["summary_add_new_item_spy"].call_count == 4
-        ), "A new summary was created despite preexisting sessions"
+        new_summaries = [
+            call[0][0]
+            for call in summary_dao_spies["summary_upsert_spy"].call_args_list
+            if call[0][0].hours_spent == 0
+        ]
+        assert len(new_summaries) == 4, "Expected one new summary per session"
 
         assert logger_add_new_item_spy.call_count == second_test_event_count
 
         assert len(logger_add_new_item_spy.call_args_list) == second_test_event_count
 
         for i in range(0, second_test_event_count):
-            summary = summary_dao_spies["summary_add_new_item_spy"].call_args_list[i][0][0]
+            summary = new_summaries[i]
 
             assert isinstance(summary, DailyProgramSummary)
             assert (
@@ -248,10 +248,14 @@ async def test_program_path_with_existing_sessions(
     # So that the condition "the user already has a session for these programs" is met
     p_summary_dao.find_todays_entry_for_program = find_todays_entry_for_program_mock
 
+    # The upsert hits the preexisting row, so its id comes back
+    summary_dao_spies["summary_upsert_spy"].return_value = next(pretend_sums_from_db).id
+
     #
     # Logger methods
     #
-    logger_add_new_item_spy = Mock()
+    # No id comes back, so the logs are found by start_time like before
+    logger_add_new_item_spy = Mock(return_value=None)
     p_logging_dao.add_new_item = logger_add_new_item_spy
 
     find_session_spy = Mock(side_effect=p_logging_dao.find_session)
@@ -455,10 +459,11 @@ async def test_program_path_with_existing_sessions(
 
         assert_activity_recorder_called_expected_times(event_count)
 
-        assert find_todays_entry_for_program_mock.call_count == event_count
+        # The upsert in start_session replaced the lookup
+        assert find_todays_entry_for_program_mock.call_count == 0
 
-        # It's never used because preexisting sessions block the path
-        assert summary_dao_spies["summary_start_session_spy"].call_count == 0
+        assert summary_dao_spies["summary_start_session_spy"].call_count == event_count
+        assert summary_dao_spies["summary_upsert_spy"].call_count == event_count
 
         # --
         # -- A much needed value: The count of window pushes
@@ -467,7 +472,7 @@ async def test_program_path_with_existing_sessions(
 
         def assert_sqlalchemy_layer_went_as_expected():
             """Covers only stuff that obscures sqlalchemy code."""
-            assert sum_dao_execute_and_read_one_or_none_spy.call_count == event_count
+            assert sum_dao_execute_and_read_one_or_none_spy.call_count == 0
             # FIXME:L assert 10 == (4 - 1)
             # execute_and_read_one_or_none is used in find_session, which
             # is used in window push and finalize log
@@ -486,7 +491,11 @@ async def test_program_path_with_existing_sessions(
 
             assert update_item_spy.call_count == total_pushes + concluded_sessions
 
-            assert summary_dao_spies["execute_window_push_spy"].call_count == total_pushes
+            # The preexisting summaries have ids, so pushes go by primary key
+            assert (
+                summary_dao_spies["add_hours_by_handle_spy"].call_count
+                == total_pushes + concluded_sessions
+            )
 
         assert_sqlalchemy_layer_went_as_expected()
 
@@ -511,8 +520,6 @@ async def test_program_path_with_existing_sessions(
 
         assert summary_dao_spies["push_window_ahead_ten_sec_spy"].call_count == total_pushes
 
-        assert summary_dao_spies["do_addition_spy"].call_count == event_count - active_entry
-
         assert finalize_log_spy.call_count == event_count - active_entry
 
         assert (
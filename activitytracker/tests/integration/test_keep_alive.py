@@ -1,5 +1,6 @@
 # tests/integration/test_keep_alive.py
 import math
+from contextlib import nullcontext
 
 import pytest
 from unittest.mock import MagicMock, Mock
@@ -54,6 +55,12 @@ class MockActivityRecorder:
         self.add_partial_window = Mock()
         self.add_partial_window.side_effect = self._record_addition
 
+    def unit_of_work(self):
+        return nullcontext()
+
+    def shutdown(self):
+        pass
+
     def _record_pulse(self, session):
         """Side effect function that records each pulse"""
         self.pulse_history.append(session)
@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+import pytz
+from datetime import date, datetime
+
+from activitytracker.db.dao.direct.partition_dao import PartitionDao
+from activitytracker.object.enums import ChartEventType
+from activitytracker.services.partition_maintenance_service import (
+    PartitionMaintenanceService,
+)
+from activitytracker.services.timeline_precompute_service import TimelinePrecomputeService
+from activitytracker.util.partitions import days_needed
+from activitytracker.util.time_wrappers import UserLocalTime
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+january = date(2025, 1, 1)
+both_groups = (ChartEventType.MOUSE, ChartEventType.KEYBOARD)
+
+
+class FixedClock:
+    def __init__(self, dt):
+        self.dt = dt
+
+    def now(self):
+        return UserLocalTime(self.dt)
+
+
+@pytest.fixture
+def dao():
+    partition_dao = Mock(spec=PartitionDao)
+    partition_dao.create_month = AsyncMock(return_value=True)
+    partition_dao.read_months = AsyncMock(return_value=[january, date(2025, 5, 1)])
+    partition_dao.drop_month = AsyncMock()
+    partition_dao.read_precomputed_markers = AsyncMock(
+        return_value={(day, group) for day in days_needed(january) for group in both_groups}
+    )
+    return partition_dao
+
+
+@pytest.fixture
+def precompute_service():
+    service = Mock(spec=TimelinePrecomputeService)
+    service.backfill = AsyncMock(return_value={})
+    return service
+
+
+@pytest.fixture
+def service(dao, precompute_service):
+    clock = FixedClock(tokyo_tz.localize(datetime(2025, 5, 20, 12, 0)))
+    return PartitionMaintenanceService(dao, precompute_service, clock, retention_days=90)
+
+
+@pytest.mark.asyncio
+async def test_months_are_made_ahead(service, dao):
+    created = await service.create_ahead()
+
+    made = {call.args for call in dao.create_month.call_args_list}
+    assert ("mouse_moves", date(2025, 7, 1)) in made
+    assert len(made) == 3 * 3  # This month and two ahead, for each table
+    assert "typing_sessions_2025_05" in created
+
+
+@pytest.mark.asyncio
+async def test_an_old_precomputed_month_is_dropped(service, dao, precompute_service):
+    dropped = await service.drop_expired()
+
+    assert dropped == [
+        "client_timeline_entries_2025_01",
+        "mouse_moves_2025_01",
+        "typing_sessions_2025_01",
+    ]
+    # The days the server was off for get precomputed first
+    precompute_service.backfill.assert_awaited_once_with(
+        date(2024, 12, 31), date(2025, 2, 1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_a_month_missing_a_day_is_kept(service, dao):
+    markers = dao.read_precomputed_markers.return_value
+    markers.discard((date(2025, 1, 9), ChartEventType.KEYBOARD))
+
+    dropped = await service.drop_expired()
+
+    # mouse_moves only needs the mouse days
+    assert dropped == ["mouse_moves_2025_01"]
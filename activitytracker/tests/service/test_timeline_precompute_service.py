@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+import pytz
+from datetime import date, datetime, timedelta
+
+from activitytracker.db.dao.queuing.timeline_entry_dao import TimelineEntryDao
+from activitytracker.object.enums import ChartEventType
+from activitytracker.services.timeline_precompute_service import TimelinePrecomputeService
+from activitytracker.util.time_wrappers import UserLocalTime
+from activitytracker.util.week_response_cache import get_week_response_cache
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+
+class FixedClock:
+    def __init__(self, dt):
+        self.dt = dt
+
+    def now(self):
+        return UserLocalTime(self.dt)
+
+
+@pytest.fixture
+def dao():
+    timeline_dao = Mock(spec=TimelineEntryDao)
+    timeline_dao.is_day_precomputed = AsyncMock(return_value=False)
+    timeline_dao.precompute_day = AsyncMock(return_value=["entry", "entry"])
+    timeline_dao.forget_precomputed_day = AsyncMock()
+    return timeline_dao
+
+
+@pytest.fixture
+def service(dao):
+    clock = FixedClock(tokyo_tz.localize(datetime(2025, 5, 20, 23, 50)))
+    return TimelinePrecomputeService(dao, clock)
+
+
+@pytest.mark.asyncio
+async def test_precompute_day_does_both_groups(service, dao):
+    written = await service.precompute_day(date(2025, 5, 19))
+
+    assert written == {ChartEventType.MOUSE: 2, ChartEventType.KEYBOARD: 2}
+    assert dao.precompute_day.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_marked_days_are_skipped(service, dao):
+    dao.is_day_precomputed.return_value = True
+
+    written = await service.precompute_day(date(2025, 5, 19))
+
+    assert written == {ChartEventType.MOUSE: None, ChartEventType.KEYBOARD: None}
+    dao.precompute_day.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_force_recomputes(service, dao):
+    dao.is_day_precomputed.return_value = True
+
+    await service.precompute_day(date(2025, 5, 19), force=True)
+
+    assert dao.forget_precomputed_day.call_count == 2
+    assert dao.precompute_day.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_force_invalidates_the_cached_week(service):
+    cache = get_week_response_cache()
+    now = tokyo_tz.localize(datetime(2025, 6, 4, 12, 0))
+    cache.put("timeline", date(2025, 5, 18), "Asia/Tokyo", b"{}", now)
+
+    await service.precompute_day(date(2025, 5, 19), force=True)
+
+    assert cache.get("timeline", date(2025, 5, 18), "Asia/Tokyo") is None
+
+
+@pytest.mark.asyncio
+async def test_today_is_refused(service):
+    with pytest.raises(ValueError):
+        await service.precompute_day(date(2025, 5, 20))
+
+
+@pytest.mark.asyncio
+async def test_backfill_stops_at_yesterday(service):
+    results = await service.backfill(date(2025, 5, 17), date(2025, 5, 25))
+
+    assert list(results.keys()) == [date(2025, 5, 17), date(2025, 5, 18), date(2025, 5, 19)]
+
+
+def test_next_run_is_just_after_midnight(service):
+    # 23:50 now, midnight is 10 min away, plus the 5 min grace period
+    assert service.seconds_until_next_run() == timedelta(minutes=15).total_seconds()
@@ -0,0 +1,80 @@
+import threading
+from unittest.mock import Mock
+
+from activitytracker.trackers.peripherals.util.keyboard_event_dispatch import (
+    KeyboardEventDispatch,
+)
+
+
+def test_a_full_batch_goes_out_at_once():
+    handler = Mock()
+    dispatch = KeyboardEventDispatch(handler, max_delay_sec=60, max_batch_size=3)
+
+    for timestamp in [1.0, 1.1, 1.2, 1.3]:
+        dispatch.add_event(timestamp)
+
+    handler.assert_called_once_with([1.0, 1.1, 1.2])
+    # The fourth key waits for the next batch
+    assert dispatch.timestamps == [1.3]
+    assert dispatch.deadline is not None
+    dispatch.flush()
+    assert handler.call_args.args == ([1.3],)
+
+
+def test_keys_wait_no_longer_than_the_delay():
+    sent = threading.Event()
+    handler = Mock(side_effect=lambda batch: sent.set())
+    dispatch = KeyboardEventDispatch(handler, max_delay_sec=0.05)
+
+    dispatch.add_event(1.0)
+    deadline = dispatch.deadline
+    dispatch.add_event(1.1)
+    # The second key didn't push the flush back
+    assert dispatch.deadline == deadline
+    assert sent.wait(timeout=2)
+
+    handler.assert_called_once_with([1.0, 1.1])
+    assert dispatch.deadline is None
+
+
+def test_one_flusher_thread_for_every_batch():
+    dispatch = KeyboardEventDispatch(Mock(), max_delay_sec=60)
+
+    dispatch.add_event(1.0)
+    flusher = dispatch.flusher_thread
+    dispatch.flush()
+    dispatch.add_event(2.0)
+
+    assert dispatch.flusher_thread is flusher
+
+
+def test_batches_go_out_one_at_a_time_and_in_order():
+    batches = []
+    overlaps = []
+    in_handler = threading.Lock()
+
+    def handler(batch):
+        # A second thread in here at once would fail to get it
+        if not in_handler.acquire(blocking=False):
+            overlaps.append(batch)
+            return
+        batches.append(batch)
+        in_handler.release()
+
+    # The flusher's deadlines and the full batches race the whole time
+    dispatch = KeyboardEventDispatch(handler, max_delay_sec=0.0001, max_batch_size=3)
+    for timestamp in range(2000):
+        dispatch.add_event(float(timestamp))
+    dispatch.flush()
+
+    assert overlaps == []
+    assert [t for batch in batches for t in batch] == [float(t) for t in range(2000)]
+
+
+def test_flushing_nothing_sends_nothing():
+    handler = Mock()
+    dispatch = KeyboardEventDispatch(handler)
+
+    dispatch.flush()
+
+    handler.assert_not_called()
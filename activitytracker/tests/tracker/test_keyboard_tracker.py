@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 
+from activitytracker.facade.keyboard_facade import KeyboardFacadeCore
 from activitytracker.trackers.keyboard_tracker import KeyboardTrackerCore
 from activitytracker.util.threaded_tracker import ThreadedTracker
 from activitytracker.object.classes import KeyboardAggregate
@@ -284,3 +285,25 @@ def test_key_press_tracking(tracker_and_events, mock_keyboard_facade):
 #     assert len(handler2_calls) == 1
 
 #     assert handler1_calls[0] == handler2_calls[0]
+
+
+def test_threaded_tracker_sleeps_until_a_key_arrives(event_collector):
+    events, handler = event_collector
+    facade = KeyboardFacadeCore()
+    tracker = KeyboardTrackerCore(facade, handler)
+    tracker.run_tracking_loop = Mock(wraps=tracker.run_tracking_loop)
+    threaded_tracker = ThreadedTracker(tracker, facade)
+
+    threaded_tracker.start()
+    threaded_tracker.stop_event.wait(0.3)
+    # Once at the start, then nothing to wake it for
+    assert tracker.run_tracking_loop.call_count == 1
+
+    now = datetime.now().timestamp()
+    facade.add_event(now)
+    facade.add_event(now + 2)  # Past the timeout, so the first session closes
+    threaded_tracker.stop_event.wait(0.3)
+    assert len(events) == 1
+
+    threaded_tracker.stop()
+    assert not threaded_tracker.hook_thread.is_alive()
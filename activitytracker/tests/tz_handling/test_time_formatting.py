@@ -1,12 +1,19 @@
 import pytest
 from unittest.mock import patch
 
-from datetime import datetime, timedelta, timezone
+import pytz
+from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 
+from sqlalchemy import inspect
+
+from activitytracker.db.models import DailyProgramSummary, ProgramSummaryLog
 from activitytracker.tz_handling.time_formatting import (
     account_for_timezone_offset,
+    add_local_days,
+    attach_tz_to_all,
+    bucket_by_local_day,
     convert_to_timezone,
     format_for_local_time,
 )
@@ -139,3 +146,70 @@ class FormatForLocalTime:
 
     def test_already_all_the_right_time(self):
         pass
+
+
+def test_add_local_days_across_dst():
+    # DST started at 2 am on March 9th, 2025 in Vancouver
+    pacific = pytz.timezone("America/Vancouver")
+    sunday = pacific.localize(datetime(2025, 3, 9))
+    assert sunday.utcoffset() == timedelta(hours=-8)
+
+    next_sunday = add_local_days(sunday, 7)
+
+    assert next_sunday.hour == 0
+    assert next_sunday.utcoffset() == timedelta(hours=-7)
+
+    zoneinfo_sunday = datetime(2025, 3, 9, tzinfo=ZoneInfo("America/Vancouver"))
+    assert add_local_days(zoneinfo_sunday, 7).utcoffset() == timedelta(hours=-7)
+
+
+def test_bucket_by_local_day():
+    tokyo = ZoneInfo("Asia/Tokyo")
+    rows = [
+        datetime(2025, 3, 1, 16, 0, tzinfo=timezone.utc),  # 01:00 Mar 2 in Tokyo
+        datetime(2025, 3, 2, 14, 59, tzinfo=timezone.utc),  # 23:59 Mar 2 in Tokyo
+        datetime(2025, 3, 2, 15, 0, tzinfo=timezone.utc),  # Mar 3 in Tokyo
+        datetime(2025, 3, 12, 0, 0, tzinfo=timezone.utc),  # Not in the week
+    ]
+
+    days = bucket_by_local_day(rows, date(2025, 3, 2), tokyo, lambda row: row)
+
+    assert list(days.keys()) == [date(2025, 3, 2) + timedelta(days=i) for i in range(7)]
+    assert days[date(2025, 3, 2)] == rows[:2]
+    assert days[date(2025, 3, 3)] == [rows[2]]
+    assert sum(len(rows_for_day) for rows_for_day in days.values()) == 3
+
+
+def test_bucket_by_local_day_across_dst():
+    vancouver = pytz.timezone("America/Vancouver")
+    sunday = vancouver.localize(datetime(2025, 3, 9))  # Clocks go forward at 2 am
+    rows = [
+        datetime(2025, 3, 9, 7, 59, tzinfo=timezone.utc),  # 23:59 Mar 8, PST
+        datetime(2025, 3, 9, 8, 0, tzinfo=timezone.utc),  # 00:00 Mar 9, PST
+        datetime(2025, 3, 10, 6, 59),  # Naive is UTC. 23:59 Mar 9, PDT
+        datetime(2025, 3, 10, 7, 0, tzinfo=timezone.utc),  # 00:00 Mar 10, PDT
+    ]
+
+    days = bucket_by_local_day(rows, sunday.date(), sunday.tzinfo, lambda row: row)
+
+    assert days[date(2025, 3, 9)] == rows[1:3]
+    assert days[date(2025, 3, 10)] == [rows[3]]
+
+
+def test_attach_tz_leaves_the_rows_unmodified():
+    tokyo = pytz.timezone("Asia/Tokyo").localize(datetime(2025, 3, 2)).tzinfo
+    summary = DailyProgramSummary(gathering_date_local=datetime(2025, 3, 2))
+    log = ProgramSummaryLog(
+        gathering_date_local=datetime(2025, 3, 2),
+        start_time_local=datetime(2025, 3, 2, 9),
+        end_time_local=None,  # Still open
+    )
+
+    attach_tz_to_all([summary], tokyo)
+    attach_tz_to_all([log], tokyo)
+
+    assert summary.gathering_date_local.tzinfo is tokyo
+    assert log.start_time_local == datetime(2025, 3, 2, 9, tzinfo=tokyo)
+    assert log.end_time_local is None
+    # Nothing that a later flush would mistake for an edit
+    assert not inspect(summary).attrs.gathering_date_local.history.has_changes()
@@ -22,6 +22,7 @@ from datetime import datetime, timedelta
 
 from typing import List
 
+from activitytracker.db.dao.direct.activity_category_dao import ActivityCategoryDao
 from activitytracker.db.dao.direct.chrome_summary_dao import ChromeSummaryDao
 from activitytracker.db.dao.direct.program_summary_dao import ProgramSummaryDao
 from activitytracker.db.dao.queuing.chrome_logs_dao import ChromeLoggingDao
@@ -90,6 +91,8 @@ async def setup_parts(regular_session_maker, async_engine_and_asm):
     chrome_logging_dao = ChromeLoggingDao(regular_session_maker)
     program_summary_dao = ProgramSummaryDao(program_logging_dao, regular_session_maker)
     chrome_summary_dao = ChromeSummaryDao(chrome_logging_dao, regular_session_maker)
+    activity_category_dao = ActivityCategoryDao(regular_session_maker)
+    activity_category_dao.seed_defaults()
 
     # Create and return the dashboard service
     service = DashboardService(
@@ -98,6 +101,7 @@ async def setup_parts(regular_session_maker, async_engine_and_asm):
         program_logging_dao=program_logging_dao,
         chrome_summary_dao=chrome_summary_dao,
         chrome_logging_dao=chrome_logging_dao,
+        activity_category_dao=activity_category_dao,
     )
 
     yield service, program_summary_dao, chrome_summary_dao, regular_session_maker
@@ -0,0 +1,102 @@
+import random
+from collections import namedtuple
+
+from datetime import date, datetime, timedelta, timezone
+
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.live_timeline import LiveTimeline, as_utc
+from activitytracker.util.timeline_event_aggregator import aggregate_timeline_events
+
+from ..data.timeline_data import all_mouse_events
+
+# What the timeline dao hands over after a flush
+WrittenRow = namedtuple("WrittenRow", ["id", "group", "start", "end"])
+
+mouse_rows = [
+    WrittenRow(event.id, ChartEventType.MOUSE, event.start, event.end)
+    for event in all_mouse_events
+]
+feb_17 = date(2025, 2, 17)
+
+
+def loaded_timeline(rows=()):
+    live_timeline = LiveTimeline()
+    live_timeline.start_loading()
+    live_timeline.finish_loading(feb_17, rows)
+    return live_timeline
+
+
+def as_compared(entries):
+    return [
+        (entry.clientFacingId, as_utc(entry.start), as_utc(entry.end), entry.eventCount)
+        for entry in entries
+    ]
+
+
+def test_same_groups_as_the_aggregator():
+    expected = aggregate_timeline_events(all_mouse_events)
+    live_timeline = loaded_timeline()
+
+    for row in mouse_rows:
+        live_timeline.add_rows([row])
+
+    live = live_timeline.entries(feb_17, ChartEventType.MOUSE)
+    assert as_compared(live) == as_compared(expected)
+    assert live[0].content == "Mouse Event 226779"
+
+
+def test_out_of_order_rows_end_up_the_same():
+    expected = aggregate_timeline_events(all_mouse_events)
+    shuffled = list(mouse_rows)
+    random.Random(17).shuffle(shuffled)
+    live_timeline = loaded_timeline()
+
+    live_timeline.add_rows(shuffled)
+
+    live = live_timeline.entries(feb_17, ChartEventType.MOUSE)
+    assert as_compared(live) == as_compared(expected)
+    # The client's ids may be stale now, so any older cursor gets everything
+    assert live_timeline.changes_since(feb_17, ChartEventType.MOUSE, after_id=1) is None
+
+
+def test_only_new_and_grown_groups_since_the_cursor():
+    live_timeline = loaded_timeline(mouse_rows[:-1])
+    cursor = live_timeline.highest_id
+    last = mouse_rows[-1]
+
+    assert live_timeline.changes_since(feb_17, ChartEventType.MOUSE, after_id=cursor) == []
+
+    live_timeline.add_rows([last])
+
+    changed = live_timeline.changes_since(feb_17, ChartEventType.MOUSE, after_id=cursor)
+    assert len(changed) == 1
+    assert changed[0].end == as_utc(last.end)
+
+
+def test_rows_written_while_loading_are_not_counted_twice():
+    live_timeline = LiveTimeline()
+    live_timeline.start_loading()
+    live_timeline.add_rows(mouse_rows[5:])  # Some of these, the load also read
+
+    assert not live_timeline.has_day(feb_17, ChartEventType.MOUSE)
+    live_timeline.finish_loading(feb_17, mouse_rows[:10])
+
+    entries = live_timeline.entries(feb_17, ChartEventType.MOUSE)
+    assert sum(entry.eventCount for entry in entries) == len(mouse_rows)
+
+
+def test_a_finished_day_is_handed_off():
+    live_timeline = loaded_timeline(mouse_rows)
+    next_day = datetime(2025, 2, 18, 1, 0, tzinfo=timezone.utc)
+    live_timeline.add_rows(
+        [WrittenRow(999999, ChartEventType.MOUSE, next_day, next_day + timedelta(seconds=2))]
+    )
+
+    handed_off = live_timeline.pop(feb_17, ChartEventType.MOUSE)
+
+    assert len(handed_off.events) == len(mouse_rows)
+    assert not live_timeline.has_day(feb_17, ChartEventType.MOUSE)
+    assert live_timeline.has_day(date(2025, 2, 18), ChartEventType.MOUSE)
+    # A straggler for the finished day is left to the db
+    live_timeline.add_rows([mouse_rows[0]._replace(id=1000000)])
+    assert live_timeline.entries(feb_17, ChartEventType.MOUSE) == []
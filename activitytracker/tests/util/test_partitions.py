@@ -0,0 +1,68 @@
+from datetime import date, datetime, timezone
+
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.partitions import (
+    add_months,
+    days_needed,
+    expired_months,
+    is_covered,
+    month_bounds,
+    month_of_partition,
+    months_to_create,
+    partition_name,
+)
+
+may = date(2025, 5, 1)
+
+
+def test_months_roll_over_the_year():
+    assert add_months(date(2025, 11, 1), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert months_to_create(date(2025, 12, 14), 2) == [
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+    ]
+
+
+def test_bounds_are_utc_months():
+    assert month_bounds(may) == (
+        datetime(2025, 5, 1, tzinfo=timezone.utc),
+        datetime(2025, 6, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_names_go_both_ways():
+    name = partition_name("mouse_moves", may)
+
+    assert name == "mouse_moves_2025_05"
+    assert month_of_partition("mouse_moves", name) == may
+    assert month_of_partition("mouse_moves", "mouse_moves_default") is None
+    # Another table's partition isn't this one's
+    assert month_of_partition("mouse_moves", "typing_sessions_2025_05") is None
+
+
+def test_only_months_past_the_retention_expire():
+    months = [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)]
+
+    # Feb's rows, and the local day after them, are all over 28 days old by Mar 30
+    assert expired_months(months, date(2025, 3, 30), retention_days=28) == [
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+    ]
+    assert expired_months(months, date(2025, 3, 29), retention_days=28) == [
+        date(2025, 1, 1)
+    ]
+
+
+def test_a_month_needs_every_day_precomputed():
+    groups = (ChartEventType.MOUSE, ChartEventType.KEYBOARD)
+    markers = {(day, group) for day in days_needed(may) for group in groups}
+
+    assert days_needed(may)[0] == date(2025, 4, 30)
+    assert days_needed(may)[-1] == date(2025, 6, 1)
+    assert is_covered(may, groups, markers)
+
+    markers.discard((date(2025, 5, 17), ChartEventType.KEYBOARD))
+    assert not is_covered(may, groups, markers)
+    assert is_covered(may, (ChartEventType.MOUSE,), markers)
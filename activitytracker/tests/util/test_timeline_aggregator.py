@@ -3,8 +3,12 @@ import pytest
 from time import time
 from typing import List
 from dataclasses import dataclass
+from types import SimpleNamespace
 
-from activitytracker.util.timeline_event_aggregator import aggregate_timeline_events
+from activitytracker.util.timeline_event_aggregator import (
+    aggregate_timeline_events,
+    epochs_of_rows,
+)
 
 # given these -- directly from the real db
 from ..data.timeline_data import all_mouse_events, all_keyboard_events
@@ -19,7 +23,7 @@ def test_aggregate_timeline_events():
 
     # assert
     # NOTE: I *ONLY* put in data and assumed it works. Data came direct from read_day_mice
-    assert len(grouped) == 1  # 0 gaps of longer than 1,000 ms
+    assert len(grouped) == 2  # 1 gap of longer than 1,000 ms: 1.105 sec
     for entry in grouped:
         assert entry.start is not None, "A timestamp was missing"
         assert entry.end is not None, "An ending timestamp was missing"
@@ -44,7 +48,7 @@ def test_aggregate_timeline_events_again():
     grouped = aggregate_timeline_events(batch, threshold=threshold)
     # assert
     # NOTE: I *ONLY* put in data and assumed it works. Data came direct from read_day_keyboard
-    assert len(grouped) == 2  # 1 gaps of longer than 1,000 ms
+    assert len(grouped) == 20  # Every gap is longer than 1,000 ms
     for entry in grouped:
         assert entry.start is not None, "A timestamp was missing"
         assert entry.end is not None, "An ending timestamp was missing"
@@ -60,3 +64,43 @@ def test_aggregate_timeline_events_again():
         assert (
             milliseconds < threshold
         ), f"Time difference {milliseconds}ms exceeds threshold of {threshold}ms"
+
+
+def test_threshold_is_in_ms():
+    batch = all_mouse_events
+
+    # The gaps in this data are 0.1 to 1.1 sec
+    assert len(aggregate_timeline_events(batch, threshold=2000)) == 1
+    assert len(aggregate_timeline_events(batch, threshold=50)) == len(batch)
+
+
+def test_groups_keep_their_bounds_and_counts():
+    batch = all_mouse_events
+
+    grouped = aggregate_timeline_events(batch, threshold=1000)
+
+    assert [entry.eventCount for entry in grouped] == [12, 8]
+    assert grouped[0].start == batch[0].start
+    assert grouped[0].end == batch[11].end
+    assert grouped[1].start == batch[12].start
+    assert grouped[1].end == batch[-1].end
+    assert grouped[1].clientFacingId == batch[12].clientFacingId
+
+
+def test_epochs_from_the_db_give_the_same_groups():
+    expected = aggregate_timeline_events(all_mouse_events, threshold=500)
+
+    rows = [
+        SimpleNamespace(
+            start_us=round(event.start.timestamp() * 1_000_000),
+            end_us=round(event.end.timestamp() * 1_000_000),
+        )
+        for event in all_mouse_events
+    ]
+    from_db = aggregate_timeline_events(
+        all_mouse_events, threshold=500, epochs_us=epochs_of_rows(rows)
+    )
+
+    assert [(e.start, e.end, e.eventCount) for e in from_db] == [
+        (e.start, e.end, e.eventCount) for e in expected
+    ]
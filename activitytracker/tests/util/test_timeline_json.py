@@ -0,0 +1,194 @@
+from collections import namedtuple
+
+import pytest
+
+import pytz
+from datetime import datetime, timedelta, timezone
+
+from activitytracker.db.models import PrecomputedTimelineEntry
+from activitytracker.object.dashboard_dto import (
+    PartiallyPrecomputedWeeklyTimeline,
+    TimelineEntrySchema,
+    TimelineRows,
+    TimelineRowsWithCursor,
+)
+from activitytracker.object.enums import ChartEventType
+from activitytracker.util.timeline_json import (
+    COLUMNAR_MEDIA_TYPE,
+    FastJSONResponse,
+    TimelineCursor,
+    TimelineFormat,
+    day_as_json,
+    dumps,
+    entries_as_columns,
+    entry_as_json,
+    rows_as_json,
+    with_cursor,
+)
+
+# Stands in for a Core row: a tuple with named fields
+TimelineRow = namedtuple(
+    "TimelineRow", ["clientFacingId", "group", "content", "start", "end"]
+)
+
+start = datetime(2025, 5, 19, 3, 0, 0, tzinfo=timezone.utc)
+end = datetime(2025, 5, 19, 3, 0, 2, 500000, tzinfo=timezone.utc)
+
+mouse_row = TimelineRow("mouse-1", ChartEventType.MOUSE, "Mouse Event 1", start, end)
+keyboard_row = TimelineRow(
+    "keyboard-2", ChartEventType.KEYBOARD, "Typing Session 2", start, end
+)
+
+
+def test_row_and_orm_object_come_out_the_same():
+    orm_entry = PrecomputedTimelineEntry(
+        clientFacingId="mouse-1",
+        group=ChartEventType.MOUSE,
+        content="Mouse Event 1",
+        start=start,
+        end=end,
+    )
+
+    assert entry_as_json(mouse_row) == entry_as_json(orm_entry)
+    assert entry_as_json(mouse_row)["group"] == "mouse"
+
+
+def test_same_json_as_the_pydantic_models():
+    body = dumps(rows_as_json([mouse_row], [keyboard_row]))
+
+    expected = TimelineRows(
+        mouseRows=[TimelineEntrySchema.from_orm_model(mouse_row)],
+        keyboardRows=[TimelineEntrySchema.from_orm_model(keyboard_row)],
+    )
+    assert TimelineRows.model_validate_json(body) == expected
+    assert b'"start":"2025-05-19T03:00:00Z"' in body
+
+
+def test_a_delta_matches_the_response_models():
+    today = {"date": start, "mouse_events": [mouse_row], "keyboard_events": []}
+
+    rows = dumps(with_cursor(rows_as_json([mouse_row], []), 42, True))
+    week = dumps(
+        with_cursor(
+            {"beforeToday": [], "today": day_as_json(today), "startDate": start}, 42, True
+        )
+    )
+
+    assert TimelineRowsWithCursor.model_validate_json(rows).cursor == "42"
+    assert PartiallyPrecomputedWeeklyTimeline.model_validate_json(week).isDelta
+
+
+def test_offsets_survive():
+    tokyo_start = start.astimezone(pytz.timezone("Asia/Tokyo"))
+
+    body = dumps({"start": tokyo_start})
+
+    assert body == b'{"start":"2025-05-19T12:00:00+09:00"}'
+
+
+def test_response_passes_bytes_through():
+    response = FastJSONResponse(b'{"days":[]}')
+
+    assert response.body == b'{"days":[]}'
+    assert response.media_type == "application/json"
+    assert FastJSONResponse({"days": []}).body == b'{"days":[]}'
+
+
+def expand(columns: dict, id_prefix: str, content_prefix: str) -> list:
+    """What the client does with a columnar block"""
+    starts, offsets = columns["starts"], columns.get("idOffsets")
+    if columns.get("delta"):
+        starts = [sum(starts[: i + 1]) for i in range(len(starts))]
+        offsets = offsets and [sum(offsets[: i + 1]) for i in range(len(offsets))]
+    unit = timedelta(microseconds=1000 if columns["unit"] == "ms" else 1)
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    expanded = []
+    for i in range(columns["count"]):
+        if offsets is None:
+            entry_id, content = columns["ids"][i], columns["contents"][i]
+        else:
+            number = str(columns["idBase"] + offsets[i])
+            entry_id, content = id_prefix + number, content_prefix + number
+        entry_start = epoch + starts[i] * unit
+        entry_end = entry_start + columns["durations"][i] * unit
+        expanded.append((entry_id, content, entry_start, entry_end))
+    return expanded
+
+
+mouse_rows = [
+    TimelineRow(
+        f"mouse-{n}",
+        ChartEventType.MOUSE,
+        f"Mouse Event {n}",
+        start + timedelta(seconds=n),
+        start + timedelta(seconds=n, milliseconds=250),
+    )
+    for n in (40, 42, 47)
+]
+
+
+def as_tuples(rows):
+    return [(row.clientFacingId, row.content, row.start, row.end) for row in rows]
+
+
+def test_columnar_expands_back_losslessly():
+    columns = entries_as_columns(mouse_rows, ChartEventType.MOUSE, delta=False)
+
+    assert columns["unit"] == "ms"
+    assert columns["idBase"] == 40
+    assert columns["idOffsets"] == [0, 2, 7]
+    assert columns["durations"] == [250, 250, 250]
+    assert expand(columns, "mouse-", "Mouse Event ") == as_tuples(mouse_rows)
+
+
+def test_delta_encoding_expands_to_the_same_rows():
+    columns = entries_as_columns(mouse_rows, ChartEventType.MOUSE, delta=True)
+
+    assert columns["starts"][1:] == [2000, 5000]
+    columns["delta"] = True
+    assert expand(columns, "mouse-", "Mouse Event ") == as_tuples(mouse_rows)
+
+
+def test_sub_millisecond_times_switch_to_microseconds():
+    precise = mouse_row._replace(end=start + timedelta(microseconds=1500))
+
+    columns = entries_as_columns([precise], ChartEventType.MOUSE, delta=False)
+
+    assert columns["unit"] == "us"
+    assert columns["durations"] == [1500]
+    assert expand(columns, "mouse-", "Mouse Event ") == as_tuples([precise])
+
+
+def test_unusual_ids_are_sent_as_is():
+    odd = keyboard_row._replace(clientFacingId="keyboard-x")
+
+    columns = entries_as_columns([keyboard_row, odd], ChartEventType.KEYBOARD, delta=False)
+
+    assert "idBase" not in columns
+    assert columns["ids"] == ["keyboard-2", "keyboard-x"]
+    assert expand(columns, "keyboard-", "Typing Session ") == as_tuples([keyboard_row, odd])
+
+
+def test_format_is_negotiated():
+    assert not TimelineFormat.negotiate(None, False, "application/json").columnar
+    assert TimelineFormat.negotiate(None, False, COLUMNAR_MEDIA_TYPE).columnar
+    # The query param wins over the header
+    assert not TimelineFormat.negotiate("objects", False, COLUMNAR_MEDIA_TYPE).columnar
+
+    columnar_delta = TimelineFormat.negotiate("columnar", True, None)
+    assert columnar_delta.cache_key("timeline") == "timeline_columnar_delta"
+    assert TimelineFormat().cache_key("timeline") == "timeline"
+    assert rows_as_json([mouse_row], [], columnar_delta)["keyboardRows"]["count"] == 0
+
+
+def test_since_is_a_cursor_or_a_watermark():
+    assert TimelineCursor.parse("1200").after_id == 1200
+
+    watermark = TimelineCursor.parse("2025-05-19T03:00:00Z")
+    assert watermark.after_id is None
+    assert watermark.watermark == start
+
+    with pytest.raises(ValueError):
+        TimelineCursor.parse("2025-05-19T03:00:00")  # Whose 3 am?
+    with pytest.raises(ValueError):
+        TimelineCursor.parse("yesterday")
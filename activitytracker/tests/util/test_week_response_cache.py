@@ -0,0 +1,82 @@
+import pytest
+
+import pytz
+from datetime import date, datetime
+
+from activitytracker.util.week_response_cache import WeekResponseCache, sunday_of
+
+tokyo_tz = pytz.timezone("Asia/Tokyo")
+
+# Sun May 18 -> Sat May 24, 2025
+past_week = date(2025, 5, 18)
+later_week = date(2025, 5, 25)
+now = tokyo_tz.localize(datetime(2025, 6, 4, 12, 0))
+
+
+@pytest.fixture
+def cache():
+    return WeekResponseCache(max_bytes=100)
+
+
+def test_sunday_of():
+    assert sunday_of(date(2025, 5, 18)) == date(2025, 5, 18)
+    assert sunday_of(date(2025, 5, 21)) == date(2025, 5, 18)
+    assert sunday_of(date(2025, 5, 24)) == date(2025, 5, 18)
+
+
+def test_hit_after_put(cache):
+    assert cache.get("timeline", past_week, "Asia/Tokyo") is None
+
+    assert cache.put("timeline", past_week, "Asia/Tokyo", b'{"days":[]}', now)
+
+    assert cache.get("timeline", past_week, "Asia/Tokyo") == b'{"days":[]}'
+    assert cache.get("chrome", past_week, "Asia/Tokyo") is None
+    assert cache.get("timeline", past_week, "America/Vancouver") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+
+
+def test_open_week_is_not_kept(cache):
+    during_the_week = tokyo_tz.localize(datetime(2025, 5, 22, 12, 0))
+    just_after_midnight = tokyo_tz.localize(datetime(2025, 5, 25, 0, 2))
+    after_the_grace_period = tokyo_tz.localize(datetime(2025, 5, 25, 0, 6))
+
+    assert not cache.put("timeline", past_week, "Asia/Tokyo", b"{}", during_the_week)
+    assert not cache.put("timeline", past_week, "Asia/Tokyo", b"{}", just_after_midnight)
+    assert cache.put("timeline", past_week, "Asia/Tokyo", b"{}", after_the_grace_period)
+
+
+def test_lru_eviction_stays_under_budget(cache):
+    cache.put("timeline", date(2025, 5, 4), "Asia/Tokyo", b"a" * 40, now)
+    cache.put("timeline", date(2025, 5, 11), "Asia/Tokyo", b"b" * 40, now)
+    cache.get("timeline", date(2025, 5, 4), "Asia/Tokyo")  # Now the most recent
+
+    cache.put("timeline", past_week, "Asia/Tokyo", b"c" * 40, now)
+
+    assert cache.get("timeline", date(2025, 5, 11), "Asia/Tokyo") is None
+    assert cache.get("timeline", date(2025, 5, 4), "Asia/Tokyo") is not None
+    assert cache.get("timeline", past_week, "Asia/Tokyo") is not None
+    assert cache.total_bytes == 80
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_too_big_for_the_budget(cache):
+    assert not cache.put("timeline", past_week, "Asia/Tokyo", b"x" * 101, now)
+    assert cache.total_bytes == 0
+
+
+def test_late_write_invalidates_only_its_week(cache):
+    cache.put("timeline", past_week, "Asia/Tokyo", b"{}", now)
+    cache.put("chrome", past_week, "Asia/Tokyo", b"{}", now)
+    # Requested by a mid-week date, still the same week
+    cache.put("breakdown", date(2025, 5, 21), "Asia/Tokyo", b"{}", now)
+    cache.put("timeline", later_week, "Asia/Tokyo", b"{}", now)
+
+    dropped = cache.invalidate_day(date(2025, 5, 23))
+
+    assert dropped == 3
+    assert cache.get("timeline", past_week, "Asia/Tokyo") is None
+    assert cache.get("breakdown", date(2025, 5, 21), "Asia/Tokyo") is None
+    assert cache.get("timeline", later_week, "Asia/Tokyo") == b"{}"
+    assert cache.total_bytes == 2
@@ -0,0 +1,88 @@
+import json
+import timeit
+from array import array
+
+import pytest
+
+from activitytracker.util.errors import UnreadableMessageError
+from activitytracker.util.wire_format import (
+    WIRE_VERSION,
+    decode,
+    encode_keyboard,
+    encode_mouse,
+    header_format,
+)
+
+key_downs = [1749740000.0 + i * 0.0731 for i in range(64)]
+
+
+def test_keyboard_round_trips_into_an_array():
+    message = decode(encode_keyboard(key_downs))
+
+    assert message["type"] == "keyboard"
+    assert isinstance(message["timestamps"], array)
+    assert list(message["timestamps"]) == key_downs
+
+
+def test_mouse_round_trips():
+    message = decode(encode_mouse(1749740000.25, 1749740002.5))
+
+    assert message == {"type": "mouse", "start": 1749740000.25, "end": 1749740002.5}
+
+
+def test_an_old_peripheral_process_still_gets_through():
+    old_style = json.dumps({"type": "keyboard", "timestamp": 1749740000.0}).encode()
+
+    assert decode([old_style]) == {"type": "keyboard", "timestamp": 1749740000.0}
+
+
+def test_an_unknown_version_or_tag_is_refused():
+    _, payload = encode_mouse(1.0, 2.0)
+
+    with pytest.raises(UnreadableMessageError):
+        decode([header_format.pack(WIRE_VERSION + 1, 2), payload])
+    with pytest.raises(UnreadableMessageError):
+        decode([header_format.pack(WIRE_VERSION, 99), payload])
+
+
+@pytest.mark.parametrize(
+    "frames",
+    [
+        [b"\x01", encode_keyboard([1.0])[1]],  # Short header
+        [b"\x01\x01\x00", encode_keyboard([1.0])[1]],  # Long header
+        [encode_keyboard([1.0])[0], b"\x00" * 12],  # Not whole doubles
+        [encode_mouse(1.0, 2.0)[0], encode_keyboard([1.0])[1]],  # Half a mouse move
+        encode_keyboard([1.0]) + [b"extra"],
+        [],
+        [b"not json"],
+        [b"[1, 2]"],
+    ],
+)
+def test_a_malformed_message_is_unreadable(frames):
+    with pytest.raises(UnreadableMessageError):
+        decode(frames)
+
+
+def test_binary_is_smaller_than_json():
+    json_size = len(json.dumps({"type": "keyboard", "timestamps": key_downs}).encode())
+    binary_size = sum(len(frame) for frame in encode_keyboard(key_downs))
+
+    assert binary_size == 2 + 8 * len(key_downs)
+    assert binary_size < json_size
+
+
+@pytest.mark.benchmark
+def test_codec_benchmark_against_json():
+    """A batch of key-downs, the way the channel carried it before and after"""
+
+    def json_round_trip():
+        return json.loads(json.dumps({"type": "keyboard", "timestamps": key_downs}).encode())
+
+    def binary_round_trip():
+        return decode(encode_keyboard(key_downs))
+
+    json_sec = min(timeit.repeat(json_round_trip, number=2000, repeat=5))
+    binary_sec = min(timeit.repeat(binary_round_trip, number=2000, repeat=5))
+    print(f"\njson: {json_sec * 500:.2f} us/msg\nbinary: {binary_sec * 500:.2f} us/msg")
+
+    assert binary_sec < json_sec